@@ -0,0 +1,111 @@
+"""Times each engine on loop-heavy scripts and reports the cost per node the tree walker evaluates.
+
+Usage: python -m benchmarks.evaluate [repeats]
+"""
+
+import sys
+import time
+
+from muffinscript import interpreter
+from muffinscript.engines import (
+    ENGINES,
+    run_program,
+)
+from muffinscript.frame import Frame
+from muffinscript.lexer import tokenize_source
+from muffinscript.parser import parse_program
+from muffinscript.resolver import resolve
+
+ITEMS = "[" + ", ".join(str(i) for i in range(200)) + "]"
+SCRIPTS = {
+    "arithmetic": f"""total = 0
+for (i in {ITEMS}) {{
+    for (j in {ITEMS}) {{
+        total = total + i * j % 7 - j / 3
+    }}
+}}
+""",
+    "branches": f"""count = 0
+for (i in {ITEMS}) {{
+    for (j in {ITEMS}) {{
+        if (i % 3 == 0) {{
+            count = count + 1
+        }} else {{
+            if (j > i) {{ count = count - 1 }}
+        }}
+    }}
+}}
+""",
+    "deep": f"""total = 0
+for (i in {ITEMS}) {{
+    total = {" + ".join(["i * 2 - 1"] * 100)}
+    nested = {"[" * 50}i{"]" * 50}
+}}
+""",
+    "strings": f"""line = ""
+for (i in {ITEMS}) {{
+    for (j in [1, 2, 3, 4, 5]) {{
+        line = cat("row ", i, ":", j)
+        label = "item #{{i}}-#{{j}} of #{{line}}"
+        kind = type(label)
+    }}
+}}
+""",
+}
+
+
+def _count_evaluations(program):
+    """Counts how many nodes the tree walker runs while running the program once.
+
+    Expressions are evaluated from their postfix steps in a single call, each step stands for one node.
+    """
+    calls = 0
+    evaluate = interpreter.evaluate
+    execute = interpreter.execute
+
+    def counting_evaluate(node, *args):
+        nonlocal calls
+        result = evaluate(node, *args)
+        calls += len(getattr(node, "postfix", ())) or 1
+        return result
+
+    def counting_execute(node, *args):
+        nonlocal calls
+        calls += 1
+        execute(node, *args)
+
+    interpreter.evaluate = counting_evaluate
+    interpreter.execute = counting_execute
+    try:
+        _run(program)
+    finally:
+        interpreter.evaluate = evaluate
+        interpreter.execute = execute
+    return calls
+
+
+def _run(program, engine="tree"):
+    frame = Frame()
+    resolve(program, frame)
+    run_program(program, frame, engine)
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"{'script':<12} {'nodes':>10}" + "".join(f" {engine + ' ns/node':>18}" for engine in ENGINES))
+    for name, source in SCRIPTS.items():
+        program = parse_program(tokenize_source(source))
+        nodes = _count_evaluations(program)
+        timings = []
+        for engine in ENGINES:
+            best = float("inf")
+            for _ in range(repeats):
+                start = time.perf_counter()
+                _run(program, engine)
+                best = min(best, time.perf_counter() - start)
+            timings.append(best / nodes * 1e9)
+        print(f"{name:<12} {nodes:>10}" + "".join(f" {timing:>18.0f}" for timing in timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ from .base import (
     ArithmeticNode,
     AssignNode,
     BaseNode,
+    VariableNode,
 )
 from .standard_lib import (
     CatNode,
@@ -10,6 +11,7 @@ from .standard_lib import (
 )
 from .types import (
     BoolNode,
+    ConstantNode,
     FloatNode,
     IntNode,
     NullNode,
@@ -21,12 +23,14 @@ __all__ = [
     "ArithmeticNode",
     "AssignNode",
     "BaseNode",
+    "VariableNode",
     # Standard Library
     "CatNode",
     "PrintNode",
     "SleepNode",
     # Types
     "BoolNode",
+    "ConstantNode",
     "FloatNode",
     "IntNode",
     "NullNode",
@@ -11,6 +11,17 @@ class BaseNode:
         self.value = value
 
 
+class VariableNode(BaseNode):
+    """Variable reads: foo
+
+    The resolver binds `slot` to the variable's position in the frame before the program runs.
+    """
+
+    def __init__(self, name: str, line_number: int):
+        super().__init__(line_number, name)
+        self.slot: int | None = None
+
+
 class AssignNode(BaseNode):
     """Variable assignment: foo = 'hello world'"""
 
@@ -18,6 +29,7 @@ class AssignNode(BaseNode):
         super().__init__(line_number)
         self.var_name = var_name
         self.expression = expression
+        self.slot: int | None = None
 
 
 class ArithmeticNode(BaseNode):
@@ -51,8 +63,16 @@ class IfNode(BaseNode):
 class ForLoopNode(BaseNode):
     """For loop: for (item in myList) { ... }"""
 
-    def __init__(self, item_name: str, iterable: str | list[Any], body: list[Any], line_number: int):
+    def __init__(self, item_name: str, iterable: Any, body: list[Any], line_number: int):
         super().__init__(line_number)
         self.item_name = item_name
+        self.item_slot: int | None = None
         self.iterable = iterable
         self.body = body
+
+
+class ParallelForLoopNode(ForLoopNode):
+    """Parallel for loop: pfor (item in myList) { ... }
+
+    Iterations are split across worker processes, so the body may only assign variables of its own.
+    """
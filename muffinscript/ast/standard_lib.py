@@ -18,6 +18,22 @@ class PrintNode(BaseNode):
         super().__init__(line_number, value)
 
 
+class RangeNode(BaseNode):
+    """Range function: range(10) or range(1, 10) or range(10, 0, -2)"""
+
+    def __init__(self, args: list[Any], line_number: int):
+        super().__init__(line_number)
+        self.args = args
+
+
+class ReductionNode(BaseNode):
+    """List reductions: sum(foo), min(foo), max(foo) or mean(foo)"""
+
+    def __init__(self, function: str, value: Any, line_number: int):
+        super().__init__(line_number, value)
+        self.function = function
+
+
 class SleepNode(BaseNode):
     """Sleep function: sleep(1000)"""
 
@@ -1,3 +1,7 @@
+from typing import Any
+
+from muffinscript.constants import SUPPORTED_TYPES
+
 from .base import BaseNode
 
 
@@ -29,6 +33,17 @@ class StringNode(BaseNode):
         super().__init__(line_number, value)
 
 
+class InterpolationNode(BaseNode):
+    """Interpolated strings: 'hello #{name}'
+
+    The string is split once when parsed, `parts` alternates literal text and the variables to fill in.
+    """
+
+    def __init__(self, parts: list[Any], line_number: int):
+        super().__init__(line_number)
+        self.parts = parts
+
+
 class NullNode(BaseNode):
     """Null: null"""
 
@@ -36,6 +51,13 @@ class NullNode(BaseNode):
         super().__init__(line_number, value)
 
 
+class ConstantNode(BaseNode):
+    """Values computed ahead of time by the optimizer: 60 * 60"""
+
+    def __init__(self, value: SUPPORTED_TYPES, line_number: int):
+        super().__init__(line_number, value)
+
+
 class ListNode(BaseNode):
     """Lists: [1, 2, 3]"""
 
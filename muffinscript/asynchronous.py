@@ -0,0 +1,118 @@
+import asyncio
+from typing import (
+    Any,
+    cast,
+)
+
+from muffinscript.ast import SleepNode
+from muffinscript.ast.base import (
+    ForLoopNode,
+    IfNode,
+)
+from muffinscript.constants import (
+    ITERABLE_TYPES,
+    MUFFIN_OPTIMIZE,
+    SUPPORTED_TYPES,
+    UNSUPPORTED_STATEMENT,
+)
+from muffinscript.errors import MuffinScriptRuntimeError
+from muffinscript.frame import Frame
+from muffinscript.interpreter import (
+    evaluate,
+    execute,
+)
+from muffinscript.lexer import tokenize_source
+from muffinscript.limits import (
+    BUDGET,
+    DEFAULT_LIMITS,
+    Limits,
+    enforcing,
+)
+from muffinscript.optimizer import optimize
+from muffinscript.output import OUTPUT
+from muffinscript.parser import parse_program
+from muffinscript.resolver import resolve
+
+
+async def run_async(
+    source: str, variables: dict[str, SUPPORTED_TYPES] | None = None, limits: Limits | None = None
+) -> dict[str, SUPPORTED_TYPES]:
+    """Runs MuffinScript source on the running event loop and returns its variables once it finishes.
+
+    `sleep` awaits `asyncio.sleep` instead of blocking the thread, so any number of scripts can sleep side by side
+    on one loop. `variables` seeds the script's variables and is left untouched. `limits` (`DEFAULT_LIMITS` unless
+    given) caps what the script may do, every script has a budget of its own.
+    """
+    program = parse_program(tokenize_source(source))
+    if MUFFIN_OPTIMIZE:
+        program, _ = optimize(program)
+    frame = Frame(variables)
+    resolve(program, frame)
+    await run_program_async(program, frame, limits)
+    return frame.to_dict()
+
+
+async def run_program_async(program: list[Any], frame: Frame, limits: Limits | None = None):
+    """Runs resolved top-level nodes with the tree walker, suspending at every `sleep`.
+
+    Only the statements a `sleep` can be reached from are walked here, everything else goes straight to the regular
+    (synchronous) executor, so scripts that never sleep run exactly as fast as they do with `run_program`. `limits`
+    default to `DEFAULT_LIMITS`, a sleep never runs past the deadline.
+    """
+    sleepy = _sleepy_statements(program)
+    with OUTPUT.buffering(), enforcing(limits or DEFAULT_LIMITS):
+        for node in program:
+            if node:
+                await _execute(node, frame, node.line_number, sleepy)
+
+
+async def _execute(node: Any, frame: Frame, line_number: int, sleepy: set[int]):
+    if id(node) not in sleepy:
+        execute(node, frame, line_number)
+        return
+    budget = BUDGET.get()
+    if budget is not None:
+        budget.charge(1, line_number)
+    if isinstance(node, SleepNode):
+        seconds = cast(float, evaluate(node.duration, frame, line_number))
+        # Whatever was printed before the pause should be visible during it
+        OUTPUT.flush()
+        if budget is None:
+            await asyncio.sleep(seconds)
+            return
+        allowed = budget.sleep_time(seconds)
+        await asyncio.sleep(allowed)
+        if allowed < seconds:
+            raise budget.time_limit_error(line_number)
+    elif isinstance(node, IfNode):
+        body = node.body if evaluate(node.condition, frame, line_number) else node.else_body
+        for statement in body:
+            await _execute(statement, frame, statement.line_number, sleepy)
+    elif isinstance(node, ForLoopNode):
+        iterable = evaluate(node.iterable, frame, line_number)
+        if not isinstance(iterable, ITERABLE_TYPES):
+            raise MuffinScriptRuntimeError(UNSUPPORTED_STATEMENT, line_number)
+        for item in iterable:
+            if budget is not None:
+                # Every iteration counts as a step, like in the tree walker
+                budget.charge(1, line_number)
+            frame.values[node.item_slot] = item  # type: ignore
+            for statement in node.body:
+                await _execute(statement, frame, statement.line_number, sleepy)
+
+
+def _sleepy_statements(program: list[Any]) -> set[int]:
+    """Finds every statement that is a `sleep` or has one somewhere in its blocks, by `id()`."""
+    sleepy: set[int] = set()
+    # Each entry is a statement and the chain of blocks it sits in
+    work: list[tuple[Any, tuple[Any, ...]]] = [(node, ()) for node in program if node]
+    while work:
+        node, parents = work.pop()
+        if isinstance(node, SleepNode):
+            sleepy.add(id(node))
+            sleepy.update(id(parent) for parent in parents)
+        elif isinstance(node, IfNode):
+            work.extend((statement, parents + (node,)) for statement in node.body + node.else_body)
+        elif isinstance(node, ForLoopNode):
+            work.extend((statement, parents + (node,)) for statement in node.body)
+    return sleepy
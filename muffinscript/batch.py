@@ -0,0 +1,70 @@
+import contextlib
+import io
+import time
+import traceback
+
+from muffinscript import parallel
+from muffinscript.errors import MuffinScriptBaseError
+
+
+class ScriptResult:
+    """What running one script in a batch produced: its exit status, everything it printed and how long it took."""
+
+    __slots__ = ("path", "status", "output", "seconds")
+
+    def __init__(self, path: str, status: int, output: str, seconds: float):
+        self.path = path
+        self.status = status
+        self.output = output
+        self.seconds = seconds
+
+
+def run_scripts(paths: list[str], jobs: int) -> list[ScriptResult]:
+    """Runs every script on a pool of `jobs` worker processes, results come back in the order the scripts were given.
+
+    Each worker is started once and then runs script after script, so the cost of starting Python and importing
+    MuffinScript is paid per worker instead of per script. Scripts already run in parallel, so their `pfor` loops run
+    in order inside the worker.
+    """
+    # Imported here, `multiprocessing` takes longer to import than the rest of MuffinScript put together
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=parallel.run_in_process) as pool:
+        return list(pool.map(run_script, paths))
+
+
+def run_script(path: str) -> ScriptResult:
+    """Runs a script with a fresh set of variables, capturing what it prints (errors included) instead of exiting."""
+    # Imported here, the command line imports this module and the worker only needs it once it runs a script
+    from muffinscript.frame import Frame
+    from muffinscript.muffin import (
+        _load_program,
+        _run_program,
+    )
+
+    output = io.StringIO()
+    status = 0
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        try:
+            _run_program(_load_program(path), Frame())
+        except MuffinScriptBaseError as error:
+            print(error)
+            status = 1
+        except Exception:
+            # Anything else (eg: a missing file or `1 / 0`) shouldn't take the whole batch down with it
+            print(traceback.format_exc(), end="")
+            status = 1
+    return ScriptResult(path, status, output.getvalue(), time.perf_counter() - start)
+
+
+def format_summary(results: list[ScriptResult], seconds: float) -> str:
+    """Lists the exit status and wall time of every script, followed by the totals and how long the batch took."""
+    lines = [f"{'status':<8} {'seconds':>9}  script"]
+    for result in results:
+        status = "ok" if result.status == 0 else "failed"
+        lines.append(f"{status:<8} {result.seconds:>9.3f}  {result.path}")
+    failed = sum(1 for result in results if result.status)
+    total = sum(result.seconds for result in results)
+    lines.append(f"{len(results)} scripts, {failed} failed, {total:.3f}s of script time in {seconds:.3f}s")
+    return "\n".join(lines)
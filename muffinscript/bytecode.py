@@ -0,0 +1,375 @@
+from array import array
+from typing import Any
+
+from muffinscript.ast import (
+    ArithmeticNode,
+    AssignNode,
+    BoolNode,
+    CatNode,
+    ConstantNode,
+    FloatNode,
+    IntNode,
+    NullNode,
+    PrintNode,
+    SleepNode,
+    StringNode,
+    VariableNode,
+)
+from muffinscript.ast.base import (
+    ForLoopNode,
+    IfNode,
+    ParallelForLoopNode,
+)
+from muffinscript.ast.standard_lib import (
+    FloatCoerceNode,
+    IntCoerceNode,
+    RangeNode,
+    ReductionNode,
+    StringCoerceNode,
+    TypeCheckNode,
+)
+from muffinscript.ast.types import (
+    InterpolationNode,
+    ListNode,
+)
+from muffinscript.constants import (
+    ITERABLE_TYPES,
+    PYTHON_TO_MUFFIN_TYPES,
+    SUPPORTED_OPERATORS,
+    UNDEFINED_VARIABLE,
+    UNSUPPORTED_STATEMENT,
+)
+from muffinscript.errors import (
+    MuffinScriptRuntimeError,
+    with_line_number,
+)
+from muffinscript.frame import (
+    UNSET,
+    Frame,
+)
+from muffinscript.interpreter import (
+    coerce_number,
+    make_range,
+)
+from muffinscript.lists import MuffinList
+from muffinscript.output import (
+    OUTPUT,
+    sleep,
+)
+from muffinscript.parallel import run_parallel_loop
+from muffinscript.vector import (
+    REDUCTIONS,
+    array_type_name,
+    reduce_list,
+)
+
+# Opcodes, every instruction is an opcode followed by a single operand (0 when unused)
+LOAD_CONST = 0  # Push constants[operand]
+LOAD_VAR = 1  # Push the variable in slot `operand`
+STORE_VAR = 2  # Pop into the variable in slot `operand`
+BINARY_OP = 3  # Pop right then left, push OPERATORS[operand](left, right)
+BUILD_LIST = 4  # Pop `operand` items, push them as a list
+BUILD_STRING = 5  # Pop `operand` items, push the concatenation of their `str()`
+PRINT = 6  # Pop and print
+POP = 7  # Pop and discard
+SLEEP = 8  # Pop and sleep that many seconds
+TYPE_OF = 9  # Pop, push the name of its MuffinScript type
+COERCE = 10  # Pop, push it coerced to COERCIONS[operand]
+JUMP = 11  # Continue at instruction `operand`
+JUMP_IF_FALSE = 12  # Pop, continue at instruction `operand` if it's falsy
+GET_ITER = 13  # Pop a list or range, push an iterator over it
+FOR_ITER = 14  # Push the iterator's next item, or pop the iterator and continue at instruction `operand`
+BUILD_RANGE = 15  # Pop `operand` integers, push the range they describe
+REDUCE = 16  # Pop a list, push its reduction FUNCTIONS[operand] (eg: `sum`)
+PARALLEL_FOR = 17  # Pop a list or range, run the `pfor` loop constants[operand] over it on the process pool
+
+OPCODE_NAMES = [
+    "LOAD_CONST",
+    "LOAD_VAR",
+    "STORE_VAR",
+    "BINARY_OP",
+    "BUILD_LIST",
+    "BUILD_STRING",
+    "PRINT",
+    "POP",
+    "SLEEP",
+    "TYPE_OF",
+    "COERCE",
+    "JUMP",
+    "JUMP_IF_FALSE",
+    "GET_ITER",
+    "FOR_ITER",
+    "BUILD_RANGE",
+    "REDUCE",
+    "PARALLEL_FOR",
+]
+OPERATORS = list(SUPPORTED_OPERATORS)
+COERCIONS = ["str", "int", "float"]
+FUNCTIONS = list(REDUCTIONS)
+
+_OPERATOR_FUNCTIONS = [SUPPORTED_OPERATORS[operator] for operator in OPERATORS]
+_COERCIONS = {StringCoerceNode: 0, IntCoerceNode: 1, FloatCoerceNode: 2}
+_LITERAL_NODES = (IntNode, FloatNode, StringNode, BoolNode, NullNode, ConstantNode)
+
+
+class Bytecode:
+    """A compiled program: a flat instruction array, the line of every instruction and the constant pool.
+
+    Instructions are stored as `opcode, operand` pairs in `code`, `lines` holds one MuffinScript line per
+    instruction and `names` remembers which variable each slot belongs to for the disassembler.
+    """
+
+    __slots__ = ("code", "lines", "constants", "names")
+
+    def __init__(self, code: array, lines: array, constants: list[Any], names: dict[int, str]):
+        self.code = code
+        self.lines = lines
+        self.constants = constants
+        self.names = names
+
+
+def run_program(program: list[Any], frame: Frame):
+    """Compiles resolved top-level nodes to bytecode, then runs it on the VM."""
+    execute(compile_program(program), frame)
+
+
+def compile_program(program: list[Any]) -> Bytecode:
+    """Compiles resolved top-level nodes to bytecode."""
+    compiler = _Compiler()
+    for node in program:
+        if node:
+            compiler.statement(node, node.line_number)
+    return Bytecode(compiler.code, compiler.lines, compiler.constants, compiler.names)
+
+
+def execute(bytecode: Bytecode, frame: Frame):
+    """Runs bytecode with an explicit operand stack, reading and writing variables in the frame's slots."""
+    # Indexing a list skips boxing a new int on every read, which the packed array would do
+    code = bytecode.code.tolist()
+    constants = bytecode.constants
+    values = frame.values
+    stack: list[Any] = []
+    push = stack.append
+    pop = stack.pop
+    write = OUTPUT.write
+    end = len(code)
+    pc = 0
+    while pc < end:
+        opcode = code[pc]
+        operand = code[pc + 1]
+        pc += 2
+        if opcode == LOAD_VAR:
+            value = values[operand]
+            if value is UNSET:
+                raise MuffinScriptRuntimeError(UNDEFINED_VARIABLE, bytecode.lines[pc // 2 - 1])
+            push(value)
+        elif opcode == LOAD_CONST:
+            push(constants[operand])
+        elif opcode == STORE_VAR:
+            values[operand] = pop()
+        elif opcode == BINARY_OP:
+            right = pop()
+            try:
+                stack[-1] = _OPERATOR_FUNCTIONS[operand](stack[-1], right)
+            except MuffinScriptRuntimeError as error:
+                raise with_line_number(error, bytecode.lines[pc // 2 - 1])
+        elif opcode == FOR_ITER:
+            item = next(stack[-1], UNSET)
+            if item is UNSET:
+                pop()
+                pc = operand * 2
+            else:
+                push(item)
+        elif opcode == JUMP:
+            pc = operand * 2
+        elif opcode == JUMP_IF_FALSE:
+            if not pop():
+                pc = operand * 2
+        elif opcode == PRINT:
+            write(pop())
+        elif opcode == POP:
+            pop()
+        elif opcode == BUILD_STRING:
+            items = stack[len(stack) - operand :]
+            del stack[len(stack) - operand :]
+            push("".join([str(item) for item in items]))
+        elif opcode == BUILD_LIST:
+            items = stack[len(stack) - operand :]
+            del stack[len(stack) - operand :]
+            push(MuffinList(items))
+        elif opcode == BUILD_RANGE:
+            args = stack[len(stack) - operand :]
+            del stack[len(stack) - operand :]
+            push(make_range(args, bytecode.lines[pc // 2 - 1]))
+        elif opcode == GET_ITER:
+            iterable = pop()
+            if not isinstance(iterable, ITERABLE_TYPES):
+                raise MuffinScriptRuntimeError(UNSUPPORTED_STATEMENT, bytecode.lines[pc // 2 - 1])
+            push(iter(iterable))
+        elif opcode == TYPE_OF:
+            muffin_type = PYTHON_TO_MUFFIN_TYPES.get(type(stack[-1]))
+            stack[-1] = array_type_name(stack[-1]) if muffin_type is None else muffin_type
+        elif opcode == COERCE:
+            if operand == 0:
+                stack[-1] = str(stack[-1])
+            else:
+                stack[-1] = coerce_number(int if operand == 1 else float, stack[-1], bytecode.lines[pc // 2 - 1])
+        elif opcode == REDUCE:
+            stack[-1] = reduce_list(FUNCTIONS[operand], stack[-1], bytecode.lines[pc // 2 - 1])
+        elif opcode == SLEEP:
+            sleep(pop())
+        elif opcode == PARALLEL_FOR:
+            run_parallel_loop(constants[operand], pop(), values, bytecode.lines[pc // 2 - 1])
+
+
+def disassemble(bytecode: Bytecode) -> str:
+    """Lists every instruction with its line, index, name, operand and what the operand refers to."""
+    output = []
+    previous_line = None
+    for index in range(len(bytecode.lines)):
+        opcode = bytecode.code[index * 2]
+        operand = bytecode.code[index * 2 + 1]
+        line = bytecode.lines[index]
+        if opcode == LOAD_CONST:
+            detail = f"({bytecode.constants[operand]!r})"
+        elif opcode in (LOAD_VAR, STORE_VAR):
+            detail = f"({bytecode.names.get(operand, '?')})"
+        elif opcode == BINARY_OP:
+            detail = f"({OPERATORS[operand]})"
+        elif opcode == COERCE:
+            detail = f"({COERCIONS[operand]})"
+        elif opcode == REDUCE:
+            detail = f"({FUNCTIONS[operand]})"
+        elif opcode == PARALLEL_FOR:
+            detail = f"({bytecode.constants[operand].item_name})"
+        elif opcode in (JUMP, JUMP_IF_FALSE, FOR_ITER):
+            detail = f"(to {operand})"
+        else:
+            detail = ""
+        line_column = f"{line:>4}" if line != previous_line else "    "
+        previous_line = line
+        output.append(f"{line_column} {index:>6} {OPCODE_NAMES[opcode]:<14} {operand:>4} {detail}".rstrip())
+    return "\n".join(output)
+
+
+class _Compiler:
+    """Emits instructions for one program, keeping the constant pool free of duplicates."""
+
+    def __init__(self):
+        self.code = array("i")
+        self.lines = array("i")
+        self.constants: list[Any] = []
+        self.constant_indexes: dict[tuple[type, Any], int] = {}
+        self.names: dict[int, str] = {}
+
+    def emit(self, opcode: int, operand: int, line_number: int) -> int:
+        """Appends an instruction, returns its index."""
+        self.code.append(opcode)
+        self.code.append(operand)
+        self.lines.append(line_number)
+        return len(self.lines) - 1
+
+    def patch(self, index: int, target: int):
+        """Points the jump at `index` to the instruction at `target`."""
+        self.code[index * 2 + 1] = target
+
+    def constant(self, value: Any) -> int:
+        try:
+            key = (type(value), value)
+            if key not in self.constant_indexes:
+                self.constant_indexes[key] = len(self.constants)
+                self.constants.append(value)
+            return self.constant_indexes[key]
+        except TypeError:
+            # Unhashable values (eg: lists) always get a slot of their own
+            self.constants.append(value)
+            return len(self.constants) - 1
+
+    def variable(self, slot: int | None, name: str) -> int:
+        """Returns a variable's slot, naming it for the disassembly. Only resolved programs can be compiled."""
+        if slot is None:
+            raise ValueError(f"Variable {name!r} wasn't resolved to a slot, resolve the program before compiling it")
+        self.names[slot] = name
+        return slot
+
+    def body(self, statements: list[Any]):
+        for statement in statements:
+            self.statement(statement, statement.line_number)
+
+    def statement(self, node: Any, line_number: int):
+        if isinstance(node, AssignNode):
+            self.expression(node.expression, line_number)
+            self.emit(STORE_VAR, self.variable(node.slot, node.var_name), line_number)
+        elif isinstance(node, PrintNode):
+            self.expression(node.value, line_number)
+            self.emit(PRINT, 0, line_number)
+        elif isinstance(node, SleepNode):
+            self.expression(node.duration, line_number)
+            self.emit(SLEEP, 0, line_number)
+        elif isinstance(node, IfNode):
+            self.expression(node.condition, line_number)
+            jump_to_else = self.emit(JUMP_IF_FALSE, 0, line_number)
+            self.body(node.body)
+            if node.else_body:
+                jump_to_end = self.emit(JUMP, 0, line_number)
+                self.patch(jump_to_else, len(self.lines))
+                self.body(node.else_body)
+                self.patch(jump_to_end, len(self.lines))
+            else:
+                self.patch(jump_to_else, len(self.lines))
+        elif isinstance(node, ParallelForLoopNode):
+            # The body isn't compiled, workers run it on the tree walker
+            self.expression(node.iterable, line_number)
+            self.emit(PARALLEL_FOR, self.constant(node), line_number)
+        elif isinstance(node, ForLoopNode):
+            self.expression(node.iterable, line_number)
+            self.emit(GET_ITER, 0, line_number)
+            loop = self.emit(FOR_ITER, 0, line_number)
+            self.emit(STORE_VAR, self.variable(node.item_slot, node.item_name), line_number)
+            self.body(node.body)
+            self.emit(JUMP, loop, line_number)
+            self.patch(loop, len(self.lines))
+        else:
+            self.expression(node, line_number)
+            self.emit(POP, 0, line_number)
+
+    def expression(self, node: Any, line_number: int):
+        if isinstance(node, VariableNode):
+            self.emit(LOAD_VAR, self.variable(node.slot, str(node.value)), line_number)
+        elif isinstance(node, _LITERAL_NODES):
+            self.emit(LOAD_CONST, self.constant(node.value), line_number)
+        elif isinstance(node, ArithmeticNode):
+            self.expression(node.left, line_number)
+            self.expression(node.right, line_number)
+            self.emit(BINARY_OP, OPERATORS.index(node.operator), line_number)
+        elif isinstance(node, CatNode):
+            for arg in node.args:
+                self.expression(arg, line_number)
+            self.emit(BUILD_STRING, len(node.args), line_number)
+        elif isinstance(node, InterpolationNode):
+            for part in node.parts:
+                if isinstance(part, str):
+                    self.emit(LOAD_CONST, self.constant(part), line_number)
+                else:
+                    self.expression(part, line_number)
+            self.emit(BUILD_STRING, len(node.parts), line_number)
+        elif isinstance(node, ListNode):
+            for item in node.items:
+                self.expression(item, line_number)
+            self.emit(BUILD_LIST, len(node.items), line_number)
+        elif isinstance(node, RangeNode):
+            for arg in node.args:
+                self.expression(arg, line_number)
+            self.emit(BUILD_RANGE, len(node.args), line_number)
+        elif isinstance(node, ReductionNode):
+            self.expression(node.value, line_number)
+            self.emit(REDUCE, FUNCTIONS.index(node.function), line_number)
+        elif isinstance(node, TypeCheckNode):
+            self.expression(node.value, line_number)
+            self.emit(TYPE_OF, 0, line_number)
+        elif isinstance(node, (StringCoerceNode, IntCoerceNode, FloatCoerceNode)):
+            self.expression(node.value, line_number)
+            self.emit(COERCE, _COERCIONS[type(node)], line_number)
+        else:
+            # Raw Python values pass straight through, as they do when evaluated
+            self.emit(LOAD_CONST, self.constant(node), line_number)
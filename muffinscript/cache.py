@@ -0,0 +1,133 @@
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any
+
+from muffinscript._version import __version__
+from muffinscript.ast import (
+    base,
+    standard_lib,
+    types,
+)
+from muffinscript.ast.base import BaseNode
+from muffinscript.constants import (
+    MUFFIN_CACHE_DIR,
+    MUFFIN_OPTIMIZE,
+)
+from muffinscript.lists import MuffinList
+
+CACHE_DIRECTORY_NAME = "__muffincache__"
+CACHE_EXTENSION = ".msc"
+# Bump whenever the layout of a cache file (or what the parser builds) changes so old files are treated as stale
+CACHE_FORMAT = 5
+CACHE_MAGIC = b"MUFFINCACHE"
+
+# The only classes a cache file can rebuild
+_NODE_CLASSES = {
+    name: value
+    for module in (base, standard_lib, types)
+    for name, value in vars(module).items()
+    if isinstance(value, type) and issubclass(value, BaseNode)
+}
+# Worked out from the node the first time it runs, never cached
+_DERIVED_ATTRIBUTES = {"postfix", "guarded_postfix"}
+# Values that go into a cache file as they are (bools are ints)
+_JSON_TYPES = (str, int, float)
+# What reading a missing, truncated or mangled cache file can raise
+_LOAD_ERRORS = (OSError, KeyError, RecursionError, TypeError, ValueError)
+
+
+def source_key(script_path: str) -> str:
+    """Builds the key a cached program must match: a hash of the script contents and everything that shapes its AST."""
+    with open(script_path, "rb") as script:
+        digest = hashlib.file_digest(script, "sha256")
+    digest.update(f"{CACHE_FORMAT}:{__version__}:{MUFFIN_OPTIMIZE}".encode())
+    return digest.hexdigest()
+
+
+def cache_path(script_path: str) -> str:
+    """Where the compiled program for a script lives, either next to it or in `MUFFIN_CACHE_DIR`."""
+    script_path = os.path.abspath(script_path)
+    name = os.path.splitext(os.path.basename(script_path))[0]
+    if MUFFIN_CACHE_DIR:
+        # Scripts from different directories can share a name, keep them apart in the shared directory
+        path_hash = hashlib.sha256(script_path.encode()).hexdigest()[:16]
+        return os.path.join(MUFFIN_CACHE_DIR, f"{name}.{path_hash}{CACHE_EXTENSION}")
+    return os.path.join(os.path.dirname(script_path), CACHE_DIRECTORY_NAME, f"{name}{CACHE_EXTENSION}")
+
+
+def load_program(script_path: str, key: str) -> list[Any] | None:
+    """Loads the cached program for a script, or returns None if there is none or it was built from anything else.
+
+    A cache file is a header line followed by the program as JSON. The header (format, key and the SHA-256 of the
+    JSON) is checked before the JSON is parsed, and parsing only ever builds AST nodes and plain values, so a cache
+    file can't run code. It can still change what a script does: trust the cache directory as much as the scripts
+    themselves, anyone who can write to it can write a file with a matching header.
+    """
+    try:
+        with open(cache_path(script_path), "rb") as cached:
+            header = cached.readline().split()
+            if len(header) != 4 or header[:3] != [CACHE_MAGIC, str(CACHE_FORMAT).encode(), key.encode()]:
+                return None
+            payload = cached.read()
+        if hashlib.sha256(payload).hexdigest() != header[3].decode():
+            return None
+        return json.loads(payload, object_hook=_decode)
+    except _LOAD_ERRORS:
+        # Missing, truncated or written by an incompatible version, any of which means we parse again
+        return None
+
+
+def save_program(script_path: str, key: str, program: list[Any]):
+    """Writes the compiled program for a script.
+
+    The file is written under a temporary name and then renamed into place so concurrent runs never read a partial
+    file. Caching is best effort, a read-only directory (or a program holding values a cache file can't) just means
+    the script is parsed every time.
+    """
+    path = cache_path(script_path)
+    temp_path = None
+    try:
+        payload = json.dumps(_encode(program), separators=(",", ":")).encode()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with tempfile.NamedTemporaryFile("wb", dir=os.path.dirname(path), suffix=".tmp", delete=False) as temp_file:
+            temp_path = temp_file.name
+            digest = hashlib.sha256(payload).hexdigest()
+            temp_file.write(b" ".join([CACHE_MAGIC, str(CACHE_FORMAT).encode(), key.encode(), digest.encode()]))
+            temp_file.write(b"\n" + payload)
+        os.replace(temp_path, path)
+    except Exception:
+        if temp_path:
+            with contextlib.suppress(OSError):
+                os.unlink(temp_path)
+
+
+def _encode(value: Any) -> Any:
+    """Converts a program to what JSON can hold, nodes, lists from list arithmetic and ranges become tagged objects."""
+    if isinstance(value, BaseNode):
+        attributes = [[name, _encode(item)] for name, item in vars(value).items() if name not in _DERIVED_ATTRIBUTES]
+        return {"node": type(value).__name__, "attributes": attributes}
+    elif isinstance(value, MuffinList):
+        return {"muffin_list": [_encode(item) for item in value]}
+    elif isinstance(value, list):
+        return [_encode(item) for item in value]
+    elif isinstance(value, range):
+        return {"range": [value.start, value.stop, value.step]}
+    elif value is None or isinstance(value, _JSON_TYPES):
+        return value
+    raise TypeError(f"{type(value).__name__} can't be cached")
+
+
+def _decode(value: dict[str, Any]) -> Any:
+    """Rebuilds what `_encode` wrote, the only objects in a cache file. Only AST node classes can be rebuilt."""
+    if "node" in value:
+        node = object.__new__(_NODE_CLASSES[value["node"]])
+        vars(node).update(value["attributes"])
+        return node
+    elif "muffin_list" in value:
+        return MuffinList(value["muffin_list"])
+    elif "range" in value:
+        return range(*value["range"])
+    raise ValueError("Not a cached value")
@@ -0,0 +1,370 @@
+from typing import (
+    Any,
+    Callable,
+)
+
+from muffinscript.ast import (
+    ArithmeticNode,
+    AssignNode,
+    BoolNode,
+    CatNode,
+    ConstantNode,
+    FloatNode,
+    IntNode,
+    NullNode,
+    PrintNode,
+    SleepNode,
+    StringNode,
+    VariableNode,
+)
+from muffinscript.ast.base import (
+    ForLoopNode,
+    IfNode,
+    ParallelForLoopNode,
+)
+from muffinscript.ast.standard_lib import (
+    FloatCoerceNode,
+    IntCoerceNode,
+    RangeNode,
+    ReductionNode,
+    StringCoerceNode,
+    TypeCheckNode,
+)
+from muffinscript.ast.types import (
+    InterpolationNode,
+    ListNode,
+)
+from muffinscript.constants import (
+    ITERABLE_TYPES,
+    PYTHON_TO_MUFFIN_TYPES,
+    SUPPORTED_OPERATORS,
+    UNDEFINED_VARIABLE,
+    UNSUPPORTED_STATEMENT,
+)
+from muffinscript.errors import (
+    MuffinScriptRuntimeError,
+    with_line_number,
+)
+from muffinscript.frame import (
+    UNSET,
+    Frame,
+)
+from muffinscript.interpreter import (
+    coerce_number,
+    make_range,
+)
+from muffinscript.lists import MuffinList
+from muffinscript.output import (
+    OUTPUT,
+    sleep,
+)
+from muffinscript.parallel import run_parallel_loop
+from muffinscript.vector import (
+    array_type_name,
+    reduce_list,
+)
+
+# A compiled node: called with the frame's values, returns the node's value (statements return None)
+Compiled = Callable[[list[Any]], Any]
+
+
+def run_program(program: list[Any], frame: Frame):
+    """Compiles resolved top-level nodes into closures once, then runs them against the frame's values."""
+    compiled = compile_program(program)
+    compiled(frame.values)
+
+
+def compile_program(program: list[Any]) -> Compiled:
+    """Compiles resolved top-level nodes into a single closure.
+
+    Every node becomes a closure specialized for its shape, eg: `a + b` over two variables becomes a closure that
+    reads both slots and calls the operator directly. Nothing is looked up by node type once compiled.
+    """
+    return _compile_block([(node, node.line_number) for node in program if node])
+
+
+def _compile_block(statements: list[tuple[Any, int]]) -> Compiled:
+    """Compiles statements (paired with the line they report errors on) to run one after another."""
+    compiled = tuple(_compile(statement, line_number) for statement, line_number in statements)
+    if len(compiled) == 1:
+        return compiled[0]
+
+    def run_block(values):
+        for statement in compiled:
+            statement(values)
+
+    return run_block
+
+
+def _compile_body(body: list[Any]) -> Compiled:
+    """Block bodies report errors on the line of each of their own statements."""
+    return _compile_block([(statement, statement.line_number) for statement in body])
+
+
+def _compile(node: Any, line_number: int) -> Compiled:
+    """Compiles a single node (and everything beneath it) into a closure."""
+    compiler = _COMPILERS.get(node.__class__)
+    if compiler is None:
+        for node_class in type(node).__mro__[1:]:
+            if node_class in _COMPILERS:
+                return _COMPILERS[node_class](node, line_number)
+        # Raw Python values pass straight through, as they do when evaluated
+        return _constant(node)
+    return compiler(node, line_number)
+
+
+def _constant(value: Any) -> Compiled:
+    def constant(values):
+        return value
+
+    return constant
+
+
+def _compile_literal(node: Any, line_number: int) -> Compiled:
+    return _constant(node.value)
+
+
+def _compile_variable(node: VariableNode, line_number: int) -> Compiled:
+    slot = node.slot
+
+    def read(values):
+        value = values[slot]
+        if value is UNSET:
+            raise MuffinScriptRuntimeError(UNDEFINED_VARIABLE, line_number)
+        return value
+
+    return read
+
+
+def _compile_print(node: PrintNode, line_number: int) -> Compiled:
+    expression = _compile(node.value, line_number)
+    write = OUTPUT.write
+
+    def run_print(values):
+        write(expression(values))
+
+    return run_print
+
+
+def _compile_assign(node: AssignNode, line_number: int) -> Compiled:
+    slot = node.slot
+    expression = _compile(node.expression, line_number)
+
+    def assign(values):
+        values[slot] = expression(values)
+
+    return assign
+
+
+def _compile_arithmetic(node: ArithmeticNode, line_number: int) -> Compiled:
+    operation = SUPPORTED_OPERATORS[node.operator]
+    left_node, right_node = node.left, node.right
+    left_is_variable = isinstance(left_node, VariableNode)
+    right_is_variable = isinstance(right_node, VariableNode)
+    left_is_constant = isinstance(left_node, _LITERAL_NODES)
+    right_is_constant = isinstance(right_node, _LITERAL_NODES)
+
+    if left_is_variable and right_is_variable:
+        left_slot, right_slot = left_node.slot, right_node.slot
+
+        def variable_variable(values):
+            left = values[left_slot]
+            right = values[right_slot]
+            if left is UNSET or right is UNSET:
+                raise MuffinScriptRuntimeError(UNDEFINED_VARIABLE, line_number)
+            try:
+                return operation(left, right)
+            except MuffinScriptRuntimeError as error:
+                raise with_line_number(error, line_number)
+
+        return variable_variable
+    elif left_is_variable and right_is_constant:
+        left_slot, right_value = left_node.slot, right_node.value
+
+        def variable_constant(values):
+            left = values[left_slot]
+            if left is UNSET:
+                raise MuffinScriptRuntimeError(UNDEFINED_VARIABLE, line_number)
+            try:
+                return operation(left, right_value)
+            except MuffinScriptRuntimeError as error:
+                raise with_line_number(error, line_number)
+
+        return variable_constant
+    elif left_is_constant and right_is_variable:
+        left_value, right_slot = left_node.value, right_node.slot
+
+        def constant_variable(values):
+            right = values[right_slot]
+            if right is UNSET:
+                raise MuffinScriptRuntimeError(UNDEFINED_VARIABLE, line_number)
+            try:
+                return operation(left_value, right)
+            except MuffinScriptRuntimeError as error:
+                raise with_line_number(error, line_number)
+
+        return constant_variable
+
+    left_expression = _compile(left_node, line_number)
+    right_expression = _compile(right_node, line_number)
+
+    def arithmetic(values):
+        try:
+            return operation(left_expression(values), right_expression(values))
+        except MuffinScriptRuntimeError as error:
+            raise with_line_number(error, line_number)
+
+    return arithmetic
+
+
+def _compile_interpolation(node: InterpolationNode, line_number: int) -> Compiled:
+    parts = tuple(_constant(part) if isinstance(part, str) else _compile(part, line_number) for part in node.parts)
+
+    def interpolate(values):
+        return "".join([str(part(values)) for part in parts])
+
+    return interpolate
+
+
+def _compile_cat(node: CatNode, line_number: int) -> Compiled:
+    args = tuple(_compile(arg, line_number) for arg in node.args)
+
+    def cat(values):
+        return "".join([str(arg(values)) for arg in args])
+
+    return cat
+
+
+def _compile_list(node: ListNode, line_number: int) -> Compiled:
+    items = tuple(_compile(item, line_number) for item in node.items)
+
+    def build_list(values):
+        return MuffinList([item(values) for item in items])
+
+    return build_list
+
+
+def _compile_range(node: RangeNode, line_number: int) -> Compiled:
+    args = tuple(_compile(arg, line_number) for arg in node.args)
+
+    def build_range(values):
+        return make_range([arg(values) for arg in args], line_number)
+
+    return build_range
+
+
+def _compile_reduction(node: ReductionNode, line_number: int) -> Compiled:
+    function = node.function
+    expression = _compile(node.value, line_number)
+
+    def reduction(values):
+        return reduce_list(function, expression(values), line_number)
+
+    return reduction
+
+
+def _compile_sleep(node: SleepNode, line_number: int) -> Compiled:
+    duration = _compile(node.duration, line_number)
+
+    def run_sleep(values):
+        sleep(duration(values))
+
+    return run_sleep
+
+
+def _compile_type_check(node: TypeCheckNode, line_number: int) -> Compiled:
+    expression = _compile(node.value, line_number)
+
+    def type_check(values):
+        value = expression(values)
+        muffin_type = PYTHON_TO_MUFFIN_TYPES.get(type(value))
+        return array_type_name(value) if muffin_type is None else muffin_type
+
+    return type_check
+
+
+def _compile_string_coerce(node: StringCoerceNode, line_number: int) -> Compiled:
+    expression = _compile(node.value, line_number)
+
+    def string_coerce(values):
+        return str(expression(values))
+
+    return string_coerce
+
+
+def _compile_number_coerce(node: IntCoerceNode | FloatCoerceNode, line_number: int) -> Compiled:
+    to_type = int if isinstance(node, IntCoerceNode) else float
+    expression = _compile(node.value, line_number)
+
+    def number_coerce(values):
+        return coerce_number(to_type, expression(values), line_number)
+
+    return number_coerce
+
+
+def _compile_if(node: IfNode, line_number: int) -> Compiled:
+    condition = _compile(node.condition, line_number)
+    body = _compile_body(node.body) if node.body else None
+    else_body = _compile_body(node.else_body) if node.else_body else None
+
+    def run_if(values):
+        if condition(values):
+            if body:
+                body(values)
+        elif else_body:
+            else_body(values)
+
+    return run_if
+
+
+def _compile_for_loop(node: ForLoopNode, line_number: int) -> Compiled:
+    item_slot = node.item_slot
+    iterable_expression = _compile(node.iterable, line_number)
+    body = _compile_body(node.body) if node.body else _constant(None)
+
+    def run_for_loop(values):
+        iterable = iterable_expression(values)
+        if not isinstance(iterable, ITERABLE_TYPES):
+            raise MuffinScriptRuntimeError(UNSUPPORTED_STATEMENT, line_number)
+        for item in iterable:
+            values[item_slot] = item
+            body(values)
+
+    return run_for_loop
+
+
+def _compile_parallel_loop(node: ParallelForLoopNode, line_number: int) -> Compiled:
+    iterable_expression = _compile(node.iterable, line_number)
+
+    def run_parallel_loop_node(values):
+        run_parallel_loop(node, iterable_expression(values), values, line_number)
+
+    return run_parallel_loop_node
+
+
+_LITERAL_NODES = (IntNode, FloatNode, StringNode, BoolNode, NullNode, ConstantNode)
+_COMPILERS: dict[type, Callable[[Any, int], Compiled]] = {
+    VariableNode: _compile_variable,
+    PrintNode: _compile_print,
+    AssignNode: _compile_assign,
+    StringNode: _compile_literal,
+    InterpolationNode: _compile_interpolation,
+    IntNode: _compile_literal,
+    FloatNode: _compile_literal,
+    BoolNode: _compile_literal,
+    NullNode: _compile_literal,
+    ConstantNode: _compile_literal,
+    ListNode: _compile_list,
+    ForLoopNode: _compile_for_loop,
+    ParallelForLoopNode: _compile_parallel_loop,
+    ArithmeticNode: _compile_arithmetic,
+    CatNode: _compile_cat,
+    RangeNode: _compile_range,
+    ReductionNode: _compile_reduction,
+    SleepNode: _compile_sleep,
+    TypeCheckNode: _compile_type_check,
+    StringCoerceNode: _compile_string_coerce,
+    IntCoerceNode: _compile_number_coerce,
+    FloatCoerceNode: _compile_number_coerce,
+    IfNode: _compile_if,
+}
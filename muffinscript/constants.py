@@ -1,11 +1,25 @@
 import operator
 import os
 
+from muffinscript.lists import MuffinList
+
 # Env Vars
 MUFFIN_DEBUG = os.getenv("MUFFIN_DEBUG")
+MUFFIN_ENGINE = os.getenv("MUFFIN_ENGINE", "tree")  # `tree` (default, reference), `closure`, `python` or `bytecode`
+MUFFIN_OPTIMIZE = os.getenv("MUFFIN_OPTIMIZE", "true") != "false"
+MUFFIN_CACHE = os.getenv("MUFFIN_CACHE", "true") != "false"
+MUFFIN_CACHE_DIR = os.getenv("MUFFIN_CACHE_DIR")  # Defaults to `__muffincache__` next to each script
+# Execution limits for every run, 0 (default) means unlimited
+MUFFIN_MAX_STEPS = int(os.getenv("MUFFIN_MAX_STEPS", "0"))
+MUFFIN_TIMEOUT = float(os.getenv("MUFFIN_TIMEOUT", "0"))  # Seconds
+MUFFIN_MAX_LIST = int(os.getenv("MUFFIN_MAX_LIST", "0"))
+MUFFIN_MAX_STRING = int(os.getenv("MUFFIN_MAX_STRING", "0"))
+MUFFIN_WORKERS = int(os.getenv("MUFFIN_WORKERS", "0"))  # Processes that run `pfor` loops, 0 (default) is one per CPU
 
 # Supported constants
-SUPPORTED_TYPES = str | int | float | bool | list | None
+SUPPORTED_TYPES = str | int | float | bool | list | range | None
+# What a for loop can iterate over, ranges are walked lazily without building a list
+ITERABLE_TYPES = (list, range)
 SUPPORTED_STATEMENTS = set(
     [
         "cat",
@@ -29,6 +43,20 @@ SUPPORTED_OPERATORS = {
     "<": operator.lt,
     "<=": operator.le,
 }
+# Binding strength of each operator, higher binds tighter. All operators are left associative.
+OPERATOR_PRECEDENCE = {
+    "==": 1,
+    "!=": 1,
+    ">": 1,
+    ">=": 1,
+    "<": 1,
+    "<=": 1,
+    "+": 2,
+    "-": 2,
+    "*": 3,
+    "/": 3,
+    "%": 3,
+}
 
 # Mappings
 PYTHON_TO_MUFFIN_TYPES = {
@@ -37,6 +65,8 @@ PYTHON_TO_MUFFIN_TYPES = {
     float: "float",
     bool: "bool",
     list: "list",
+    MuffinList: "list",
+    range: "range",
     type(None): "null",
 }
 
@@ -45,7 +75,19 @@ INVALID_COERCION = "Invalid coercion, could not convert to type"
 INVALID_CONCATENATION = "Invalid concatenation, only strings allowed"
 INVALID_EXPRESSION = "Invalid expression"
 INVALID_FLOAT = "Invalid float"
+INVALID_PARALLEL_LOOP = (
+    "Invalid parallel loop, it can't assign variables used outside of it and its loop variables can only be read "
+    "inside their loops"
+)
+INVALID_REDUCTION = "Invalid reduction, only lists and ranges allowed and they can't be empty"
+INVALID_RANGE = "Invalid range, only integers allowed and the step can't be zero"
+LIST_LENGTH_MISMATCH = "Element-wise operations need lists of the same length"
+LIST_LIMIT_EXCEEDED = "List length limit exceeded"
+STEP_LIMIT_EXCEEDED = "Step limit exceeded"
+STRING_LIMIT_EXCEEDED = "String length limit exceeded"
+TIME_LIMIT_EXCEEDED = "Time limit exceeded"
 UNDEFINED_VARIABLE = "Undefined variable"
+UNSUPPORTED_ENGINE = "Unsupported engine"
 UNSUPPORTED_STATEMENT = "Unsupported statement"
 UNTERMINATED_STRINGS = "Unterminated string"
 
@@ -0,0 +1,75 @@
+from functools import partial
+from typing import (
+    Any,
+    Callable,
+)
+
+from muffinscript import (
+    bytecode,
+    closure,
+    interpreter,
+    transpiler,
+)
+from muffinscript.constants import (
+    MUFFIN_ENGINE,
+    UNSUPPORTED_ENGINE,
+)
+from muffinscript.errors import MuffinScriptRuntimeError
+from muffinscript.frame import Frame
+from muffinscript.limits import (
+    DEFAULT_LIMITS,
+    Limits,
+    enforcing,
+)
+from muffinscript.output import OUTPUT
+
+# Every engine runs resolved top-level nodes against a frame and must behave exactly like the tree walker
+ENGINES: dict[str, Callable[[list[Any], Frame], None]] = {
+    "tree": interpreter.run_program,
+    "closure": closure.run_program,
+    "python": transpiler.run_program,
+    "bytecode": bytecode.run_program,
+}
+
+# Every engine's one-off work for a resolved program (compiling it, for most), returning what runs it against a frame
+COMPILERS: dict[str, Callable[[list[Any]], Callable[[Frame], None]]] = {
+    "tree": lambda program: partial(interpreter.run_program, program),
+    "closure": lambda program: _run_closure(closure.compile_program(program)),
+    "python": lambda program: transpiler.transpile(program).run,
+    "bytecode": lambda program: partial(bytecode.execute, bytecode.compile_program(program)),
+}
+
+
+def run_program(program: list[Any], frame: Frame, engine: str | None = None, limits: Limits | None = None):
+    """Runs resolved top-level nodes with the given engine, or the one picked with `MUFFIN_ENGINE`.
+
+    Printed output is buffered for the duration of the run and written out in full when it ends, even on errors.
+    Only the tree walker enforces limits, so runs with any (`limits`, or `MUFFIN_MAX_STEPS` and friends) use it. Every
+    run has a budget of its own, even one started from inside another run.
+    """
+    engine = engine or MUFFIN_ENGINE
+    if engine not in ENGINES:
+        raise MuffinScriptRuntimeError(f"{UNSUPPORTED_ENGINE}: {engine}", 0)
+    limits = limits or DEFAULT_LIMITS
+    if limits:
+        engine = "tree"
+    with OUTPUT.buffering(), enforcing(limits):
+        ENGINES[engine](program, frame)
+
+
+def compile_program(program: list[Any], engine: str | None = None) -> Callable[[Frame], None]:
+    """Compiles resolved top-level nodes for an engine once, the result can then run against any number of frames.
+
+    Every frame it runs against must use the slots the program was resolved with.
+    """
+    engine = engine or MUFFIN_ENGINE
+    if engine not in COMPILERS:
+        raise MuffinScriptRuntimeError(f"{UNSUPPORTED_ENGINE}: {engine}", 0)
+    return COMPILERS[engine](program)
+
+
+def _run_closure(compiled: closure.Compiled) -> Callable[[Frame], None]:
+    def run(frame: Frame):
+        compiled(frame.values)
+
+    return run
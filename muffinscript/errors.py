@@ -25,6 +25,10 @@ class MuffinScriptSyntaxError(MuffinScriptBaseError):
         self.line_number = line_number
         super().__init__(message)
 
+    def __reduce__(self):
+        # Errors raised in `pfor` worker processes are pickled back to the parent
+        return type(self), (self.message, self.line_number)
+
     def __str__(self):
         return f"\033[31mSYNTAX ERROR\033[0m - {self.message} | line: {self.line_number}"
 
@@ -40,10 +44,24 @@ class MuffinScriptRuntimeError(MuffinScriptBaseError):
         self.line_number = line_number
         super().__init__(message)
 
+    def __reduce__(self):
+        return type(self), (self.message, self.line_number)
+
     def __str__(self):
         return f"\033[31mRUNTIME ERROR\033[0m - {self.message} | line: {self.line_number}"
 
 
+class MuffinScriptLimitError(MuffinScriptRuntimeError):
+    """Thrown if a run goes over one of its execution limits (steps, time, list or string length)."""
+
+
+def with_line_number(error: MuffinScriptRuntimeError, line_number: int) -> MuffinScriptRuntimeError:
+    """Fills in the line of an error raised where the line isn't known (eg: list arithmetic), returns the error."""
+    if not error.line_number:
+        error.line_number = line_number
+    return error
+
+
 def output_error(message: str):
     """Don't print stacktrace, just print message to console and exit."""
     print(message)
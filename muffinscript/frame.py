@@ -0,0 +1,69 @@
+from typing import Any
+
+from muffinscript.constants import SUPPORTED_TYPES
+from muffinscript.lists import to_muffin_list
+
+
+class _Unset:
+    """Marks a slot whose variable has not been assigned yet, `null` is a valid value so None can't be used."""
+
+    def __repr__(self):
+        return "UNSET"
+
+    def __reduce__(self):
+        # Pickle by reference so identity checks still hold in other processes
+        return "UNSET"
+
+
+UNSET = _Unset()
+
+
+class Frame:
+    """Variable storage for a running program.
+
+    The resolver hands every variable name a slot once, after which reads and writes are list indexing. Name based
+    access is still available for the few places that only know a variable by name (eg: string interpolation).
+    Lists set by name (eg: variables passed in by the host) are stored as `MuffinList`.
+    """
+
+    __slots__ = ("symbols", "values")
+
+    def __init__(self, variables: dict[str, SUPPORTED_TYPES] | None = None):
+        self.symbols: dict[str, int] = {}
+        self.values: list[Any] = []
+        if variables:
+            for name, value in variables.items():
+                self[name] = value
+
+    def slot(self, name: str) -> int:
+        """Returns the slot of a variable, reserving a new (unset) one the first time a name is seen."""
+        slot = self.symbols.get(name)
+        if slot is None:
+            slot = self.symbols[name] = len(self.values)
+            self.values.append(UNSET)
+        return slot
+
+    def to_dict(self) -> dict[str, SUPPORTED_TYPES]:
+        """Returns every assigned variable by name."""
+        return {name: self.values[slot] for name, slot in self.symbols.items() if self.values[slot] is not UNSET}
+
+    def get(self, name: str, default: Any = None) -> Any:
+        slot = self.symbols.get(name)
+        if slot is None or self.values[slot] is UNSET:
+            return default
+        return self.values[slot]
+
+    def __getitem__(self, name: str) -> SUPPORTED_TYPES:
+        value = self.get(name, UNSET)
+        if value is UNSET:
+            raise KeyError(name)
+        return value
+
+    def __setitem__(self, name: str, value: SUPPORTED_TYPES):
+        self.values[self.slot(name)] = to_muffin_list(value)
+
+    def __contains__(self, name: Any) -> bool:
+        return self.get(name, UNSET) is not UNSET
+
+    def __repr__(self):
+        return f"Frame({self.to_dict()!r})"
@@ -1,26 +1,46 @@
-import re
-import time
-from typing import Any
+import operator
+from typing import (
+    Any,
+    Callable,
+    cast,
+)
 
 from muffinscript.ast import (
     ArithmeticNode,
     AssignNode,
+    BaseNode,
     BoolNode,
     CatNode,
+    ConstantNode,
     FloatNode,
     IntNode,
     NullNode,
     PrintNode,
     SleepNode,
     StringNode,
+    VariableNode,
 )
 from muffinscript.ast.base import (
     ForLoopNode,
     IfNode,
+    ParallelForLoopNode,
+)
+from muffinscript.ast.standard_lib import (
+    FloatCoerceNode,
+    IntCoerceNode,
+    RangeNode,
+    ReductionNode,
+    StringCoerceNode,
+    TypeCheckNode,
+)
+from muffinscript.ast.types import (
+    InterpolationNode,
+    ListNode,
 )
-from muffinscript.ast.standard_lib import TypeCheckNode
-from muffinscript.ast.types import ListNode
 from muffinscript.constants import (
+    INVALID_COERCION,
+    INVALID_RANGE,
+    ITERABLE_TYPES,
     PYTHON_TO_MUFFIN_TYPES,
     SUPPORTED_OPERATORS,
     SUPPORTED_TYPES,
@@ -28,84 +48,414 @@ from muffinscript.constants import (
     UNSUPPORTED_STATEMENT,
 )
 from muffinscript.errors import (
-    MuffinScriptBaseError,
     MuffinScriptRuntimeError,
+    with_line_number,
+)
+from muffinscript.frame import (
+    UNSET,
+    Frame,
+)
+from muffinscript.limits import (
+    BUDGET,
+    Budget,
+    checked_multiply,
 )
+from muffinscript.lists import MuffinList
+from muffinscript.output import (
+    OUTPUT,
+    sleep,
+)
+from muffinscript.parallel import run_parallel_loop
+from muffinscript.vector import (
+    array_type_name,
+    reduce_list,
+)
+
+
+def run_program(program: list[Any], frame: Frame):
+    """Runs resolved top-level nodes in order by walking the tree, this is the reference engine."""
+    for node in program:
+        if node:
+            execute(node, frame, node.line_number)
+
 
+def execute(node: Any, variables: Frame | dict[str, SUPPORTED_TYPES], line_number: int):
+    """Runs a statement for its effect, nothing is returned or collected along the way.
 
-def evaluate(node: Any, variables: dict[str, SUPPORTED_TYPES], line_number: int) -> SUPPORTED_TYPES:
-    """Evaluates tokens to determine what to run."""
-    if isinstance(node, PrintNode):
-        print(evaluate(node.value, variables, line_number))
-    elif isinstance(node, AssignNode):
-        variables[node.var_name] = evaluate(node.expression, variables, line_number)
-        return variables[node.var_name]
-    elif isinstance(node, StringNode):
-        if node.value in variables:
-            return variables[str(node.value)]
-        # String interpolation
-        variables_to_replace = re.findall(r"#\{(.*?)}", str(node.value))
-        if variables_to_replace:
-            for var in variables_to_replace:
-                if var in variables:
-                    node.value = str(node.value).replace(f"#{{{var}}}", str(variables[var]))
-                else:
-                    raise MuffinScriptRuntimeError(UNDEFINED_VARIABLE, line_number)
-        return node.value
-    elif isinstance(node, IntNode):
-        return node.value
-    elif isinstance(node, FloatNode):
-        return node.value
-    elif isinstance(node, BoolNode):
-        return node.value
-    elif isinstance(node, NullNode):
-        return node.value
-    elif isinstance(node, ListNode):
-        return [evaluate(item, variables, line_number) for item in node.items]
-    elif isinstance(node, ForLoopNode):
-        if isinstance(node.iterable, str) and node.iterable in variables:
-            iterable = variables[node.iterable]
+    Statements with an executor of their own (assignments, output, sleep, branches and loops) skip building a value
+    entirely, anything else is an expression statement that is evaluated and thrown away.
+    """
+    budget = BUDGET.get()
+    if budget is not None:
+        budget.charge(1, line_number)
+    executor = _EXECUTORS.get(node.__class__)
+    if executor is None:
+        evaluate(node, variables, line_number)
+    else:
+        executor(node, variables, line_number)
+
+
+def evaluate(node: Any, variables: Frame | dict[str, SUPPORTED_TYPES], line_number: int) -> SUPPORTED_TYPES:
+    """Evaluates tokens to determine what to run.
+
+    Each node class has its own evaluator, found with a single lookup on the node's type. Resolved variables are
+    read and written through their frame slot, nodes that were never resolved (eg: built by hand) fall back to
+    looking the variable up by name. Expressions don't recurse, see `_evaluate_expression`.
+    """
+    evaluator = _EVALUATORS.get(node.__class__)
+    if evaluator is None:
+        return _evaluate_other(node, variables, line_number)
+    return evaluator(node, variables, line_number)
+
+
+def postfix(node: Any) -> list[tuple[int, Any]]:
+    """Flattens an expression into the steps that compute it, children before the node that combines them.
+
+    The tree is walked with an explicit work stack so nesting depth never touches the Python stack. Every node
+    becomes exactly one `(step, operand)` pair, literal text in interpolated strings is kept on its node's step.
+    """
+    steps: list[tuple[int, Any]] = []
+    work: list[Any] = [node]
+    while work:
+        item = work.pop()
+        if item.__class__ is _Step:
+            steps.append(item.step)
+            continue
+        node_class = item.__class__
+        if node_class is VariableNode and item.slot is not None:
+            steps.append((_LOAD, item.slot))
+        elif node_class in _LITERAL_NODES:
+            steps.append((_PUSH, item.value))
+        elif node_class is ArithmeticNode:
+            # Pushed in reverse so the left operand is flattened (and so evaluated) first
+            work.append(_Step((_OPERATE, SUPPORTED_OPERATORS[item.operator])))
+            work.append(item.right)
+            work.append(item.left)
+        elif node_class is ListNode:
+            work.append(_Step((_BUILD_LIST, len(item.items))))
+            work.extend(reversed(item.items))
+        elif node_class is CatNode:
+            work.append(_Step((_JOIN, len(item.args))))
+            work.extend(reversed(item.args))
+        elif node_class is RangeNode:
+            work.append(_Step((_RANGE, len(item.args))))
+            work.extend(reversed(item.args))
+        elif node_class is InterpolationNode:
+            template = tuple(part if isinstance(part, str) else None for part in item.parts)
+            work.append(_Step((_INTERPOLATE, template)))
+            work.extend(reversed([part for part in item.parts if not isinstance(part, str)]))
+        elif node_class is ReductionNode:
+            work.append(_Step((_REDUCE, item.function)))
+            work.append(item.value)
+        elif node_class is TypeCheckNode:
+            work.append(_Step((_TYPE_OF, None)))
+            work.append(item.value)
+        elif node_class is StringCoerceNode:
+            work.append(_Step((_COERCE, str)))
+            work.append(item.value)
+        elif node_class is IntCoerceNode:
+            work.append(_Step((_COERCE, int)))
+            work.append(item.value)
+        elif node_class is FloatCoerceNode:
+            work.append(_Step((_COERCE, float)))
+            work.append(item.value)
         else:
-            iterable = node.iterable
-        if not isinstance(iterable, list):
-            raise MuffinScriptRuntimeError(UNSUPPORTED_STATEMENT, line_number)
-        results = []
+            # Subclassed nodes, raw names and raw values keep the regular lookup
+            steps.append((_EVALUATE, item))
+    return steps
+
+
+def _evaluate_expression(node: Any, variables: Any, line_number: int) -> SUPPORTED_TYPES:
+    """Evaluates an expression by running its postfix steps against a value stack.
+
+    The steps are flattened on first use and kept on the node, so a loop body pays for the walk only once. Runs
+    with limits count every step and run the steps from `guarded_postfix` instead.
+    """
+    try:
+        steps = node.postfix
+    except AttributeError:
+        steps = node.postfix = postfix(node)
+    budget = BUDGET.get()
+    if budget is not None:
+        budget.charge(len(steps), line_number)
+        steps = guarded_postfix(node, steps)
+    values = variables.values
+    stack: list[Any] = []
+    push = stack.append
+    pop = stack.pop
+    for step, operand in steps:
+        if step == _LOAD:
+            value = values[operand]
+            if value is UNSET:
+                raise MuffinScriptRuntimeError(UNDEFINED_VARIABLE, line_number)
+            push(value)
+        elif step == _OPERATE:
+            right = pop()
+            try:
+                stack[-1] = operand(stack[-1], right)
+            except MuffinScriptRuntimeError as error:
+                raise with_line_number(error, line_number)
+        elif step == _PUSH:
+            push(operand)
+        elif step == _BUILD_LIST:
+            items = stack[len(stack) - operand :]
+            del stack[len(stack) - operand :]
+            push(MuffinList(items))
+        elif step == _JOIN:
+            items = stack[len(stack) - operand :]
+            del stack[len(stack) - operand :]
+            push("".join([str(item) for item in items]))
+        elif step == _RANGE:
+            args = stack[len(stack) - operand :]
+            del stack[len(stack) - operand :]
+            push(make_range(args, line_number))
+        elif step == _INTERPOLATE:
+            count = operand.count(None)
+            filled = iter(stack[len(stack) - count :])
+            del stack[len(stack) - count :]
+            push("".join([str(next(filled)) if part is None else part for part in operand]))
+        elif step == _COERCE:
+            stack[-1] = str(stack[-1]) if operand is str else coerce_number(operand, stack[-1], line_number)
+        elif step == _REDUCE:
+            stack[-1] = reduce_list(operand, stack[-1], line_number)
+        elif step == _TYPE_OF:
+            muffin_type = PYTHON_TO_MUFFIN_TYPES.get(type(stack[-1]))
+            stack[-1] = array_type_name(stack[-1]) if muffin_type is None else muffin_type
+        elif step == _CHECK_SIZE:
+            if budget is not None:
+                budget.check_size(stack[-1], line_number)
+        elif step == _CHARGE_ITEMS:
+            if budget is not None:
+                for value in stack[len(stack) - operand :]:
+                    budget.charge_items(value, line_number)
+        else:
+            push(evaluate(operand, variables, line_number))
+    if budget is not None:
+        budget.check_size(stack[0], line_number)
+    return stack[0]
+
+
+def guarded_postfix(node: Any, steps: list[tuple[int, Any]]) -> list[tuple[int, Any]]:
+    """The steps of an expression for runs with limits, kept on the node like its postfix steps.
+
+    Repetition (`"a" * 1000`) is checked before it runs, and every string or list a step builds is checked as soon as
+    it's built. Checking only the final value would let a huge string through inside a list (eg: `[cat(s, s)]`).
+    Arithmetic on lists and reductions count a step for every item they work through, before they start.
+    """
+    try:
+        return node.guarded_postfix
+    except AttributeError:
+        guarded: list[tuple[int, Any]] = []
+        for step, operand in steps:
+            if step == _OPERATE:
+                guarded.append((_CHARGE_ITEMS, 2))
+            elif step == _REDUCE:
+                guarded.append((_CHARGE_ITEMS, 1))
+            guarded.append((step, checked_multiply if operand is operator.mul else operand))
+            if step in _BUILDING_STEPS:
+                guarded.append((_CHECK_SIZE, None))
+        node.guarded_postfix = guarded
+        return guarded
+
+
+def _evaluate_variable(node: VariableNode, variables: Any, line_number: int) -> SUPPORTED_TYPES:
+    if node.slot is None or isinstance(variables, dict):
+        # Nodes the resolver never saw and plain dicts of variables are looked up by name
+        value = variables.get(node.value, UNSET)
+    else:
+        value = variables.values[node.slot]
+    if value is UNSET:
+        raise MuffinScriptRuntimeError(UNDEFINED_VARIABLE, line_number)
+    return value
+
+
+def _evaluate_print(node: PrintNode, variables: Any, line_number: int) -> PrintNode:
+    OUTPUT.write(evaluate(node.value, variables, line_number))
+    return node
+
+
+def _evaluate_assign(node: AssignNode, variables: Any, line_number: int) -> SUPPORTED_TYPES:
+    value = evaluate(node.expression, variables, line_number)
+    if node.slot is None:
+        variables[node.var_name] = value
+    else:
+        variables.values[node.slot] = value
+    return value
+
+
+def _evaluate_literal(node: BaseNode, variables: Any, line_number: int) -> SUPPORTED_TYPES:
+    return node.value
+
+
+def _evaluate_sleep(node: SleepNode, variables: Any, line_number: int) -> SleepNode:
+    _execute_sleep(node, variables, line_number)
+    return node
+
+
+def _execute_print(node: PrintNode, variables: Any, line_number: int):
+    OUTPUT.write(evaluate(node.value, variables, line_number))
+
+
+def _execute_assign(node: AssignNode, variables: Any, line_number: int):
+    value = evaluate(node.expression, variables, line_number)
+    if node.slot is None:
+        variables[node.var_name] = value
+    else:
+        variables.values[node.slot] = value
+
+
+def _execute_sleep(node: SleepNode, variables: Any, line_number: int):
+    seconds = cast(float, evaluate(node.duration, variables, line_number))
+    budget = BUDGET.get()
+    if budget is None:
+        sleep(seconds)
+    else:
+        budget.sleep(seconds, line_number)
+
+
+def _execute_if(node: IfNode, variables: Any, line_number: int):
+    if evaluate(node.condition, variables, line_number):
+        for statement in node.body:
+            execute(statement, variables, statement.line_number)
+    elif node.else_body:
+        for statement in node.else_body:
+            execute(statement, variables, statement.line_number)
+
+
+def _execute_for_loop(node: ForLoopNode, variables: Any, line_number: int):
+    if isinstance(node.iterable, BaseNode):
+        iterable = evaluate(node.iterable, variables, line_number)
+    elif isinstance(node.iterable, str) and node.iterable in variables:
+        iterable = variables[node.iterable]
+    else:
+        iterable = node.iterable
+    if not isinstance(iterable, ITERABLE_TYPES):
+        raise MuffinScriptRuntimeError(UNSUPPORTED_STATEMENT, line_number)
+    body = node.body
+    budget = BUDGET.get()
+    if budget is not None:
+        _execute_limited_loop(node, iterable, variables, line_number, budget)
+        return
+    if node.item_slot is None:
         for item in iterable:
             variables[node.item_name] = item
-            for body_line in node.body:
-                results.append(evaluate(body_line, variables, line_number))
-        return results
-    elif isinstance(node, ArithmeticNode):
-        left = evaluate(node.left, variables, line_number)
-        right = evaluate(node.right, variables, line_number)
-        return SUPPORTED_OPERATORS[node.operator](left, right)
-    elif isinstance(node, CatNode):
-        return "".join([str(evaluate(arg, variables, line_number)) for arg in node.args])
-    elif isinstance(node, SleepNode):
-        time.sleep(evaluate(node.duration, variables, line_number))  # type: ignore
-    elif isinstance(node, TypeCheckNode):
-        python_type = type(evaluate(node.value, variables, line_number))
-        muffin_type = PYTHON_TO_MUFFIN_TYPES.get(python_type)
-        if muffin_type is None:
-            raise MuffinScriptBaseError()
-        return muffin_type
-    elif isinstance(node, IfNode):
-        condition = evaluate(node.condition, variables, line_number)
-        results = []
-        if condition:
-            for statement in node.body:
-                results.append(evaluate(statement, variables, line_number))
-        elif node.else_body:
-            for statement in node.else_body:
-                results.append(evaluate(statement, variables, line_number))
-        return results
-    elif node in variables:
+            for statement in body:
+                execute(statement, variables, statement.line_number)
+        return
+    # Ranges are iterated as is, each item goes straight into its slot without a list ever being built
+    values = variables.values
+    item_slot = node.item_slot
+    for item in iterable:
+        values[item_slot] = item
+        for statement in body:
+            execute(statement, variables, statement.line_number)
+
+
+def _execute_parallel_loop(node: ParallelForLoopNode, variables: Any, line_number: int):
+    run_parallel_loop(node, evaluate(node.iterable, variables, line_number), variables.values, line_number)
+
+
+def _execute_limited_loop(node: ForLoopNode, iterable: Any, variables: Any, line_number: int, budget: Budget):
+    """Runs a loop with limits, every iteration counts as a step so not even an empty body can run forever."""
+    for item in iterable:
+        budget.charge(1, line_number)
+        if node.item_slot is None:
+            variables[node.item_name] = item
+        else:
+            variables.values[node.item_slot] = item
+        for statement in node.body:
+            execute(statement, variables, statement.line_number)
+
+
+def _evaluate_other(node: Any, variables: Any, line_number: int) -> SUPPORTED_TYPES:
+    """Handles anything without an evaluator of its own: subclassed nodes, raw variable names and raw values."""
+    for node_class in type(node).__mro__[1:]:
+        if node_class in _EVALUATORS:
+            return _EVALUATORS[node_class](node, variables, line_number)
+    if node in variables:
         return variables[node]
     elif isinstance(node, str):
         # If we got here, we have an undefined variable
         raise MuffinScriptRuntimeError(UNDEFINED_VARIABLE, line_number)
-    else:
-        # If we got here, it's a passthrough Python type and we move on
-        pass
-
+    # If we got here, it's a passthrough Python type and we move on
     return node
+
+
+def make_range(args: list[SUPPORTED_TYPES], line_number: int) -> range:
+    """Builds the lazy range for `range(stop)`, `range(start, stop)` or `range(start, stop, step)`."""
+    if not all(type(arg) is int for arg in args) or (len(args) == 3 and args[2] == 0):
+        raise MuffinScriptRuntimeError(INVALID_RANGE, line_number)
+    return range(*cast(list[int], args))
+
+
+def coerce_number(to_type: type, value: SUPPORTED_TYPES, line_number: int) -> SUPPORTED_TYPES:
+    """Coerces a variable's value to a number, only strings and numbers can be coerced."""
+    if not isinstance(value, (str, int, float)):
+        raise MuffinScriptRuntimeError(INVALID_COERCION, line_number)
+    try:
+        return to_type(value)
+    except ValueError:
+        raise MuffinScriptRuntimeError(INVALID_COERCION, line_number)
+
+
+class _Step:
+    """Marks a combining step on the work stack, to be emitted once the node's children have been flattened."""
+
+    __slots__ = ("step",)
+
+    def __init__(self, step: tuple[int, Any]):
+        self.step = step
+
+
+# Postfix steps, each paired with a single operand
+_LOAD = 0  # Push the variable in slot `operand`
+_PUSH = 1  # Push `operand` as is
+_OPERATE = 2  # Pop right then left, push `operand(left, right)`
+_BUILD_LIST = 3  # Pop `operand` items, push them as a list
+_JOIN = 4  # Pop `operand` items, push the concatenation of their `str()`
+_INTERPOLATE = 5  # Pop one item per `None` in the `operand` template and push the template filled in
+_COERCE = 6  # Coerce the top of the stack to the `operand` type
+_TYPE_OF = 7  # Replace the top of the stack with the name of its MuffinScript type
+_RANGE = 8  # Pop `operand` integers, push the range they describe
+_REDUCE = 9  # Replace the top of the stack with its `operand` reduction (eg: `sum`)
+_EVALUATE = 10  # Push `evaluate(operand)`, for anything flattening doesn't know about
+_CHECK_SIZE = 11  # Check the top of the stack against the run's size limits, only in `guarded_postfix`
+_CHARGE_ITEMS = 12  # Charge a step per item of the top `operand` lists and ranges, only in `guarded_postfix`
+
+# Steps that can build a string or list longer than any of their operands
+_BUILDING_STEPS = {_OPERATE, _BUILD_LIST, _JOIN, _INTERPOLATE, _COERCE}
+
+_LITERAL_NODES = {IntNode, FloatNode, StringNode, BoolNode, NullNode, ConstantNode}
+_EVALUATORS: dict[type, Callable[[Any, Any, int], Any]] = {
+    VariableNode: _evaluate_variable,
+    PrintNode: _evaluate_print,
+    AssignNode: _evaluate_assign,
+    StringNode: _evaluate_literal,
+    InterpolationNode: _evaluate_expression,
+    IntNode: _evaluate_literal,
+    FloatNode: _evaluate_literal,
+    BoolNode: _evaluate_literal,
+    NullNode: _evaluate_literal,
+    ConstantNode: _evaluate_literal,
+    ListNode: _evaluate_expression,
+    ForLoopNode: _execute_for_loop,
+    ParallelForLoopNode: _execute_parallel_loop,
+    ArithmeticNode: _evaluate_expression,
+    CatNode: _evaluate_expression,
+    RangeNode: _evaluate_expression,
+    ReductionNode: _evaluate_expression,
+    SleepNode: _evaluate_sleep,
+    TypeCheckNode: _evaluate_expression,
+    StringCoerceNode: _evaluate_expression,
+    IntCoerceNode: _evaluate_expression,
+    FloatCoerceNode: _evaluate_expression,
+    IfNode: _execute_if,
+}
+_EXECUTORS: dict[type, Callable[[Any, Any, int], None]] = {
+    PrintNode: _execute_print,
+    AssignNode: _execute_assign,
+    SleepNode: _execute_sleep,
+    IfNode: _execute_if,
+    ForLoopNode: _execute_for_loop,
+    ParallelForLoopNode: _execute_parallel_loop,
+}
@@ -1,3 +1,11 @@
+import mmap
+import os
+import sys
+from typing import (
+    IO,
+    Iterator,
+)
+
 from muffinscript.constants import (
     INVALID_FLOAT,
     SUPPORTED_TYPES,
@@ -5,6 +13,18 @@ from muffinscript.constants import (
     UNTERMINATED_STRINGS,
 )
 from muffinscript.errors import MuffinScriptSyntaxError
+from muffinscript.tokens import (
+    BOOL,
+    COMMA,
+    FLOAT,
+    INT,
+    NAME,
+    NULL,
+    OPERATOR,
+    PUNCTUATION_KINDS,
+    STRING,
+    Token,
+)
 
 
 def tokenize(
@@ -13,133 +33,143 @@ def tokenize(
 ) -> list[SUPPORTED_TYPES]:
     """Tokenize a line of code.
 
-    - Skip spaces, newlines, comments
+    - Skip spaces, newlines, comments and commas
     - Ensure all characters match what is supported, break into tokens, error if not
     """
-    tokens: list[SUPPORTED_TYPES] = []
-    i = 0
     stripped_input = input.replace("\n", "").strip()
+    return [
+        '"' + token.value + '"' if token.kind == STRING else token.value  # type:ignore
+        for token in _scan(stripped_input, line_number)
+        if token.kind != COMMA
+    ]
+
+
+def tokenize_source(source: str, line_number: int = 1) -> list[Token]:
+    """Tokenize an entire source buffer in a single pass.
+
+    Every token carries its kind, value, line and column so that nothing downstream needs to tokenize the
+    source again or count braces to find where a block ends.
+    """
+    return list(_scan(source, line_number))
 
-    while i < len(stripped_input):
+
+def iter_tokens(stream: IO | mmap.mmap, line_number: int = 1) -> Iterator[Token]:
+    """Lazily tokenize a file object or memory-mapped file one line at a time.
+
+    Only the current line is held in memory no matter how big the file is, bytes (such as from an mmap) are
+    decoded as UTF-8.
+    """
+    while line := stream.readline():
+        if isinstance(line, bytes):
+            line = line.decode()
+        yield from _scan(line, line_number)
+        line_number += 1
+
+
+def tokenize_file(path: str) -> Iterator[Token]:
+    """Lazily tokenize a file on disk by memory-mapping it, see `iter_tokens`."""
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield from iter_tokens(mapped)
+
+
+def _scan(source: str, line_number: int) -> Iterator[Token]:
+    """Walks the source one character at a time and yields positioned tokens, newlines advance the line."""
+    i = 0
+    line_start = 0
+
+    while i < len(source):
         try:
-            char = stripped_input[i]
+            char = source[i]
+            column = i - line_start + 1
             match char:
                 # Variables, Booleans, and Null
                 case _ if char.isalpha():
                     start = i
-                    while i < len(stripped_input) and (stripped_input[i].isalnum()):
+                    while i < len(source) and (source[i].isalnum()):
                         i += 1
-                    phrase = stripped_input[start:i]
+                    phrase = source[start:i]
                     if phrase == "true":
-                        tokens.append(True)
+                        yield Token(BOOL, True, line_number, column)
                     elif phrase == "false":
-                        tokens.append(False)
+                        yield Token(BOOL, False, line_number, column)
                     elif phrase == "null":
-                        tokens.append(None)
+                        yield Token(NULL, None, line_number, column)
                     else:
-                        tokens.append(phrase)
+                        yield Token(NAME, sys.intern(phrase), line_number, column)
                 # Strings
                 case '"' | "'":
                     start = i + 1
                     end = start
-                    while end < len(stripped_input) and (stripped_input[end] != '"' and stripped_input[end] != "'"):
+                    while end < len(source) and (source[end] != '"' and source[end] != "'" and source[end] != "\n"):
                         end += 1
-                    if end >= len(stripped_input):
+                    if end >= len(source) or source[end] == "\n":
                         raise MuffinScriptSyntaxError(UNTERMINATED_STRINGS, line_number)
-                    tokens.append('"' + stripped_input[start:end] + '"')
+                    yield Token(STRING, source[start:end], line_number, column)
                     i = end + 1
                 # Integers and Floats
                 case _ if char.isnumeric() or char == ".":
                     start = i
-                    while i < len(stripped_input) and (stripped_input[i].isnumeric() or stripped_input[i] == "."):
+                    while i < len(source) and (source[i].isnumeric() or source[i] == "."):
                         i += 1
-                    if stripped_input[start:i].count(".") == 0:
-                        tokens.append(int(stripped_input[start:i]))
-                    elif stripped_input[start:i].count(".") == 1:
+                    if source[start:i].count(".") == 0:
+                        yield Token(INT, int(source[start:i]), line_number, column)
+                    elif source[start:i].count(".") == 1:
                         try:
-                            tokens.append(float(stripped_input[start:i]))
+                            yield Token(FLOAT, float(source[start:i]), line_number, column)
                         except ValueError:
                             raise MuffinScriptSyntaxError(INVALID_FLOAT, line_number)
-                    elif stripped_input[start:i].count(".") > 1:
+                    elif source[start:i].count(".") > 1:
                         raise MuffinScriptSyntaxError(INVALID_FLOAT, line_number)
-                # Functions
-                case "(":
-                    tokens.append("(")
-                    i += 1
-                case ")":
-                    tokens.append(")")
-                    i += 1
-                case "{":
-                    tokens.append("{")
-                    i += 1
-                case "}":
-                    tokens.append("}")
-                    i += 1
-                # Lists
-                case "[":
-                    tokens.append("[")
-                    i += 1
-                case "]":
-                    tokens.append("]")
+                # Functions, Lists and Commas
+                case "(" | ")" | "{" | "}" | "[" | "]" | ",":
+                    yield Token(PUNCTUATION_KINDS[char], char, line_number, column)
                     i += 1
                 # Arithmetic Operators
-                case "+":
-                    tokens.append("+")
-                    i += 1
-                case "-":
-                    tokens.append("-")
-                    i += 1
-                case "*":
-                    tokens.append("*")
+                case "+" | "-" | "*" | "%":
+                    yield Token(OPERATOR, char, line_number, column)
                     i += 1
                 case "/":
                     # Comments
-                    if stripped_input[i + 1] == "/":
-                        break
+                    if source[i + 1] == "/":
+                        while i < len(source) and source[i] != "\n":
+                            i += 1
                     else:
-                        tokens.append("/")
+                        yield Token(OPERATOR, "/", line_number, column)
                         i += 1
-                case "%":
-                    tokens.append("%")
-                    i += 1
                 # Relational Operators
                 case "=":
-                    if stripped_input[i + 1] == "=":
-                        tokens.append("==")
+                    if source[i + 1] == "=":
+                        yield Token(OPERATOR, "==", line_number, column)
                         i += 2
                     else:
-                        tokens.append("=")
+                        yield Token(PUNCTUATION_KINDS["="], "=", line_number, column)
                         i += 1
                 case "!":
-                    if stripped_input[i + 1] == "=":
-                        tokens.append("!=")
+                    if source[i + 1] == "=":
+                        yield Token(OPERATOR, "!=", line_number, column)
                         i += 2
                     else:
                         raise MuffinScriptSyntaxError(UNSUPPORTED_STATEMENT, line_number)
-                case ">":
-                    if stripped_input[i + 1] == "=":
-                        tokens.append(">=")
-                        i += 2
-                    else:
-                        tokens.append(">")
-                        i += 1
-                case "<":
-                    if stripped_input[i + 1] == "=":
-                        tokens.append("<=")
+                case ">" | "<":
+                    if source[i + 1] == "=":
+                        yield Token(OPERATOR, char + "=", line_number, column)
                         i += 2
                     else:
-                        tokens.append("<")
+                        yield Token(OPERATOR, char, line_number, column)
                         i += 1
-                # Spaces and tabs
-                case " " | "\t":
+                # Newlines
+                case "\n":
                     i += 1
-                # Commas
-                case ",":
+                    line_number += 1
+                    line_start = i
+                # Spaces and tabs
+                case " " | "\t" | "\r":
                     i += 1
                 # All else
                 case _:
                     raise MuffinScriptSyntaxError(UNSUPPORTED_STATEMENT, line_number)
         except IndexError:
             raise MuffinScriptSyntaxError(UNSUPPORTED_STATEMENT, line_number)
-
-    return tokens
@@ -0,0 +1,155 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import (
+    Any,
+    Iterator,
+)
+
+from muffinscript.constants import (
+    LIST_LIMIT_EXCEEDED,
+    MUFFIN_MAX_LIST,
+    MUFFIN_MAX_STEPS,
+    MUFFIN_MAX_STRING,
+    MUFFIN_TIMEOUT,
+    STEP_LIMIT_EXCEEDED,
+    STRING_LIMIT_EXCEEDED,
+    TIME_LIMIT_EXCEEDED,
+)
+from muffinscript.errors import MuffinScriptLimitError
+from muffinscript.lists import (
+    MuffinList,
+    array_types,
+)
+from muffinscript.output import sleep
+
+
+class Limits:
+    """Caps on what a single run may do, None means unlimited.
+
+    `max_steps` counts every statement run (a loop body's statements on every iteration) plus every expression node
+    evaluated. `timeout` is the wall-clock time a run may take, in seconds. `max_list` and `max_string` cap the
+    length of any list or string the program builds.
+    """
+
+    __slots__ = ("max_steps", "timeout", "max_list", "max_string")
+
+    def __init__(
+        self,
+        max_steps: int | None = None,
+        timeout: float | None = None,
+        max_list: int | None = None,
+        max_string: int | None = None,
+    ):
+        self.max_steps = max_steps
+        self.timeout = timeout
+        self.max_list = max_list
+        self.max_string = max_string
+
+    def __bool__(self):
+        return any(limit is not None for limit in (self.max_steps, self.timeout, self.max_list, self.max_string))
+
+    def __repr__(self):
+        return (
+            f"Limits(max_steps={self.max_steps!r}, timeout={self.timeout!r}, max_list={self.max_list!r}, "
+            f"max_string={self.max_string!r})"
+        )
+
+
+# The limits every run gets unless it's given its own, set with `MUFFIN_MAX_STEPS`, `MUFFIN_TIMEOUT`, etc.
+DEFAULT_LIMITS = Limits(
+    MUFFIN_MAX_STEPS or None,
+    MUFFIN_TIMEOUT or None,
+    MUFFIN_MAX_LIST or None,
+    MUFFIN_MAX_STRING or None,
+)
+
+
+class Budget:
+    """Tracks what a run with limits has used of them, every such run gets a budget of its own."""
+
+    __slots__ = ("limits", "steps", "deadline", "line_number")
+
+    def __init__(self, limits: Limits):
+        self.limits = limits
+        self.steps = 0
+        self.deadline = time.monotonic() + limits.timeout if limits.timeout is not None else None
+        self.line_number = 0
+
+    def charge(self, steps: int, line_number: int):
+        """Counts steps towards `max_steps` and checks the deadline."""
+        self.line_number = line_number
+        self.steps += steps
+        max_steps = self.limits.max_steps
+        if max_steps is not None and self.steps > max_steps:
+            raise MuffinScriptLimitError(f"{STEP_LIMIT_EXCEEDED}: {max_steps}", line_number)
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise self.time_limit_error(line_number)
+
+    def sleep(self, seconds: float, line_number: int):
+        """Sleeps, but never past the deadline: a sleep that would run through it stops there with the time limit."""
+        allowed = self.sleep_time(seconds)
+        sleep(allowed)
+        if allowed < seconds:
+            raise self.time_limit_error(line_number)
+
+    def sleep_time(self, seconds: float) -> float:
+        """How much of a sleep fits before the deadline, a sleep cut short ends the run with `time_limit_error`."""
+        if self.deadline is None:
+            return seconds
+        return min(seconds, max(self.deadline - time.monotonic(), 0))
+
+    def time_limit_error(self, line_number: int) -> MuffinScriptLimitError:
+        """The error a run ends with once it's out of time."""
+        return MuffinScriptLimitError(f"{TIME_LIMIT_EXCEEDED}: {self.limits.timeout}s", line_number)
+
+    def charge_items(self, value: Any, line_number: int):
+        """Counts every item of a list or range as a step, before an operation (eg: `sum`) works through all of them."""
+        if isinstance(value, (list, range)) or isinstance(value, array_types()):
+            self.charge(len(value), line_number)
+
+    def check_size(self, value: Any, line_number: int):
+        """Raises if a string or list is longer than allowed."""
+        if isinstance(value, (str, list)):
+            self.check_length(value, len(value), line_number)
+
+    def check_length(self, value: str | list, length: int, line_number: int):
+        """Raises if a string or list like `value` with `length` items would be longer than allowed."""
+        if isinstance(value, str):
+            limit, message = self.limits.max_string, STRING_LIMIT_EXCEEDED
+        else:
+            limit, message = self.limits.max_list, LIST_LIMIT_EXCEEDED
+        if limit is not None and length > limit:
+            raise MuffinScriptLimitError(f"{message}: {limit}", line_number)
+
+
+# The budget of the run in progress, None unless it has limits. Every thread (and asyncio task) has its own, and a run
+# started from inside another one has its own until it returns. The tree walker only checks this unless a run has
+# limits, so unlimited runs pay a single lookup per statement and per expression. Other engines don't check limits
+# at all, runs with limits always use the tree walker.
+BUDGET: ContextVar[Budget | None] = ContextVar("BUDGET", default=None)
+
+
+@contextmanager
+def enforcing(limits: Limits) -> Iterator[None]:
+    """Enforces limits (if there are any) for the duration of a run, with a budget of its own."""
+    token = BUDGET.set(Budget(limits) if limits else None)
+    try:
+        yield
+    finally:
+        BUDGET.reset(token)
+
+
+def checked_multiply(left: Any, right: Any) -> Any:
+    """`*` for runs with limits, a string or list repeated by a number is checked before it is built.
+
+    Repetition is the only way to build a value far larger than the ones it's built from, so it's the only operation
+    checked up front.
+    """
+    budget = BUDGET.get()
+    if budget is not None:
+        if type(right) is int and isinstance(left, (str, list)) and not isinstance(left, MuffinList):
+            budget.check_length(left, len(left) * right, budget.line_number)
+        elif type(left) is int and isinstance(right, (str, list)) and not isinstance(right, MuffinList):
+            budget.check_length(right, len(right) * left, budget.line_number)
+    return left * right
@@ -0,0 +1,104 @@
+import operator
+import sys
+from itertools import repeat
+from typing import (
+    Any,
+    Callable,
+)
+
+from muffinscript.errors import MuffinScriptRuntimeError
+
+
+class MuffinList(list):
+    """The value every MuffinScript list evaluates to.
+
+    Arithmetic and ordering comparisons apply item by item: `[1, 2] * 2` is `[2, 4]` and `[1, 2] + [3, 4]` is `[4, 6]`.
+    `==` and `!=` still compare whole lists, everything else (printing included) behaves like a Python list. Putting
+    this on the value keeps scalar arithmetic exactly as fast as before in every engine.
+    """
+
+    __slots__ = ()
+
+    def __add__(self, other):
+        return elementwise(operator.add, self, other)
+
+    def __radd__(self, other):
+        return elementwise(operator.add, other, self)
+
+    def __sub__(self, other):
+        return elementwise(operator.sub, self, other)
+
+    def __rsub__(self, other):
+        return elementwise(operator.sub, other, self)
+
+    def __mul__(self, other):
+        return elementwise(operator.mul, self, other)
+
+    def __rmul__(self, other):
+        return elementwise(operator.mul, other, self)
+
+    def __truediv__(self, other):
+        return elementwise(operator.truediv, self, other)
+
+    def __rtruediv__(self, other):
+        return elementwise(operator.truediv, other, self)
+
+    def __mod__(self, other):
+        return elementwise(operator.mod, self, other)
+
+    def __rmod__(self, other):
+        return elementwise(operator.mod, other, self)
+
+    def __lt__(self, other):
+        return elementwise(operator.lt, self, other)
+
+    def __le__(self, other):
+        return elementwise(operator.le, self, other)
+
+    def __gt__(self, other):
+        return elementwise(operator.gt, self, other)
+
+    def __ge__(self, other):
+        return elementwise(operator.ge, self, other)
+
+
+def to_muffin_list(value: Any) -> Any:
+    """Converts a list from the host (nested lists included) to a `MuffinList`, anything else is returned as is.
+
+    Lists come in as plain Python lists, without this `xs * 2` would repeat a list passed in as a variable while the
+    very same list written as a literal doubles every item.
+    """
+    if type(value) is not list:
+        return value
+    return MuffinList([to_muffin_list(item) for item in value])
+
+
+def array_types() -> tuple[Any, ...]:
+    """NumPy's array type, once something has imported NumPy.
+
+    NumPy is optional and never imported here: an array can only exist once the host imported it, and importing it
+    just to check would double how long MuffinScript takes to start.
+    """
+    numpy = sys.modules.get("numpy")
+    return (numpy.ndarray,) if numpy is not None else ()
+
+
+def elementwise(operation: Callable[[Any, Any], Any], left: Any, right: Any) -> Any:
+    """Applies an operator to every pair of items, a scalar on either side is paired with every item of the list.
+
+    NumPy arrays (eg: passed in as variables) are left to NumPy, which already runs the whole operation in C. Lists of
+    different lengths raise a runtime error without a line number, the engine running the expression fills it in.
+    """
+    arrays = array_types()
+    if isinstance(left, arrays) or isinstance(right, arrays):
+        return NotImplemented
+    if isinstance(left, list):
+        if isinstance(right, list):
+            if len(left) != len(right):
+                # Imported here, `constants` imports this module for `PYTHON_TO_MUFFIN_TYPES`
+                from muffinscript.constants import LIST_LENGTH_MISMATCH
+
+                raise MuffinScriptRuntimeError(f"{LIST_LENGTH_MISMATCH}: {len(left)} != {len(right)}", 0)
+            return MuffinList(map(operation, left, right))
+        return MuffinList(map(operation, left, repeat(right)))
+    return MuffinList(map(operation, repeat(left), right))
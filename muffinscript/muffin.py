@@ -1,23 +1,41 @@
+import os
 import sys
+import time
 
+from muffinscript import (
+    batch,
+    cache,
+)
 from muffinscript._version import __version__
+from muffinscript.bytecode import (
+    compile_program,
+    disassemble,
+)
 from muffinscript.constants import (
+    MUFFIN_CACHE,
     MUFFIN_DEBUG,
-    UNDEFINED_VARIABLE,
+    MUFFIN_OPTIMIZE,
 )
+from muffinscript.engines import run_program
 from muffinscript.errors import (
     MuffinScriptBaseError,
-    MuffinScriptRuntimeError,
     output_error,
     output_repl_error,
 )
-from muffinscript.interpreter import evaluate
-from muffinscript.lexer import tokenize
-from muffinscript.parser import parse_tokens
+from muffinscript.frame import Frame
+from muffinscript.lexer import (
+    iter_tokens,
+    tokenize_source,
+)
+from muffinscript.optimizer import optimize
+from muffinscript.output import OUTPUT
+from muffinscript.parser import parse_program
+from muffinscript.resolver import resolve
 
 
 def main():
     """Runs the MuffinScript interpreter on a code file."""
+    _apply_flags()
     arg_one = sys.argv[1]
     if arg_one == "--version":
         print(f"Muffin: v{__version__}")
@@ -25,13 +43,18 @@ def main():
     elif arg_one == "--help":
         print("Baking instructions can be found at https://github.com/justintime50/muffinscript")
         sys.exit()
+    elif arg_one == "--dis":
+        if len(sys.argv) < 3:
+            output_error("Usage: muffin --dis filename.ms")
+        _disassemble(sys.argv[2])
+        sys.exit()
+    elif arg_one == "--jobs":
+        _run_jobs(sys.argv[2:])
 
-    with open(arg_one, "r") as code:
-        code_content = code.readlines()
-    variables = {}
+    variables = Frame()
 
     try:
-        _run_code_block(code_content, variables)
+        _run_program(_load_program(arg_one), variables)
     except MuffinScriptBaseError as error:
         if MUFFIN_DEBUG:
             raise error
@@ -48,7 +71,7 @@ def repl():
         readline = None  # noqa
 
     print('MuffinScript REPL. Type "exit" to leave.')
-    variables = {}
+    variables = Frame()
     buffer = []
     open_braces = 0
     close_braces = 0
@@ -84,45 +107,95 @@ def repl():
             break
 
 
+def _apply_flags():
+    """Applies (and removes) the flags that may precede any command, eg: `muffin --unbuffered filename.ms`."""
+    if "--unbuffered" in sys.argv:
+        sys.argv.remove("--unbuffered")
+        # Write every line as soon as it is printed instead of in chunks
+        OUTPUT.unbuffered = True
+
+
+def _run_jobs(args):
+    """Runs several scripts on a process pool: `muffin --jobs N a.ms b.ms ...`
+
+    Each script's output is printed in the order the scripts were given, followed by a summary on stderr. Exits
+    non-zero if any script failed.
+    """
+    if len(args) < 2 or not args[0].isdigit() or int(args[0]) < 1:
+        output_error("Usage: muffin --jobs N filename.ms ...")
+    start = time.perf_counter()
+    results = batch.run_scripts(args[1:], int(args[0]))
+    for result in results:
+        sys.stdout.write(result.output)
+    sys.stdout.flush()
+    print(batch.format_summary(results, time.perf_counter() - start), file=sys.stderr)
+    sys.exit(1 if any(result.status for result in results) else 0)
+
+
+def _disassemble(path):
+    """Prints the bytecode a script compiles to."""
+    try:
+        program = _load_program(path)
+        resolve(program, Frame())
+        print(disassemble(compile_program(program)))
+    except MuffinScriptBaseError as error:
+        if MUFFIN_DEBUG:
+            raise error
+        else:
+            output_error(error)
+
+
+def _load_program(path):
+    """Loads the compiled program for a script from the cache, or parses it and caches the result."""
+    key = None
+    if MUFFIN_CACHE and os.path.isfile(path):
+        key = cache.source_key(path)
+        program = cache.load_program(path, key)
+        if program is not None:
+            return program
+
+    # Tokens are streamed from the file line by line, the whole script is never held in memory as text
+    with open(path, "r") as code:
+        program = _prepare_program(parse_program(iter_tokens(code)))
+    if key:
+        cache.save_program(path, key, program)
+    return program
+
+
 def _run_code_block(code_lines, variables):
     """Runs a block of code, reusable for both the interpreter and REPL."""
-    executable_lines = {}
-    i = 0
-    while i < len(code_lines):
-        line = code_lines[i]
-        line_number = i + 1
-        tokens = tokenize(line, line_number)
-        if tokens and tokens[0] in ("if", "for"):
-            block_tokens = tokens[:]
-            open_braces = tokens.count("{")
-            close_braces = tokens.count("}")
-            while open_braces > close_braces and i + 1 < len(code_lines):
-                i += 1
-                line_number = i + 1
-                next_tokens = tokenize(code_lines[i], line_number)
-                block_tokens.extend(next_tokens)
-                open_braces += next_tokens.count("{")
-                close_braces += next_tokens.count("}")
-            # Variables must have assignment
-            if len(tokens) == 1 and isinstance(tokens[0], str):
-                raise MuffinScriptRuntimeError(UNDEFINED_VARIABLE, line_number)
-            node = parse_tokens(block_tokens, line_number)
-            executable_lines[str(line_number)] = node
-        elif tokens:
-            # Variables must have assignment
-            if len(tokens) == 1 and isinstance(tokens[0], str):
-                raise MuffinScriptRuntimeError(UNDEFINED_VARIABLE, line_number)
-            node = parse_tokens(tokens, line_number)
-            executable_lines[str(line_number)] = node
-        i += 1
-
-    for line_number, node in executable_lines.items():
-        if node:
-            evaluate(node, variables, line_number)
+    _run_source("\n".join(line.rstrip("\n") for line in code_lines), variables)
+
+
+def _run_source(source, variables):
+    """Tokenizes the whole source once, parses every statement, then runs them in order."""
+    _run_program(_prepare_program(parse_program(tokenize_source(source))), variables)
+
+
+def _prepare_program(program):
+    """Runs the optimizer over freshly parsed nodes unless it was turned off."""
+    if MUFFIN_OPTIMIZE:
+        program, folded = optimize(program)
+        if MUFFIN_DEBUG:
+            print(f"Optimizer folded {folded} nodes", file=sys.stderr)
+    return program
+
+
+def _run_program(program, variables):
+    """Binds the program's variables to slots in the frame, then runs the top-level nodes in order."""
+    resolve(program, variables)
+    run_program(program, variables)
 
 
 if __name__ == "__main__":
-    if len(sys.argv) > 2:
+    if getattr(sys, "frozen", False):
+        # Release builds are frozen with PyInstaller, their `--jobs` and `pfor` workers start by running this file
+        # again and must be told they're workers. Imported here, `multiprocessing` is slow to import.
+        import multiprocessing
+
+        multiprocessing.freeze_support()
+    _apply_flags()
+    if len(sys.argv) > 2 and sys.argv[1] not in ("--dis", "--jobs"):
         output_error("Usage: muffin filename.ms")
     elif len(sys.argv) == 1:
         repl()
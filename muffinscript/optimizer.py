@@ -0,0 +1,138 @@
+from typing import Any
+
+from muffinscript.ast import (
+    ArithmeticNode,
+    AssignNode,
+    BoolNode,
+    CatNode,
+    ConstantNode,
+    FloatNode,
+    IntNode,
+    NullNode,
+    PrintNode,
+    StringNode,
+)
+from muffinscript.ast.base import (
+    ForLoopNode,
+    IfNode,
+)
+from muffinscript.ast.standard_lib import TypeCheckNode
+from muffinscript.ast.types import ListNode
+from muffinscript.errors import MuffinScriptBaseError
+from muffinscript.interpreter import evaluate
+
+_CONSTANT_NODES = (IntNode, FloatNode, StringNode, BoolNode, NullNode, ConstantNode)
+# Nodes folded into a constant once all of their children are constants
+_FOLDABLE_NODES = (ArithmeticNode, CatNode, TypeCheckNode)
+# What evaluating constants can raise, the interpreter lets Python's own errors (eg: `1 / 0`) through unwrapped
+_RUNTIME_ERRORS = (MuffinScriptBaseError, ArithmeticError, MemoryError, TypeError, ValueError)
+
+
+def optimize(program: list[Any]) -> tuple[list[Any], int]:
+    """Folds literal subtrees into constants and drops branches whose condition is constant.
+
+    Returns the optimized top-level nodes along with how many nodes were folded or removed.
+    """
+    return _fold_block(program)
+
+
+def _fold_block(statements: list[Any]) -> tuple[list[Any], int]:
+    """Folds every statement of a block, splicing in the taken branch of constant `if` statements."""
+    folded_statements: list[Any] = []
+    folded = 0
+    for statement in statements:
+        if isinstance(statement, IfNode):
+            statement.condition, count = _fold_expression(statement.condition)
+            folded += count
+            if _is_constant(statement.condition):
+                condition = evaluate(statement.condition, {}, statement.line_number)
+                branch, count = _fold_block(statement.body if condition else statement.else_body)
+                folded_statements.extend(branch)
+                folded += count + 1
+                continue
+            statement.body, count = _fold_block(statement.body)
+            folded += count
+            statement.else_body, count = _fold_block(statement.else_body)
+            folded += count
+        elif isinstance(statement, ForLoopNode):
+            statement.iterable, count = _fold_expression(statement.iterable)
+            folded += count
+            statement.body, count = _fold_block(statement.body)
+            folded += count
+        else:
+            statement, count = _fold_expression(statement)
+            folded += count
+        folded_statements.append(statement)
+    return folded_statements, folded
+
+
+def _fold_expression(node: Any) -> tuple[Any, int]:
+    """Folds the children of a node first, then the node itself when every child is a constant.
+
+    Walks the expression with a work stack instead of recursing, so even very long expressions (`x + x + ...`) fold.
+    """
+    folded = 0
+    root = [node]
+    # Each entry is a node, where it lives (a list and index or a node and attribute) and whether its children are done
+    work: list[tuple[Any, Any, int | str, bool]] = [(node, root, 0, False)]
+    while work:
+        node, holder, key, children_done = work.pop()
+        children = _children(node)
+        if not children_done:
+            work.append((node, holder, key, True))
+            work.extend((_get(*child), *child, False) for child in children)
+            continue
+        if not isinstance(node, _FOLDABLE_NODES) or not all(_is_constant(_get(*child)) for child in children):
+            continue
+        if _is_repetition(node):
+            continue
+        try:
+            value = evaluate(node, {}, node.line_number)
+        except _RUNTIME_ERRORS:
+            # Leave anything that fails (eg: `1 / 0`) for the interpreter so the error only surfaces if the line runs
+            continue
+        _set(holder, key, ConstantNode(value, node.line_number))
+        folded += 1
+    return root[0], folded
+
+
+def _children(node: Any) -> list[tuple[Any, int | str]]:
+    """Where each child expression of a node lives, as a list and index or a node and attribute."""
+    if isinstance(node, ArithmeticNode):
+        return [(node, "left"), (node, "right")]
+    elif isinstance(node, (PrintNode, TypeCheckNode)):
+        return [(node, "value")]
+    elif isinstance(node, AssignNode):
+        return [(node, "expression")]
+    elif isinstance(node, ListNode):
+        return [(node.items, index) for index in range(len(node.items))]
+    elif isinstance(node, CatNode):
+        return [(node.args, index) for index in range(len(node.args))]
+    return []
+
+
+def _get(holder: Any, key: int | str) -> Any:
+    return getattr(holder, key) if isinstance(key, str) else holder[key]
+
+
+def _set(holder: Any, key: int | str, value: Any):
+    if isinstance(key, str):
+        setattr(holder, key, value)
+    else:
+        holder[key] = value
+
+
+def _is_repetition(node: Any) -> bool:
+    """Whether a node repeats a string or list (`"ab" * 1000`).
+
+    Left for the interpreter: it would be the one constant far larger than the source it came from, and only a run can
+    check it against its limits.
+    """
+    if not isinstance(node, ArithmeticNode) or node.operator != "*":
+        return False
+    return any(isinstance(evaluate(operand, {}, node.line_number), (str, list)) for operand in (node.left, node.right))
+
+
+def _is_constant(node: Any) -> bool:
+    """Whether a node always evaluates to the same value, no matter which variables are defined."""
+    return isinstance(node, _CONSTANT_NODES)
@@ -0,0 +1,104 @@
+import sys
+import time
+from contextlib import contextmanager
+from typing import (
+    Any,
+    Iterator,
+)
+
+# Pending output is written once it reaches this many characters
+BUFFER_LIMIT = 64 * 1024
+
+
+class Output:
+    """Collects what `p()` prints while a program runs and writes it to stdout in large chunks.
+
+    Output is only held back inside `buffering()`, which every engine run is wrapped in. It is written once the
+    buffer fills up, before a `sleep`, and when the run ends for any reason (errors included), so it always comes
+    out in the order it was printed. Outside a run, or once `unbuffered` is set, every line is written straight away.
+    """
+
+    __slots__ = ("parts", "size", "limit", "active", "unbuffered", "captured")
+
+    def __init__(self, limit: int = BUFFER_LIMIT):
+        self.parts: list[str] = []
+        self.size = 0
+        self.limit = limit
+        self.active = False
+        self.unbuffered = False
+        self.captured: list[str] | None = None
+
+    def write(self, value: Any):
+        """Prints a value followed by a newline, exactly as `print()` would."""
+        if self.active:
+            text = f"{value!s}\n"
+            self.parts.append(text)
+            self.size += len(text)
+            if self.size >= self.limit:
+                self.flush()
+        else:
+            print(value, flush=self.unbuffered)
+
+    def write_text(self, text: str):
+        """Writes text that already ends in a newline (eg: output captured in another process)."""
+        if self.active:
+            self.parts.append(text)
+            self.size += len(text)
+            if self.size >= self.limit:
+                self.flush()
+        else:
+            sys.stdout.write(text)
+            if self.unbuffered:
+                sys.stdout.flush()
+
+    def flush(self):
+        """Writes everything collected so far."""
+        if self.parts:
+            if self.captured is not None:
+                self.captured.extend(self.parts)
+                self.parts.clear()
+                self.size = 0
+                return
+            text = "".join(self.parts)
+            self.parts.clear()
+            self.size = 0
+            sys.stdout.write(text)
+            sys.stdout.flush()
+
+    @contextmanager
+    def buffering(self) -> Iterator[None]:
+        """Holds output back for the duration of a run, unless output is unbuffered or a run is already buffering."""
+        if self.active or self.unbuffered:
+            yield
+            return
+        self.active = True
+        try:
+            yield
+        finally:
+            self.active = False
+            self.flush()
+
+    @contextmanager
+    def capturing(self) -> Iterator[list[str]]:
+        """Collects every line printed for the duration instead of writing it (eg: in a `pfor` worker).
+
+        Unbuffered output is captured too, whoever writes the lines out decides when they're flushed.
+        """
+        self.flush()
+        captured: list[str] = []
+        outer = self.active, self.captured
+        self.active, self.captured = True, captured
+        try:
+            yield captured
+        finally:
+            self.flush()
+            self.active, self.captured = outer
+
+
+OUTPUT = Output()
+
+
+def sleep(seconds: float):
+    """Flushes pending output first, so everything printed before a pause shows up during it."""
+    OUTPUT.flush()
+    time.sleep(seconds)
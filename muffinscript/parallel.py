@@ -0,0 +1,122 @@
+import atexit
+import os
+from itertools import repeat
+from typing import Any
+
+from muffinscript.ast.base import ParallelForLoopNode
+from muffinscript.constants import (
+    ITERABLE_TYPES,
+    MUFFIN_WORKERS,
+    UNSUPPORTED_STATEMENT,
+)
+from muffinscript.errors import MuffinScriptRuntimeError
+from muffinscript.frame import Frame
+from muffinscript.limits import BUDGET
+from muffinscript.output import OUTPUT
+
+# Each worker gets about this many chunks of a loop, so one slow chunk doesn't leave the other workers idle
+CHUNKS_PER_WORKER = 4
+
+_POOL: Any = None
+_IN_WORKER = False
+
+
+def run_parallel_loop(node: ParallelForLoopNode, iterable: Any, values: list[Any], line_number: int):
+    """Runs a `pfor` loop over a list or range on the shared process pool.
+
+    The iterable is split into chunks and every chunk runs on the tree walker in a worker, against a copy of the
+    variables as they were when the loop started. Whatever the chunks print is written through `OUTPUT` in the order
+    of the iterable once it's done, and the first chunk to fail raises its error here after the output printed before
+    it.
+
+    Loops inside a worker and runs with limits (which only this process can keep track of) run in order, in process.
+    """
+    if not isinstance(iterable, ITERABLE_TYPES):
+        raise MuffinScriptRuntimeError(UNSUPPORTED_STATEMENT, line_number)
+    if not iterable:
+        return
+    item_slot = node.item_slot
+    if item_slot is None:
+        raise ValueError(
+            f"Variable {node.item_name!r} wasn't resolved to a slot, resolve the program before running it"
+        )
+    if _IN_WORKER or BUDGET.get() is not None:
+        _run_items(node.body, item_slot, list(values), iterable)
+        return
+
+    workers = MUFFIN_WORKERS or os.cpu_count() or 1
+    size = max(1, -(-len(iterable) // (workers * CHUNKS_PER_WORKER)))
+    chunks = [iterable[start : start + size] for start in range(0, len(iterable), size)]
+    results = _pool(workers).map(_run_chunk, repeat(node.body), repeat(item_slot), repeat(values), chunks)
+    for lines, error in results:
+        for line in lines:
+            OUTPUT.write_text(line)
+        if error is not None:
+            raise error
+
+
+def shutdown():
+    """Stops the process pool's workers, the next `pfor` starts a new pool. Runs when the interpreter exits."""
+    global _POOL
+    if _POOL is not None:
+        pool, _POOL = _POOL, None
+        pool.shutdown(cancel_futures=True)
+
+
+def run_in_process():
+    """Runs every `pfor` loop in this process in order, eg: in a worker that already runs alongside others.
+
+    A process pool's workers never run `atexit` hooks, so a pool started inside one is never shut down and the worker
+    never exits.
+    """
+    global _IN_WORKER
+    _IN_WORKER = True
+
+
+def _pool(workers: int) -> Any:
+    """Starts the process pool on the first `pfor` and keeps it for every loop after."""
+    global _POOL
+    if _POOL is None:
+        # Imported here, `multiprocessing` takes longer to import than the rest of MuffinScript put together
+        from concurrent.futures import ProcessPoolExecutor
+
+        _POOL = ProcessPoolExecutor(max_workers=workers, initializer=_start_worker)
+    return _POOL
+
+
+def _start_worker():
+    run_in_process()
+    # A forked worker inherits the parent's output and limits mid run, neither belongs to it
+    OUTPUT.parts.clear()
+    OUTPUT.size = 0
+    OUTPUT.active = False
+    OUTPUT.captured = None
+    BUDGET.set(None)
+
+
+def _run_chunk(
+    body: list[Any], item_slot: int, values: list[Any], items: Any
+) -> tuple[list[str], BaseException | None]:
+    """Runs one chunk of a loop in a worker, returning the lines it printed and the error it stopped at (if any)."""
+    error = None
+    with OUTPUT.capturing() as lines:
+        try:
+            _run_items(body, item_slot, values, items)
+        except Exception as chunk_error:
+            error = chunk_error
+    return lines, error
+
+
+def _run_items(body: list[Any], item_slot: int, values: list[Any], items: Any):
+    # Imported here, the interpreter runs `pfor` loops through this module
+    from muffinscript.interpreter import execute
+
+    frame = Frame()
+    frame.values = values
+    for item in items:
+        values[item_slot] = item
+        for statement in body:
+            execute(statement, frame, statement.line_number)
+
+
+atexit.register(shutdown)
@@ -1,4 +1,10 @@
-from typing import Any
+import re
+from typing import (
+    Any,
+    Iterable,
+    Iterator,
+    cast,
+)
 
 from muffinscript.ast import (
     ArithmeticNode,
@@ -12,19 +18,30 @@ from muffinscript.ast import (
     PrintNode,
     SleepNode,
     StringNode,
+    VariableNode,
 )
 from muffinscript.ast.base import (
     ForLoopNode,
     IfNode,
+    ParallelForLoopNode,
+)
+from muffinscript.ast.standard_lib import (
+    FloatCoerceNode,
+    IntCoerceNode,
+    RangeNode,
+    ReductionNode,
+    StringCoerceNode,
+    TypeCheckNode,
+)
+from muffinscript.ast.types import (
+    InterpolationNode,
+    ListNode,
 )
-from muffinscript.ast.standard_lib import TypeCheckNode
-from muffinscript.ast.types import ListNode
 from muffinscript.constants import (
     INVALID_COERCION,
     INVALID_FLOAT,
+    OPERATOR_PRECEDENCE,
     RESERVED_KEYWORDS,
-    SUPPORTED_OPERATORS,
-    SUPPORTED_STATEMENTS,
     SUPPORTED_TYPES,
     UNDEFINED_VARIABLE,
     UNSUPPORTED_STATEMENT,
@@ -33,256 +50,437 @@ from muffinscript.errors import (
     MuffinScriptRuntimeError,
     MuffinScriptSyntaxError,
 )
+from muffinscript.tokens import (
+    ASSIGN,
+    BOOL,
+    COMMA,
+    FLOAT,
+    INT,
+    LBRACE,
+    LBRACKET,
+    LPAREN,
+    NAME,
+    NULL,
+    OPERATOR,
+    RBRACE,
+    RBRACKET,
+    RPAREN,
+    STRING,
+    Token,
+    token_from_value,
+)
+
 
+def parse_program(tokens: Iterable[Token]) -> list[Any]:
+    """Parses a positioned token stream into the list of top-level nodes to run, in order."""
+    program = []
+    for statement in split_statements(tokens):
+        line_number = statement[0].line
+        # Variables must have assignment
+        if len(statement) == 1 and statement[0].kind in (NAME, STRING):
+            raise MuffinScriptRuntimeError(UNDEFINED_VARIABLE, line_number)
+        program.append(parse_tokens(statement, line_number))
+    return program
 
-def parse_tokens(tokens: list[SUPPORTED_TYPES], line_number: int) -> Any:
+
+def split_statements(tokens: Iterable[Token]) -> Iterator[list[Token]]:
+    """Groups a token stream into top-level statements.
+
+    A statement ends at the end of its line unless a block is still open, in which case it runs until the
+    brace that closes it. Brace depth is tracked as the tokens go by so the stream is only walked once.
+    """
+    statement: list[Token] = []
+    depth = 0
+    for token in tokens:
+        if statement and depth <= 0 and token.line != statement[-1].line:
+            yield statement
+            statement = []
+            depth = 0
+        if token.kind == LBRACE:
+            depth += 1
+        elif token.kind == RBRACE:
+            depth -= 1
+        statement.append(token)
+    if statement:
+        yield statement
+
+
+def parse_tokens(tokens: list[Token] | list[SUPPORTED_TYPES], line_number: int) -> Any:
     """Parses tokens before sending them to the interpreter to ensure they have no syntax errors.
 
-    We begin by parsing top-level statements, if we can't match one we start parsing expressions.
+    We begin by parsing top-level statements, if we can't match one we start parsing expressions. Bare values
+    as returned by `tokenize` are accepted too and converted to tokens first.
     """
-    # Print
-    if "p" == tokens[0]:
-        return _parse_print_tokens(tokens, line_number)
-    # Variables
-    elif len(tokens) > 1 and "=" == tokens[1]:
-        return _parse_variable_tokens(tokens, line_number)
-    # Sleep
-    elif "sleep" == tokens[0]:
-        return _parse_sleep_tokens(tokens, line_number)
-    # If statements
-    elif "if" == tokens[0]:
-        return _parse_if_tokens(tokens, line_number)
-    # For loops
-    elif "for" == tokens[0]:
-        return _parse_for_loop_tokens(tokens, line_number)
+    tokens = _as_tokens(tokens, line_number)
+    matches = _match_brackets(tokens)
+    statement, position = _parse_statement(tokens, matches, 0)
+    if position != len(tokens):
+        raise MuffinScriptSyntaxError(UNSUPPORTED_STATEMENT, line_number)
+    return statement
+
+
+def _match_brackets(tokens: list[Token]) -> list[int]:
+    """Builds a table pointing every paren, bracket and brace at its partner (and everything else at -1).
+
+    Built once per token stream so finding where any group or block ends is a single lookup.
+    """
+    matches = [-1] * len(tokens)
+    stack: list[int] = []
+    for i, token in enumerate(tokens):
+        kind = token.kind
+        if kind in _OPENING_KINDS:
+            stack.append(i)
+        elif kind in _CLOSING_KINDS:
+            if not stack or tokens[stack[-1]].kind != _CLOSING_KINDS[kind]:
+                raise MuffinScriptSyntaxError(UNSUPPORTED_STATEMENT, token.line)
+            opening = stack.pop()
+            matches[opening] = i
+            matches[i] = opening
+    if stack:
+        raise MuffinScriptSyntaxError(UNSUPPORTED_STATEMENT, tokens[stack[-1]].line)
+    return matches
+
+
+def _parse_statement(tokens: list[Token], matches: list[int], position: int) -> tuple[Any, int]:
+    """Parses the statement starting at `position`, returns it with the position of the first unused token."""
+    token = tokens[position]
+    line_number = token.line
+    if token.kind == NAME:
+        # Print
+        if token.value == "p":
+            return _parse_print_tokens(tokens, matches, position)
+        # Variables
+        elif position + 1 < len(tokens) and tokens[position + 1].kind == ASSIGN:
+            return _parse_variable_tokens(tokens, position)
+        # Sleep
+        elif token.value == "sleep":
+            return _parse_sleep_tokens(tokens, matches, position)
+        # If statements
+        elif token.value == "if":
+            return _parse_if_tokens(tokens, matches, position)
+        # For loops
+        elif token.value in ("for", "pfor"):
+            return _parse_for_loop_tokens(tokens, matches, position)
     # All other expressions that need evaluation
-    else:
-        return _parse_expression(tokens, line_number)
+    return _parse_value(tokens, position, line_number)
 
 
-def _parse_print_tokens(tokens: list[SUPPORTED_TYPES], line_number: int) -> PrintNode:
+def _parse_print_tokens(tokens: list[Token], matches: list[int], position: int) -> tuple[PrintNode, int]:
     """Token schema: ["p", "(", "foo", ")"]"""
-    _validate_function_schema(tokens, line_number, "p", 4)
-    if (
-        len(tokens) == 4
-        and isinstance(tokens[2], str)
-        and not tokens[2].startswith('"')
-        and not tokens[2].endswith('"')
-        and not tokens[2].startswith("'")
-        and not tokens[2].endswith("'")
-    ):
-        # Using a variable
-        expression: Any = tokens[2]
-    else:
-        # Using an expression
-        expression = parse_tokens(tokens[2:-1], line_number)
-    return PrintNode(expression, line_number)
+    line_number = tokens[position].line
+    close = _match_call(tokens, matches, position)
+    expression = _parse_group(tokens, position + 2, close, line_number)
+    return PrintNode(expression, line_number), close + 1
 
 
-def _parse_variable_tokens(tokens: list[SUPPORTED_TYPES], line_number: int) -> AssignNode:
+def _parse_variable_tokens(tokens: list[Token], position: int) -> tuple[AssignNode, int]:
     """Token schema: ["foo", "=", "hello world"]"""
-    expression: Any = None
-    if len(tokens) < 3:
+    name = tokens[position]
+    line_number = name.line
+    if position + 2 >= len(tokens):
         raise MuffinScriptSyntaxError(UNDEFINED_VARIABLE, line_number)
-    elif tokens[0] in RESERVED_KEYWORDS:
+    elif name.kind != NAME or name.value in RESERVED_KEYWORDS:
         raise MuffinScriptSyntaxError(UNSUPPORTED_STATEMENT, line_number)
-    expression = parse_tokens(tokens[2:], line_number)
-    return AssignNode(
-        var_name=str(tokens[0]),
+    expression, position = _parse_value(tokens, position + 2, line_number)
+    assignment = AssignNode(
+        var_name=str(name.value),
         expression=expression,
         line_number=line_number,
     )
+    return assignment, position
 
 
-def _parse_sleep_tokens(tokens: list[SUPPORTED_TYPES], line_number: int) -> BaseNode:
+def _parse_sleep_tokens(tokens: list[Token], matches: list[int], position: int) -> tuple[BaseNode, int]:
     """Token schema: ["sleep", "(", 2.5, ")"]"""
-    _validate_function_schema(tokens, line_number, "sleep", 4)
-    if not isinstance(tokens[2], (str, int, float)):  # Allow str for variable names
+    line_number = tokens[position].line
+    close = _match_call(tokens, matches, position)
+    if close != position + 3:
+        raise MuffinScriptSyntaxError(UNSUPPORTED_STATEMENT, line_number)
+    duration = tokens[position + 2]
+    if duration.kind == NAME:
+        return SleepNode(VariableNode(str(duration.value), line_number), line_number), close + 1
+    elif duration.kind not in (INT, FLOAT):
         raise MuffinScriptSyntaxError(INVALID_FLOAT, line_number)
-    return SleepNode(tokens[2], line_number)
+    return SleepNode(duration.value, line_number), close + 1
 
 
-def _parse_if_tokens(tokens: list[SUPPORTED_TYPES], line_number: int) -> BaseNode:
+def _parse_if_tokens(tokens: list[Token], matches: list[int], position: int) -> tuple[BaseNode, int]:
     """Token schema: ["if", "(", "foo", "=", "bar", ")", "{", ...]
 
-    Note that if statement tokens may not occur on the same line because the opening and closing brackets
-    could occur on different lines.
+    Blocks may span several lines and nest to any depth, the bracket table tells us where each one ends.
     """
-    # Condition
-    condition = None
-    open_paren_idx = next((i for i, token in enumerate(tokens) if token == "("), None)  # nosec
-    close_paren_idx = next((i for i, token in enumerate(tokens) if token == ")"), None)  # nosec
-    if open_paren_idx is not None and close_paren_idx is not None and close_paren_idx > open_paren_idx:
-        inner_tokens = tokens[open_paren_idx + 1 : close_paren_idx]
-        condition = parse_tokens(inner_tokens, line_number)
-    else:
-        raise MuffinScriptSyntaxError(UNSUPPORTED_STATEMENT, line_number)
-
-    body = _parse_function_body(tokens, line_number)
-    else_body = []
+    line_number = tokens[position].line
+    close = _match_call(tokens, matches, position)
+    condition = _parse_group(tokens, position + 2, close, line_number)
+    body, position = _parse_block(tokens, matches, close + 1, line_number)
+    else_body: list[BaseNode] = []
 
     # Else body (optional)
-    if "else" in tokens:
-        else_idx = tokens.index("else")
-        if "{" in tokens[else_idx:]:
-            else_body = _parse_function_body(tokens, line_number, else_idx)
+    if position < len(tokens) and _is_name(tokens[position], "else"):
+        else_body, position = _parse_block(tokens, matches, position + 1, line_number)
 
-    return IfNode(condition, body, line_number, else_body)
+    return IfNode(condition, body, line_number, else_body), position
 
 
-def _parse_for_loop_tokens(tokens: list[SUPPORTED_TYPES], line_number: int) -> BaseNode:
-    """Token schema: ["for", "(", "item", "in", "myList", ")", "{", ...]
+def _parse_for_loop_tokens(tokens: list[Token], matches: list[int], position: int) -> tuple[BaseNode, int]:
+    """Token schema: ["for", "(", "item", "in", "myList", ")", "{", ...], likewise for `pfor`
 
-    Note that if statement tokens may not occur on the same line because the opening and closing brackets
-    could occur on different lines.
+    Blocks may span several lines and nest to any depth, the bracket table tells us where each one ends.
     """
-    open_paren_idx = next((i for i, token in enumerate(tokens) if token == "("), None)  # nosec
-    close_paren_idx = next((i for i, token in enumerate(tokens) if token == ")"), None)  # nosec
-    if open_paren_idx is not None and close_paren_idx is not None and close_paren_idx > open_paren_idx:
-        inner_tokens = tokens[open_paren_idx + 1 : close_paren_idx]
-        if len(inner_tokens) != 3 or inner_tokens[1] != "in":
-            raise MuffinScriptSyntaxError(UNSUPPORTED_STATEMENT, line_number)
-        item_name = str(inner_tokens[0])
-        list_name = str(inner_tokens[2])
-    else:
+    line_number = tokens[position].line
+    loop_class = ParallelForLoopNode if tokens[position].value == "pfor" else ForLoopNode
+    close = _match_call(tokens, matches, position)
+    if close < position + 5 or tokens[position + 2].kind != NAME or not _is_name(tokens[position + 3], "in"):
+        raise MuffinScriptSyntaxError(UNSUPPORTED_STATEMENT, line_number)
+    item_name = str(tokens[position + 2].value)
+    iterable = _parse_group(tokens, position + 4, close, line_number)
+
+    body, position = _parse_block(tokens, matches, close + 1, line_number)
+
+    return loop_class(item_name, iterable, body, line_number), position
+
+
+def _parse_block(tokens: list[Token], matches: list[int], position: int, line_number: int) -> tuple[list[Any], int]:
+    """Parses the statements of the `{ ... }` block opening at `position`, returns them with the position past it."""
+    if position >= len(tokens) or tokens[position].kind != LBRACE:
         raise MuffinScriptSyntaxError(UNSUPPORTED_STATEMENT, line_number)
+    end = matches[position]
+    body = []
+    position += 1
+    while position < end:
+        statement, position = _parse_statement(tokens, matches, position)
+        body.append(statement)
+    if position != end:
+        raise MuffinScriptSyntaxError(UNSUPPORTED_STATEMENT, line_number)
+    return body, end + 1
+
+
+def _parse_group(tokens: list[Token], position: int, end: int, line_number: int) -> Any:
+    """Parses an expression that must fill the tokens from `position` up to (not including) `end`."""
+    expression, position = _parse_value(tokens, position, line_number)
+    if position != end:
+        raise MuffinScriptSyntaxError(UNSUPPORTED_STATEMENT, line_number)
+    return expression
+
+
+def _match_call(tokens: list[Token], matches: list[int], position: int) -> int:
+    """Ensures the name at `position` is followed by a parenthesized group, returns where the group closes."""
+    if position + 1 >= len(tokens) or tokens[position + 1].kind != LPAREN:
+        raise MuffinScriptSyntaxError(UNSUPPORTED_STATEMENT, tokens[position].line)
+    return matches[position + 1]
+
 
-    body = _parse_function_body(tokens, line_number)
-
-    return ForLoopNode(item_name, list_name, body, line_number)
-
-
-def _parse_expression(tokens: list[Any], line_number: int) -> BaseNode:
-    """Parses an expression from provided tokens."""
-    # String concatenation
-    if tokens[0] == "cat":
-        _validate_function_schema(tokens, line_number, "cat", 4)
-        return CatNode(args=[parse_tokens([token], line_number) for token in tokens[2:-1]], line_number=line_number)
-    # Coercion
-    elif "str" in tokens or "int" in tokens or "float" in tokens:
-        return _parse_coercion_tokens(tokens, line_number)
-    # Type check
-    elif "type" in tokens:
-        return _parse_type_check_tokens(tokens, line_number)
-    # Arithmetic
-    elif len(tokens) == 3 and tokens[1] in SUPPORTED_OPERATORS.keys():
-        # TODO: Support multiple arithmetic chaining
-        return ArithmeticNode(
-            operator=str(tokens[1]),
-            left=tokens[0],
-            right=tokens[2],
+def _parse_value(tokens: list[Token], position: int, line_number: int) -> tuple[Any, int]:
+    """Parses one expression starting at `position`, returns it with the position of the first unused token."""
+    return _parse_binary(tokens, position, 1, line_number)
+
+
+def _parse_binary(tokens: list[Token], position: int, min_precedence: int, line_number: int) -> tuple[Any, int]:
+    """Precedence climbing over an index cursor: `a * b + c - d / e` becomes `((a * b) + c) - (d / e)`.
+
+    Every token is visited once. An operator must be on the same line as its left operand to continue an expression.
+    """
+    left, position = _parse_primary(tokens, position, line_number)
+    while position < len(tokens):
+        token = tokens[position]
+        if token.kind != OPERATOR or token.line != tokens[position - 1].line:
+            break
+        precedence = OPERATOR_PRECEDENCE[token.value]  # type:ignore
+        if precedence < min_precedence:
+            break
+        right, position = _parse_binary(tokens, position + 1, precedence + 1, line_number)
+        left = ArithmeticNode(
+            operator=str(token.value),
+            left=left,
+            right=right,
             line_number=line_number,
         )
-    # Single value expressions
-    elif len(tokens) == 1 and isinstance(tokens[0], str):
-        # Strip quotes if it's a string literal
-        if tokens[0].startswith('"') and tokens[0].endswith('"'):
-            return StringNode(tokens[0][1:-1], line_number)
-        # TODO: This is a variable and should be its own node type
-        return StringNode(tokens[0], line_number)
-    elif len(tokens) == 1 and (tokens[0] is True or tokens[0] is False):
-        return BoolNode(str(tokens[0]).lower(), line_number)
-    elif len(tokens) == 1 and tokens[0] is None:
-        return NullNode("null", line_number)
-    elif len(tokens) == 1 and isinstance(tokens[0], int):
-        return IntNode(tokens[0], line_number)
-    elif len(tokens) == 1 and isinstance(tokens[0], float):
-        return FloatNode(tokens[0], line_number)
-    elif tokens[0] == "[" and tokens[-1] == "]":
-        list_items = []
-        for item in tokens[1:-1]:
-            list_items.append(parse_tokens([item], line_number))
-        return ListNode(list_items, line_number)
+    return left, position
+
+
+def _parse_primary(tokens: list[Token], position: int, line_number: int) -> tuple[Any, int]:
+    """Parses a single operand: a literal, a name, a function call, a list or a parenthesized expression.
+
+    A leading `-` negates the operand, number literals become negative literals and anything else becomes `0 - x`.
+    """
+    if position >= len(tokens):
+        raise MuffinScriptSyntaxError(UNSUPPORTED_STATEMENT, line_number)
+    token = tokens[position]
+    kind = token.kind
+    if kind == INT:
+        return IntNode(token.value, line_number), position + 1  # type:ignore
+    elif kind == FLOAT:
+        return FloatNode(token.value, line_number), position + 1  # type:ignore
+    elif kind == STRING:
+        return _parse_string(str(token.value), line_number), position + 1
+    elif kind == BOOL:
+        return BoolNode(str(token.value).lower(), line_number), position + 1
+    elif kind == NULL:
+        return NullNode("null", line_number), position + 1
+    elif kind == NAME:
+        is_call = position + 1 < len(tokens) and tokens[position + 1].kind == LPAREN
+        if is_call and token.value in _FUNCTION_PARSERS:
+            return _FUNCTION_PARSERS[token.value](tokens, position, line_number)  # type:ignore
+        return VariableNode(str(token.value), line_number), position + 1
+    elif kind == LPAREN:
+        expression, position = _parse_binary(tokens, position + 1, 1, line_number)
+        return expression, _expect(tokens, position, RPAREN, line_number)
+    elif kind == LBRACKET:
+        items, position = _parse_arguments(tokens, position + 1, RBRACKET, line_number)
+        return ListNode(items, line_number), position
+    elif kind == OPERATOR and token.value == "-":
+        following = tokens[position + 1] if position + 1 < len(tokens) else token
+        if following.kind == INT:
+            return IntNode(-following.value, line_number), position + 2  # type:ignore
+        elif following.kind == FLOAT:
+            return FloatNode(-following.value, line_number), position + 2  # type:ignore
+        operand, position = _parse_primary(tokens, position + 1, line_number)
+        negation = ArithmeticNode(
+            operator="-",
+            left=IntNode(0, line_number),
+            right=operand,
+            line_number=line_number,
+        )
+        return negation, position
 
     raise MuffinScriptSyntaxError(UNSUPPORTED_STATEMENT, line_number)
 
 
-def _parse_coercion_tokens(tokens: list[SUPPORTED_TYPES], line_number: int) -> BaseNode:
-    """Token schema: ["str", "(", 2, ")"] or ["int", "(", "2", ")"] or ["float", "(", "2.5", ")"]"""
+def _parse_string(value: str, line_number: int) -> BaseNode:
+    """Splits a string literal into its text and `#{variable}` references, plain strings stay a `StringNode`."""
+    pieces = _INTERPOLATION_PATTERN.split(value)
+    if len(pieces) == 1:
+        return StringNode(value, line_number)
+    # Splitting on the capture group puts the variable names at the odd indexes
+    parts: list[Any] = [
+        VariableNode(piece, line_number) if index % 2 else piece
+        for index, piece in enumerate(pieces)
+        if index % 2 or piece
+    ]
+    return InterpolationNode(parts, line_number)
+
+
+def _parse_arguments(tokens: list[Token], position: int, closing_kind: int, line_number: int) -> tuple[list, int]:
+    """Parses expressions up to the closing token, returns them with the position just past it.
+
+    Every argument ends at a comma, so `[5, -2]` is two items. Bare values (as returned by `tokenize`) have no commas,
+    there arguments are only told apart by where one expression ends.
+    """
+    arguments = []
+    while position < len(tokens) and tokens[position].kind != closing_kind:
+        argument, position = _parse_value(tokens, position, line_number)
+        arguments.append(argument)
+        if position < len(tokens) and tokens[position].kind == COMMA:
+            position += 1
+    return arguments, _expect(tokens, position, closing_kind, line_number)
+
+
+def _parse_cat_call(tokens: list[Token], position: int, line_number: int) -> tuple[BaseNode, int]:
+    """Token schema: ["cat", "(", "hello ", "world", ")"]"""
+    args, position = _parse_arguments(tokens, position + 2, RPAREN, line_number)
+    if not args:
+        raise MuffinScriptSyntaxError(UNSUPPORTED_STATEMENT, line_number)
+    return CatNode(args=args, line_number=line_number), position
+
+
+def _parse_range_call(tokens: list[Token], position: int, line_number: int) -> tuple[BaseNode, int]:
+    """Token schema: ["range", "(", 1, 10, 2, ")"], the start and step are optional"""
+    args, position = _parse_arguments(tokens, position + 2, RPAREN, line_number)
+    if not 1 <= len(args) <= 3:
+        raise MuffinScriptSyntaxError(UNSUPPORTED_STATEMENT, line_number)
+    return RangeNode(args=args, line_number=line_number), position
+
+
+def _parse_reduction_call(tokens: list[Token], position: int, line_number: int) -> tuple[BaseNode, int]:
+    """Token schema: ["sum", "(", "foo", ")"], likewise for `min`, `max` and `mean`"""
+    function = str(tokens[position].value)
+    expression, position = _parse_binary(tokens, position + 2, 1, line_number)
+    return ReductionNode(function, expression, line_number), _expect(tokens, position, RPAREN, line_number)
+
+
+def _parse_coercion_call(tokens: list[Token], position: int, line_number: int) -> tuple[BaseNode, int]:
+    """Token schema: ["str", "(", 2, ")"] or ["int", "(", "2", ")"] or ["float", "(", "2.5", ")"]
+
+    Literals are coerced right away, variables are coerced when the program runs.
+    """
     value: Any = None
     coercion: BaseNode
-    if tokens[0] == "int":
-        _validate_function_schema(tokens, line_number, "int", 4)
+    function_name = tokens[position].value
+    end = _expect(tokens, position + 3, RPAREN, line_number)
+    argument = tokens[position + 2]
+    if argument.kind == NAME:
+        variable = VariableNode(str(argument.value), line_number)
+        return _COERCION_NODES[function_name](variable, line_number), end  # type:ignore
+    elif function_name == "int":
         try:
-            value = int(tokens[2].replace('"', ""))  # type:ignore
+            value = int(_coercible_value(argument, line_number))
         except ValueError:
             raise MuffinScriptRuntimeError(INVALID_COERCION, line_number)
         coercion = IntNode(value, line_number)
-    elif tokens[0] == "float":
-        _validate_function_schema(tokens, line_number, "float", 4)
+    elif function_name == "float":
         try:
-            value = float(tokens[2])  # type:ignore
+            value = float(_coercible_value(argument, line_number))
         except ValueError:
             raise MuffinScriptRuntimeError(INVALID_COERCION, line_number)
         coercion = FloatNode(value, line_number)
     else:
-        _validate_function_schema(tokens, line_number, "str", 4)
-        value = str(tokens[2])
-        coercion = StringNode(value, line_number)
-    return coercion
+        coercion = _parse_string(str(argument.value), line_number)
+    return coercion, end
 
 
-def _parse_type_check_tokens(tokens: list[SUPPORTED_TYPES], line_number: int) -> BaseNode:
+def _coercible_value(token: Token, line_number: int) -> str | int | float:
+    """Only strings and numbers can be coerced to a number."""
+    if token.kind not in (STRING, INT, FLOAT):
+        raise MuffinScriptRuntimeError(INVALID_COERCION, line_number)
+    return token.value  # type:ignore
+
+
+def _parse_type_check_call(tokens: list[Token], position: int, line_number: int) -> tuple[BaseNode, int]:
     """Token schema: ["type", "(", "foo", ")"]"""
-    _validate_function_schema(tokens, line_number, "type", 4)
-    if len(tokens) == 4 and isinstance(tokens[2], str):
-        # Using a variable
-        expression: Any = tokens[2]
-    else:
-        # Using an expression
-        expression = parse_tokens(tokens[2:-1], line_number)
-    return TypeCheckNode(expression, line_number)
-
-
-def _validate_function_schema(
-    tokens: list[SUPPORTED_TYPES],
-    line_number: int,
-    function_name: str,
-    min_tokens_lenth: int = 4,
-):
-    """Validates the schema of a function call."""
-    if tokens[0] != function_name or len(tokens) < min_tokens_lenth or tokens[1] != "(" or tokens[-1] != ")":
-        raise MuffinScriptSyntaxError(UNSUPPORTED_STATEMENT, line_number)
+    expression, position = _parse_binary(tokens, position + 2, 1, line_number)
+    return TypeCheckNode(expression, line_number), _expect(tokens, position, RPAREN, line_number)
 
 
-def _parse_function_body(
-    tokens: list[SUPPORTED_TYPES],
-    line_number: int,
-    enumeration_index: int | None = None,
-) -> list[Any]:
-    """Parses the body of a function call or block statement."""
-    body = []
-    if enumeration_index:
-        what_to_enumerate = tokens[enumeration_index:]
-    else:
-        what_to_enumerate = tokens
-    open_body_idx = next((i for i, token in enumerate(what_to_enumerate) if token == "{"), None)  # nosec
-    close_body_idx = next((i for i, token in enumerate(what_to_enumerate) if token == "}"), None)  # nosec
-    if open_body_idx is not None and close_body_idx is not None and close_body_idx > open_body_idx:
-        if enumeration_index:
-            inner_tokens = tokens[enumeration_index + open_body_idx + 1 : enumeration_index + close_body_idx]
-        else:
-            inner_tokens = tokens[open_body_idx + 1 : close_body_idx]
-        # Split inner_tokens into statements (assuming each statement starts with a known keyword or pattern)
-        i = 0
-        while i < len(inner_tokens):
-            # Find the end of the current statement
-            if inner_tokens[i] in SUPPORTED_STATEMENTS or (i + 1 < len(inner_tokens) and inner_tokens[i + 1] == "="):
-                # Find closing parenthesis for function calls
-                if "(" in inner_tokens[i:]:
-                    open_paren = i + inner_tokens[i:].index("(")
-                    close_paren = open_paren + inner_tokens[open_paren:].index(")")
-                    stmt_tokens = inner_tokens[i : close_paren + 1]
-                    body.append(parse_tokens(stmt_tokens, line_number))
-                    i = close_paren + 1
-                else:
-                    # Assignment or other statement
-                    stmt_tokens = inner_tokens[i : i + 3]
-                    body.append(parse_tokens(stmt_tokens, line_number))
-                    i += 3
-            else:
-                raise MuffinScriptSyntaxError(UNSUPPORTED_STATEMENT, line_number)
-    else:
+def _expect(tokens: list[Token], position: int, kind: int, line_number: int) -> int:
+    """Ensures the token at `position` is of the given kind, returns the position just past it."""
+    if position >= len(tokens) or tokens[position].kind != kind:
         raise MuffinScriptSyntaxError(UNSUPPORTED_STATEMENT, line_number)
-
-    return body
+    return position + 1
+
+
+def _as_tokens(tokens: list[Token] | list[SUPPORTED_TYPES], line_number: int) -> list[Token]:
+    """Converts bare values (as returned by `tokenize`) to tokens, token lists are returned untouched."""
+    if tokens and isinstance(tokens[0], Token):
+        return tokens  # type:ignore
+    return [token_from_value(value, line_number) for value in cast(list[SUPPORTED_TYPES], tokens)]
+
+
+def _is_name(token: Token, name: str) -> bool:
+    """Whether the token is the given name (keywords, functions and variables are all names)."""
+    return token.kind == NAME and token.value == name
+
+
+_INTERPOLATION_PATTERN = re.compile(r"#\{(.*?)}")
+_OPENING_KINDS = {LPAREN, LBRACKET, LBRACE}
+_CLOSING_KINDS = {
+    RPAREN: LPAREN,
+    RBRACKET: LBRACKET,
+    RBRACE: LBRACE,
+}
+_COERCION_NODES = {
+    "float": FloatCoerceNode,
+    "int": IntCoerceNode,
+    "str": StringCoerceNode,
+}
+_FUNCTION_PARSERS = {
+    "cat": _parse_cat_call,
+    "float": _parse_coercion_call,
+    "int": _parse_coercion_call,
+    "max": _parse_reduction_call,
+    "mean": _parse_reduction_call,
+    "min": _parse_reduction_call,
+    "range": _parse_range_call,
+    "str": _parse_coercion_call,
+    "sum": _parse_reduction_call,
+    "type": _parse_type_check_call,
+}
@@ -0,0 +1,275 @@
+from itertools import repeat
+from types import MappingProxyType
+from typing import (
+    Any,
+    Callable,
+)
+
+from muffinscript import engines
+from muffinscript.ast import (
+    ArithmeticNode,
+    AssignNode,
+    VariableNode,
+)
+from muffinscript.ast.base import (
+    ForLoopNode,
+    IfNode,
+    ParallelForLoopNode,
+)
+from muffinscript.ast.types import (
+    ConstantNode,
+    FloatNode,
+    IntNode,
+)
+from muffinscript.constants import (
+    MUFFIN_ENGINE,
+    MUFFIN_OPTIMIZE,
+    SUPPORTED_TYPES,
+)
+from muffinscript.frame import (
+    UNSET,
+    Frame,
+)
+from muffinscript.lexer import tokenize_source
+from muffinscript.limits import (
+    BUDGET,
+    DEFAULT_LIMITS,
+    Budget,
+    Limits,
+    enforcing,
+)
+from muffinscript.lists import (
+    MuffinList,
+    array_types,
+    to_muffin_list,
+)
+from muffinscript.optimizer import optimize
+from muffinscript.output import OUTPUT
+from muffinscript.parser import parse_program
+from muffinscript.resolver import resolve
+
+# Operators that apply item by item to a whole column, `==` and `!=` compare whole lists instead
+_COLUMN_OPERATORS = {"+", "-", "*", "/", "%", ">", ">=", "<", "<="}
+
+
+class Program:
+    """A compiled MuffinScript program, ready to run any number of times.
+
+    Everything that only depends on the source (tokenizing, parsing, optimizing, resolving variables to slots and the
+    engine's own compilation) happened once in `compile`. Every `run` starts from a fresh set of variables, so runs
+    never see each other's state. A program can't be changed once compiled.
+
+    `assigned` names every variable the program writes, `vectorized` tells whether `run_columns` can run the program
+    once over whole columns instead of once per row.
+    """
+
+    __slots__ = ("engine", "symbols", "assigned", "vectorized", "_program", "_runner")
+
+    engine: str
+    symbols: MappingProxyType[str, int]
+    assigned: tuple[str, ...]
+    vectorized: bool
+    _program: list[Any]
+    _runner: Callable[[Frame], None]
+
+    def __init__(self, engine: str, program: list[Any], symbols: dict[str, int], runner: Callable[[Frame], None]):
+        self.engine = engine
+        self.symbols = MappingProxyType(dict(symbols))
+        self.assigned = _assigned_names(program)
+        self.vectorized = _is_vectorized(program)
+        self._program = program
+        # Set last, nothing can be changed once the program has its runner
+        self._runner = runner
+
+    def __setattr__(self, name: str, value: Any):
+        if hasattr(self, "_runner"):
+            raise AttributeError(f"{type(self).__name__} is immutable")
+        super().__setattr__(name, value)
+
+    def __delattr__(self, name: str):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    @property
+    def names(self) -> tuple[str, ...]:
+        """Every variable the program reads or writes."""
+        return tuple(self.symbols)
+
+    def run(
+        self, variables: dict[str, SUPPORTED_TYPES] | None = None, limits: Limits | None = None
+    ) -> dict[str, SUPPORTED_TYPES]:
+        """Runs the program and returns its variables once it finishes.
+
+        `variables` seeds the run's variables and is left untouched. `limits` (`DEFAULT_LIMITS` unless given) caps
+        what the run may do.
+        """
+        frame = self.frame(variables)
+        limits = limits or DEFAULT_LIMITS
+        with OUTPUT.buffering(), enforcing(limits):
+            self._limited_runner(limits)(frame)
+        return frame.to_dict()
+
+    def run_columns(self, columns: dict[str, Any], limits: Limits | None = None) -> dict[str, Any]:
+        """Runs the program once for every row of columnar input, returning a column for every variable it assigns.
+
+        `columns` maps variable names to equally long lists (or NumPy arrays), row `i` runs with every variable set to
+        item `i` of its column. Rows are just as isolated as separate `run` calls. When the program is nothing but
+        assignments of arithmetic and comparisons, it runs once with every variable holding its whole column and list
+        arithmetic (or NumPy, for arrays) does the work item by item. Otherwise a single frame is reset and reused for
+        every row. Variables a row never assigns come back as `null` (None).
+
+        `limits` apply to every row on its own, a run with limits never runs over whole columns (a column would count
+        as one long list).
+        """
+        limits = limits or DEFAULT_LIMITS
+        lengths = {len(column) for column in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Every column needs the same number of rows: {sorted(lengths)}")
+        rows = lengths.pop() if lengths else 0
+        with OUTPUT.buffering(), enforcing(limits):
+            if self.vectorized and not limits:
+                return self._run_vectorized(columns, rows)
+            return self._run_rows(columns, rows, limits)
+
+    def _run_vectorized(self, columns: dict[str, Any], rows: int) -> dict[str, Any]:
+        arrays = array_types()
+        frame = self.frame(
+            {name: column if isinstance(column, arrays) else _column_list(column) for name, column in columns.items()}
+        )
+        self._runner(frame)
+        results = {}
+        for name in self.assigned:
+            value = frame[name]
+            # Assignments that don't read any column (eg: `rate = 0.2`) are the same for every row
+            results[name] = value if isinstance(value, (list, *arrays)) else [value] * rows
+        return results
+
+    def _run_rows(self, columns: dict[str, Any], rows: int, limits: Limits) -> dict[str, Any]:
+        run = self._limited_runner(limits)
+        arrays = array_types()
+        frame = self.frame()
+        values = frame.values
+        blank = list(values)
+        inputs = [frame.slot(name) for name in columns]
+        # Slots are only reserved now, when a column isn't one of the program's own variables
+        blank.extend(repeat(UNSET, len(values) - len(blank)))
+        outputs = [frame.symbols[name] for name in self.assigned]
+        results: list[list[Any]] = [[] for _ in outputs]
+        data = [column.tolist() if isinstance(column, arrays) else column for column in columns.values()]
+        for row in zip(*data) if data else repeat((), rows):
+            values[:] = blank
+            for slot, value in zip(inputs, row):
+                values[slot] = to_muffin_list(value)
+            if limits:
+                # Every row gets the whole of its limits
+                BUDGET.set(Budget(limits))
+            run(frame)
+            for result, slot in zip(results, outputs):
+                value = values[slot]
+                result.append(None if value is UNSET else value)
+        return dict(zip(self.assigned, results))
+
+    def _limited_runner(self, limits: Limits) -> Callable[[Frame], None]:
+        """The compiled program, or the tree walker if there are limits (only it enforces them)."""
+        if not limits or self.engine == "tree":
+            return self._runner
+        return engines.COMPILERS["tree"](self._program)
+
+    def frame(self, variables: dict[str, SUPPORTED_TYPES] | None = None) -> Frame:
+        """Builds a fresh frame laid out the way the program was resolved, seeded with `variables`."""
+        frame = Frame()
+        frame.symbols = dict(self.symbols)
+        frame.values = [UNSET] * len(self.symbols)
+        if variables:
+            for name, value in variables.items():
+                frame[name] = value
+        return frame
+
+    def __repr__(self):
+        return f"Program(engine={self.engine!r}, names={self.names!r})"
+
+
+class Engine:
+    """Compiles MuffinScript source into programs for one engine (`MUFFIN_ENGINE` unless given).
+
+    `optimize` defaults to `MUFFIN_OPTIMIZE`.
+    """
+
+    __slots__ = ("name", "optimize")
+
+    def __init__(self, name: str | None = None, optimize: bool | None = None):
+        self.name = name or MUFFIN_ENGINE
+        self.optimize = MUFFIN_OPTIMIZE if optimize is None else optimize
+
+    def compile(self, source: str) -> Program:
+        """Tokenizes, parses and compiles source once, returning a program that can be run many times."""
+        program = parse_program(tokenize_source(source))
+        if self.optimize:
+            program, _ = optimize(program)
+        frame = Frame()
+        resolve(program, frame)
+        return Program(self.name, program, frame.symbols, engines.compile_program(program, self.name))
+
+    def run(self, source: str, variables: dict[str, SUPPORTED_TYPES] | None = None) -> dict[str, SUPPORTED_TYPES]:
+        """Compiles and runs source once, keep the program from `compile` to run the same source again."""
+        return self.compile(source).run(variables)
+
+    def __repr__(self):
+        return f"Engine(name={self.name!r}, optimize={self.optimize!r})"
+
+
+def compile(source: str, engine: str | None = None) -> Program:
+    """Compiles MuffinScript source into a `Program`, see `Engine.compile`."""
+    return Engine(engine).compile(source)
+
+
+def _column_list(column: Any) -> MuffinList:
+    """A whole column as a list, lists inside it are converted too (collecting the types is far quicker than that)."""
+    if list in set(map(type, column)):
+        return MuffinList(map(to_muffin_list, column))
+    return MuffinList(column)
+
+
+def _assigned_names(program: list[Any]) -> tuple[str, ...]:
+    """Names every variable the program assigns (loop variables included), in the order they are first assigned.
+
+    Assignments inside `pfor` loops happen in worker processes and are left out.
+    """
+    names: dict[str, None] = {}
+    work: list[Any] = list(reversed(program))
+    while work:
+        node = work.pop()
+        if isinstance(node, AssignNode):
+            names[node.var_name] = None
+        elif isinstance(node, IfNode):
+            work.extend(reversed(node.else_body))
+            work.extend(reversed(node.body))
+        elif isinstance(node, ParallelForLoopNode):
+            # Nothing a `pfor` loop assigns is visible once it's done
+            continue
+        elif isinstance(node, ForLoopNode):
+            names[node.item_name] = None
+            work.extend(reversed(node.body))
+    return tuple(names)
+
+
+def _is_vectorized(program: list[Any]) -> bool:
+    """Whether every statement assigns arithmetic or comparisons over variables and numbers, nothing else."""
+    work: list[Any] = []
+    for node in program:
+        if node:
+            if not isinstance(node, AssignNode):
+                return False
+            work.append(node.expression)
+    while work:
+        node = work.pop()
+        if isinstance(node, ArithmeticNode):
+            if node.operator not in _COLUMN_OPERATORS:
+                return False
+            work.append(node.left)
+            work.append(node.right)
+        elif isinstance(node, ConstantNode):
+            if type(node.value) not in (int, float, bool):
+                return False
+        elif not isinstance(node, (VariableNode, IntNode, FloatNode)):
+            return False
+    return True
@@ -0,0 +1,181 @@
+from typing import (
+    Any,
+    Iterator,
+)
+
+from muffinscript.ast import (
+    ArithmeticNode,
+    AssignNode,
+    CatNode,
+    PrintNode,
+    SleepNode,
+    VariableNode,
+)
+from muffinscript.ast.base import (
+    ForLoopNode,
+    IfNode,
+    ParallelForLoopNode,
+)
+from muffinscript.ast.standard_lib import (
+    FloatCoerceNode,
+    IntCoerceNode,
+    RangeNode,
+    ReductionNode,
+    StringCoerceNode,
+    TypeCheckNode,
+)
+from muffinscript.ast.types import (
+    InterpolationNode,
+    ListNode,
+)
+from muffinscript.constants import INVALID_PARALLEL_LOOP
+from muffinscript.errors import MuffinScriptSyntaxError
+from muffinscript.frame import (
+    UNSET,
+    Frame,
+)
+
+
+def resolve(program: list[Any], frame: Frame):
+    """Binds every variable read and write in the program to its slot in the frame.
+
+    Runs once before a program is evaluated so the interpreter never has to look a variable up by name. Nodes are
+    visited from an explicit work stack, in the order they run, so no nesting depth is too deep to resolve.
+
+    `pfor` loops may only assign variables of their own, see `_check_parallel_loop`. Loops that don't are rejected
+    here, before the program runs.
+    """
+    parallel_loops = []
+    work: list[Any] = list(reversed(program))
+    while work:
+        node = work.pop()
+        if isinstance(node, _Binding):
+            _bind(node.node, frame)
+        elif isinstance(node, VariableNode):
+            node.slot = frame.slot(str(node.value))
+        elif isinstance(node, AssignNode):
+            work.append(_Binding(node))
+            work.append(node.expression)
+        elif isinstance(node, ArithmeticNode):
+            work.append(node.right)
+            work.append(node.left)
+        elif isinstance(node, CatNode):
+            work.extend(reversed(node.args))
+        elif isinstance(node, ListNode):
+            work.extend(reversed(node.items))
+        elif isinstance(node, RangeNode):
+            work.extend(reversed(node.args))
+        elif isinstance(node, InterpolationNode):
+            work.extend(reversed(node.parts))
+        elif isinstance(node, SleepNode):
+            work.append(node.duration)
+        elif isinstance(
+            node, (PrintNode, TypeCheckNode, ReductionNode, StringCoerceNode, IntCoerceNode, FloatCoerceNode)
+        ):
+            work.append(node.value)
+        elif isinstance(node, IfNode):
+            work.extend(reversed(node.else_body))
+            work.extend(reversed(node.body))
+            work.append(node.condition)
+        elif isinstance(node, ForLoopNode):
+            if isinstance(node, ParallelForLoopNode):
+                parallel_loops.append(node)
+            work.extend(reversed(node.body))
+            work.append(_Binding(node))
+            work.append(node.iterable)
+    for loop in parallel_loops:
+        _check_parallel_loop(loop, program, frame)
+
+
+class _Binding:
+    """Marks where a node's own variable gets its slot, after the expression it's assigned from."""
+
+    __slots__ = ("node",)
+
+    def __init__(self, node: AssignNode | ForLoopNode):
+        self.node = node
+
+
+def _check_parallel_loop(loop: ParallelForLoopNode, program: list[Any], frame: Frame):
+    """Rejects a `pfor` loop whose workers' writes would be lost.
+
+    A variable assigned in the body can't be used anywhere outside of the loop (or already be set in the frame). Loop
+    variables (the `pfor` loop's own and those of loops in its body) only exist inside their loop: other loops may
+    reuse their names, but reading one anywhere else is rejected.
+    """
+    body = list(_walk(loop.body))
+    assigned = {node.slot for node in body if isinstance(node, AssignNode)}
+    loop_variables = {node.item_slot for node in body if isinstance(node, ForLoopNode)}
+    loop_variables.add(loop.item_slot)
+    outside = {
+        _slot(node) for node in _walk(program, loop) if isinstance(node, (VariableNode, AssignNode, ForLoopNode))
+    }
+    outside.update(slot for slot, value in enumerate(frame.values) if value is not UNSET)
+    if assigned & outside or loop_variables & _unbound_reads(program, loop):
+        raise MuffinScriptSyntaxError(INVALID_PARALLEL_LOOP, loop.line_number)
+
+
+def _walk(nodes: list[Any], skip: Any = None) -> Iterator[Any]:
+    """Yields every node of a block, of `skip` only its iterable is visited."""
+    work: list[Any] = list(nodes)
+    while work:
+        node = work.pop()
+        if node is skip:
+            work.append(node.iterable)
+            continue
+        yield node
+        work.extend(_children(node))
+
+
+def _unbound_reads(nodes: list[Any], skip: Any) -> set[int | None]:
+    """Slots of the variables read outside of `skip` other than inside a loop over that same variable."""
+    reads = set()
+    # Each entry is a node and the slots of the loops it sits in
+    work: list[tuple[Any, frozenset[int | None]]] = [(node, frozenset()) for node in nodes]
+    while work:
+        node, bound = work.pop()
+        if node is skip:
+            work.append((node.iterable, bound))
+        elif isinstance(node, VariableNode):
+            if node.slot not in bound:
+                reads.add(node.slot)
+        elif isinstance(node, ForLoopNode):
+            work.append((node.iterable, bound))
+            work.extend((statement, bound | {node.item_slot}) for statement in node.body)
+        else:
+            work.extend((child, bound) for child in _children(node))
+    return reads
+
+
+def _children(node: Any) -> list[Any]:
+    """The nodes directly inside a node, in no particular order."""
+    if isinstance(node, AssignNode):
+        return [node.expression]
+    elif isinstance(node, ArithmeticNode):
+        return [node.left, node.right]
+    elif isinstance(node, (CatNode, RangeNode)):
+        return node.args
+    elif isinstance(node, ListNode):
+        return node.items
+    elif isinstance(node, InterpolationNode):
+        return node.parts
+    elif isinstance(node, SleepNode):
+        return [node.duration]
+    elif isinstance(node, (PrintNode, TypeCheckNode, ReductionNode, StringCoerceNode, IntCoerceNode, FloatCoerceNode)):
+        return [node.value]
+    elif isinstance(node, IfNode):
+        return [node.condition, *node.body, *node.else_body]
+    elif isinstance(node, ForLoopNode):
+        return [node.iterable, *node.body]
+    return []
+
+
+def _slot(node: VariableNode | AssignNode | ForLoopNode) -> int | None:
+    return node.item_slot if isinstance(node, ForLoopNode) else node.slot
+
+
+def _bind(node: AssignNode | ForLoopNode, frame: Frame):
+    if isinstance(node, AssignNode):
+        node.slot = frame.slot(node.var_name)
+    else:
+        node.item_slot = frame.slot(node.item_name)
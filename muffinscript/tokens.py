@@ -0,0 +1,69 @@
+from muffinscript.constants import SUPPORTED_TYPES
+
+# Token kinds
+NAME = 0
+STRING = 1
+INT = 2
+FLOAT = 3
+BOOL = 4
+NULL = 5
+OPERATOR = 6
+ASSIGN = 7
+LPAREN = 8
+RPAREN = 9
+LBRACE = 10
+RBRACE = 11
+LBRACKET = 12
+RBRACKET = 13
+COMMA = 14
+
+PUNCTUATION_KINDS = {
+    "=": ASSIGN,
+    "(": LPAREN,
+    ")": RPAREN,
+    "{": LBRACE,
+    "}": RBRACE,
+    "[": LBRACKET,
+    "]": RBRACKET,
+    ",": COMMA,
+}
+SYMBOL_KINDS = PUNCTUATION_KINDS | dict.fromkeys(["==", "!=", ">=", "<=", "+", "-", "*", "/", "%", ">", "<"], OPERATOR)
+
+
+class Token:
+    """A single token along with where it was found in the source: kind, value, line and column.
+
+    The kind is one of the small integer codes above so consumers never need to inspect the value to tell a string
+    literal from a name. String values are stored without their quotes and names are interned.
+    """
+
+    __slots__ = ("kind", "value", "line", "column")
+
+    def __init__(self, kind: int, value: SUPPORTED_TYPES, line: int, column: int):
+        self.kind = kind
+        self.value = value
+        self.line = line
+        self.column = column
+
+    def __repr__(self):
+        return f"Token({self.kind}, {self.value!r}, {self.line}:{self.column})"
+
+
+def token_from_value(value: SUPPORTED_TYPES, line_number: int) -> Token:
+    """Builds a token from a bare value as returned by `tokenize`, where strings are wrapped in quotes."""
+    if value is True or value is False:
+        return Token(BOOL, value, line_number, 0)
+    elif value is None:
+        return Token(NULL, value, line_number, 0)
+    elif isinstance(value, int):
+        return Token(INT, value, line_number, 0)
+    elif isinstance(value, float):
+        return Token(FLOAT, value, line_number, 0)
+    elif isinstance(value, str) and len(value) > 1 and value[0] == value[-1] and value[0] in "\"'":
+        return Token(STRING, value[1:-1], line_number, 0)
+    elif isinstance(value, str) and value in SYMBOL_KINDS:
+        return Token(SYMBOL_KINDS[value], value, line_number, 0)
+    elif isinstance(value, str) and not value.isidentifier():
+        # Could never have been a name, eg: "2" or "hello world"
+        return Token(STRING, value, line_number, 0)
+    return Token(NAME, value, line_number, 0)
@@ -0,0 +1,330 @@
+import ast
+from typing import Any
+
+from muffinscript.ast import (
+    ArithmeticNode,
+    AssignNode,
+    BoolNode,
+    CatNode,
+    ConstantNode,
+    FloatNode,
+    IntNode,
+    NullNode,
+    PrintNode,
+    SleepNode,
+    StringNode,
+    VariableNode,
+)
+from muffinscript.ast.base import (
+    ForLoopNode,
+    IfNode,
+    ParallelForLoopNode,
+)
+from muffinscript.ast.standard_lib import (
+    FloatCoerceNode,
+    IntCoerceNode,
+    RangeNode,
+    ReductionNode,
+    StringCoerceNode,
+    TypeCheckNode,
+)
+from muffinscript.ast.types import (
+    InterpolationNode,
+    ListNode,
+)
+from muffinscript.constants import (
+    ITERABLE_TYPES,
+    PYTHON_TO_MUFFIN_TYPES,
+    UNDEFINED_VARIABLE,
+    UNSUPPORTED_STATEMENT,
+)
+from muffinscript.errors import (
+    MuffinScriptRuntimeError,
+    with_line_number,
+)
+from muffinscript.frame import (
+    UNSET,
+    Frame,
+)
+from muffinscript.interpreter import (
+    coerce_number,
+    make_range,
+)
+from muffinscript.lists import MuffinList
+from muffinscript.output import (
+    OUTPUT,
+    sleep,
+)
+from muffinscript.parallel import run_parallel_loop
+from muffinscript.vector import (
+    array_type_name,
+    reduce_list,
+)
+
+FILENAME = "<muffinscript>"
+FUNCTION_NAME = "__muffin_main__"
+VARIABLE_PREFIX = "v_"
+
+_BINARY_OPERATORS = {
+    "+": ast.Add,
+    "-": ast.Sub,
+    "*": ast.Mult,
+    "/": ast.Div,
+    "%": ast.Mod,
+}
+_COMPARISON_OPERATORS = {
+    "==": ast.Eq,
+    "!=": ast.NotEq,
+    ">": ast.Gt,
+    ">=": ast.GtE,
+    "<": ast.Lt,
+    "<=": ast.LtE,
+}
+_SCALAR_TYPES = (str, int, float, bool, type(None))
+
+
+class TranspiledProgram:
+    """A MuffinScript program lowered to a Python code object.
+
+    `line_table` maps each line of the generated Python code back to the MuffinScript line it came from.
+    """
+
+    __slots__ = ("code", "line_table", "constants")
+
+    def __init__(self, code: Any, line_table: dict[int, int], constants: list[Any]):
+        self.code = code
+        self.line_table = line_table
+        self.constants = constants
+
+    def run(self, frame: Frame):
+        """Runs the program against the frame, variables are written back to it even if the program fails."""
+        namespace: dict[str, Any] = {
+            "__UNSET": UNSET,
+            "__constants": self.constants,
+            "__store": _store,
+            "__iterable": _iterable,
+            "__print": OUTPUT.write,
+            "__sleep": sleep,
+            "__type_of": _type_of,
+            "__coerce": coerce_number,
+            "__range": make_range,
+            "__list": MuffinList,
+            "__reduce": reduce_list,
+            "__snapshot": _snapshot,
+            "__pfor": run_parallel_loop,
+        }
+        exec(self.code, namespace)  # nosec B102 - the code was generated by `transpile` from a parsed program
+        try:
+            namespace[FUNCTION_NAME](frame.values)
+        except NameError as error:
+            # Reading a variable that was never assigned, `UnboundLocalError` is a subclass
+            raise MuffinScriptRuntimeError(UNDEFINED_VARIABLE, self.error_line(error)) from None
+        except MuffinScriptRuntimeError as error:
+            raise with_line_number(error, self.error_line(error))
+
+    def error_line(self, error: BaseException) -> int:
+        """Finds the MuffinScript line being run when an error was raised inside the generated code."""
+        line_number = 0
+        traceback = error.__traceback__
+        while traceback is not None:
+            if traceback.tb_frame.f_code.co_filename == FILENAME:
+                line_number = self.line_table.get(traceback.tb_lineno, line_number)
+            traceback = traceback.tb_next
+        return line_number
+
+
+def run_program(program: list[Any], frame: Frame):
+    """Transpiles resolved top-level nodes to Python bytecode, then runs it against the frame."""
+    transpile(program).run(frame)
+
+
+def transpile(program: list[Any]) -> TranspiledProgram:
+    """Lowers resolved top-level nodes to a Python `ast.Module` and compiles it.
+
+    The module defines one function taking the frame's values. Every MuffinScript variable becomes a Python local,
+    loaded from its slot on entry (unset slots stay unbound so reading them fails like an undefined variable) and
+    stored back on the way out. Loops and arithmetic then run as plain CPython bytecode.
+    """
+    return _Transpiler().transpile(program)
+
+
+class _Transpiler:
+    """Holds the state built up while lowering one program: the line table, used slots and non-literal constants."""
+
+    def __init__(self):
+        self.line_table: dict[int, int] = {}
+        self.slots: set[int] = set()
+        self.constants: list[Any] = []
+        # Line 1 holds the function definition, every statement after gets a line of its own
+        self.next_line = 2
+
+    def transpile(self, program: list[Any]) -> TranspiledProgram:
+        body = self.block([(node, node.line_number) for node in program if node])
+        prologue = [self.load(slot) for slot in sorted(self.slots)]
+        store = ast.Expr(_call("__store", ast.Name("__values", ast.Load()), _call("locals")))
+        function = ast.FunctionDef(
+            name=FUNCTION_NAME,
+            args=ast.arguments(
+                posonlyargs=[],
+                args=[ast.arg("__values")],
+                kwonlyargs=[],
+                kw_defaults=[],
+                defaults=[],
+            ),
+            body=prologue + [ast.Try(body=body, handlers=[], orelse=[], finalbody=[store])],
+            decorator_list=[],
+            lineno=1,
+        )
+        module = ast.Module(body=[function], type_ignores=[])
+        ast.fix_missing_locations(module)
+        code = compile(module, FILENAME, "exec")
+        return TranspiledProgram(code, self.line_table, self.constants)
+
+    def block(self, statements: list[tuple[Any, int]]) -> list[ast.stmt]:
+        """Lowers statements paired with the MuffinScript line they report errors on."""
+        body = [self.statement(statement, line_number) for statement, line_number in statements]
+        return body or [ast.Pass()]
+
+    def body(self, statements: list[Any]) -> list[ast.stmt]:
+        return self.block([(statement, statement.line_number) for statement in statements])
+
+    def statement(self, node: Any, line_number: int) -> ast.stmt:
+        python_line = self.next_line
+        self.next_line += 1
+        self.line_table[python_line] = line_number
+
+        statement: ast.stmt
+        if isinstance(node, AssignNode):
+            target = self.variable(node.slot, ast.Store())
+            statement = ast.Assign(targets=[target], value=self.expression(node.expression, line_number))
+        elif isinstance(node, PrintNode):
+            statement = ast.Expr(_call("__print", self.expression(node.value, line_number)))
+        elif isinstance(node, SleepNode):
+            statement = ast.Expr(_call("__sleep", self.expression(node.duration, line_number)))
+        elif isinstance(node, IfNode):
+            statement = ast.If(
+                test=self.expression(node.condition, line_number),
+                body=self.body(node.body),
+                orelse=self.body(node.else_body) if node.else_body else [],
+            )
+        elif isinstance(node, ParallelForLoopNode):
+            # The body runs in worker processes (on the tree walker) against the slots, locals included
+            values = _call("__snapshot", ast.Name("__values", ast.Load()), _call("locals"))
+            iterable = self.expression(node.iterable, line_number)
+            statement = ast.Expr(_call("__pfor", self.constant(node), iterable, values, ast.Constant(line_number)))
+        elif isinstance(node, ForLoopNode):
+            iterable = _call("__iterable", self.expression(node.iterable, line_number), ast.Constant(line_number))
+            statement = ast.For(
+                target=self.variable(node.item_slot, ast.Store()),
+                iter=iterable,
+                body=self.body(node.body),
+                orelse=[],
+            )
+        else:
+            statement = ast.Expr(self.expression(node, line_number))
+
+        # Nested statements already have their own lines, only fill in what is still missing
+        for child in ast.walk(statement):
+            if "lineno" in child._attributes and getattr(child, "lineno", None) is None:
+                child.lineno = child.end_lineno = python_line  # type: ignore
+                child.col_offset = child.end_col_offset = 0  # type: ignore
+        return statement
+
+    def expression(self, node: Any, line_number: int) -> ast.expr:
+        if isinstance(node, VariableNode):
+            return self.variable(node.slot, ast.Load())
+        elif isinstance(node, (StringNode, IntNode, FloatNode, BoolNode, NullNode, ConstantNode)):
+            return self.constant(node.value)
+        elif isinstance(node, ArithmeticNode):
+            left = self.expression(node.left, line_number)
+            right = self.expression(node.right, line_number)
+            if node.operator in _BINARY_OPERATORS:
+                return ast.BinOp(left=left, op=_BINARY_OPERATORS[node.operator](), right=right)
+            return ast.Compare(left=left, ops=[_COMPARISON_OPERATORS[node.operator]()], comparators=[right])
+        elif isinstance(node, CatNode):
+            return self.join(self.expression(arg, line_number) for arg in node.args)
+        elif isinstance(node, InterpolationNode):
+            return self.join(
+                ast.Constant(part) if isinstance(part, str) else self.expression(part, line_number)
+                for part in node.parts
+            )
+        elif isinstance(node, ListNode):
+            items = ast.List(elts=[self.expression(item, line_number) for item in node.items], ctx=ast.Load())
+            return _call("__list", items)
+        elif isinstance(node, RangeNode):
+            args = ast.List(elts=[self.expression(arg, line_number) for arg in node.args], ctx=ast.Load())
+            return _call("__range", args, ast.Constant(line_number))
+        elif isinstance(node, ReductionNode):
+            value = self.expression(node.value, line_number)
+            return _call("__reduce", ast.Constant(node.function), value, ast.Constant(line_number))
+        elif isinstance(node, TypeCheckNode):
+            return _call("__type_of", self.expression(node.value, line_number))
+        elif isinstance(node, StringCoerceNode):
+            return _call("str", self.expression(node.value, line_number))
+        elif isinstance(node, (IntCoerceNode, FloatCoerceNode)):
+            to_type = "int" if isinstance(node, IntCoerceNode) else "float"
+            value = self.expression(node.value, line_number)
+            return _call("__coerce", ast.Name(to_type, ast.Load()), value, ast.Constant(line_number))
+        # Raw Python values pass straight through, as they do when evaluated
+        return self.constant(node)
+
+    def join(self, parts: Any) -> ast.expr:
+        """Concatenates the `str()` of every part, as `cat` and interpolation do."""
+        values: list[ast.expr] = [
+            part if isinstance(part, ast.Constant) and isinstance(part.value, str) else ast.FormattedValue(part, 115)
+            for part in parts
+        ]
+        return ast.JoinedStr(values=values)
+
+    def constant(self, value: Any) -> ast.expr:
+        if isinstance(value, _SCALAR_TYPES):
+            return ast.Constant(value)
+        # Values Python can't embed in code (eg: lists) are read from a table
+        self.constants.append(value)
+        return ast.Subscript(
+            value=ast.Name("__constants", ast.Load()),
+            slice=ast.Constant(len(self.constants) - 1),
+            ctx=ast.Load(),
+        )
+
+    def variable(self, slot: int | None, context: ast.expr_context) -> ast.Name:
+        self.slots.add(slot)  # type: ignore
+        return ast.Name(f"{VARIABLE_PREFIX}{slot}", context)
+
+    def load(self, slot: int) -> ast.stmt:
+        """`if __values[slot] is not __UNSET: v_slot = __values[slot]`"""
+        value = ast.Subscript(value=ast.Name("__values", ast.Load()), slice=ast.Constant(slot), ctx=ast.Load())
+        return ast.If(
+            test=ast.Compare(left=value, ops=[ast.IsNot()], comparators=[ast.Name("__UNSET", ast.Load())]),
+            body=[ast.Assign(targets=[ast.Name(f"{VARIABLE_PREFIX}{slot}", ast.Store())], value=value)],
+            orelse=[],
+        )
+
+
+def _call(function: str, *args: ast.expr) -> ast.Call:
+    return ast.Call(func=ast.Name(function, ast.Load()), args=list(args), keywords=[])
+
+
+def _store(values: list[Any], names: dict[str, Any]):
+    """Writes the program's locals back to their frame slots."""
+    for name, value in names.items():
+        if name.startswith(VARIABLE_PREFIX):
+            values[int(name[len(VARIABLE_PREFIX) :])] = value
+
+
+def _snapshot(values: list[Any], names: dict[str, Any]) -> list[Any]:
+    """Copies the frame's slots with the program's current locals written in."""
+    values = list(values)
+    _store(values, names)
+    return values
+
+
+def _iterable(value: Any, line_number: int) -> list | range:
+    if not isinstance(value, ITERABLE_TYPES):
+        raise MuffinScriptRuntimeError(UNSUPPORTED_STATEMENT, line_number)
+    return value
+
+
+def _type_of(value: Any) -> str:
+    muffin_type = PYTHON_TO_MUFFIN_TYPES.get(type(value))
+    return array_type_name(value) if muffin_type is None else muffin_type
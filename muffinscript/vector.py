@@ -0,0 +1,67 @@
+import statistics
+from typing import (
+    Any,
+    Callable,
+)
+
+from muffinscript.constants import (
+    INVALID_REDUCTION,
+    ITERABLE_TYPES,
+    SUPPORTED_TYPES,
+)
+from muffinscript.errors import (
+    MuffinScriptBaseError,
+    MuffinScriptRuntimeError,
+    with_line_number,
+)
+from muffinscript.lists import array_types
+
+REDUCTIONS: dict[str, Callable[[Any], SUPPORTED_TYPES]] = {
+    "sum": sum,
+    "min": min,
+    "max": max,
+    "mean": statistics.fmean,
+}
+
+
+def array_type_name(value: Any) -> str:
+    """Names the MuffinScript type of a value missing from `PYTHON_TO_MUFFIN_TYPES`, arrays are lists."""
+    if isinstance(value, array_types()):
+        return "list"
+    raise MuffinScriptBaseError()
+
+
+def reduce_list(function: str, value: Any, line_number: int) -> SUPPORTED_TYPES:
+    """Reduces a list (or range) to `sum`, `min`, `max` or `mean`.
+
+    Lists run through the C builtins, converting one to a NumPy array costs more than the reduction itself. NumPy
+    arrays reduce natively and hand back a plain Python number. Ranges are reduced from their ends, without going
+    through a single item in between.
+    """
+    if isinstance(value, array_types()):
+        if not value.size and function != "sum":
+            raise MuffinScriptRuntimeError(INVALID_REDUCTION, line_number)
+        return getattr(value, function)().item()
+    if not isinstance(value, ITERABLE_TYPES) or (not value and function != "sum"):
+        raise MuffinScriptRuntimeError(INVALID_REDUCTION, line_number)
+    if isinstance(value, range):
+        return _reduce_range(function, value)
+    try:
+        return REDUCTIONS[function](value)
+    except MuffinScriptRuntimeError as error:
+        # Lists of lists add and compare item by item
+        raise with_line_number(error, line_number)
+
+
+def _reduce_range(function: str, value: range) -> SUPPORTED_TYPES:
+    """Reduces a range from its first and last items, it's evenly spaced so those are all a reduction needs."""
+    if not value:
+        return 0
+    first, last = value[0], value[-1]
+    if function == "sum":
+        return len(value) * (first + last) // 2
+    elif function == "min":
+        return min(first, last)
+    elif function == "max":
+        return max(first, last)
+    return (first + last) / 2
@@ -6,6 +6,8 @@ from muffinscript.ast import (
 from muffinscript.ast.standard_lib import (
     FloatCoerceNode,
     IntCoerceNode,
+    RangeNode,
+    ReductionNode,
     StringCoerceNode,
     TypeCheckNode,
 )
@@ -23,6 +25,19 @@ def test_cat_node():
     assert node.line_number == 1
 
 
+def test_range_node():
+    node = RangeNode(args=[1, 10, 2], line_number=1)
+    assert node.args == [1, 10, 2]
+    assert node.line_number == 1
+
+
+def test_reduction_node():
+    node = ReductionNode(function="sum", value="foo", line_number=1)
+    assert node.function == "sum"
+    assert node.value == "foo"
+    assert node.line_number == 1
+
+
 def test_sleep_node():
     node = SleepNode(duration=1000.5, line_number=1)
     assert node.duration == 1000.5
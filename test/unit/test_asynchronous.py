@@ -0,0 +1,100 @@
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+
+from muffinscript.asynchronous import (
+    _sleepy_statements,
+    run_async,
+)
+from muffinscript.errors import (
+    MuffinScriptLimitError,
+    MuffinScriptRuntimeError,
+)
+from muffinscript.lexer import tokenize_source
+from muffinscript.limits import Limits
+from muffinscript.parser import parse_program
+
+
+def test_run_async(capsys):
+    variables = {"name": "muffin"}
+    source = 'p("hello #{name}")\nfor (i in range(3)) {\n    if (i > 0) { sleep(0) }\n    p(i)\n}\ndone = true\n'
+    result = asyncio.run(run_async(source, variables))
+
+    assert capsys.readouterr().out == "hello muffin\n0\n1\n2\n"
+    assert result == {"name": "muffin", "i": 2, "done": "true"}
+    assert variables == {"name": "muffin"}
+    assert asyncio.run(run_async("ys = xs * 2\n", {"xs": [1, 2]}))["ys"] == [2, 4]
+
+
+def test_run_async_awaits_sleep():
+    async def fake_sleep(seconds):
+        calls.append(seconds)
+
+    calls = []
+    with patch("asyncio.sleep", fake_sleep), patch("time.sleep") as blocking_sleep:
+        asyncio.run(run_async("wait = 0.5\nsleep(wait)\nif (true) { sleep(2) }\n"))
+
+    assert calls == [0.5, 2]
+    blocking_sleep.assert_not_called()
+
+
+def test_run_async_scripts_sleep_side_by_side(capsys):
+    async def run_all():
+        return await asyncio.gather(*(run_async(f"sleep(0.2)\nscript = {i}\n") for i in range(500)))
+
+    start = time.perf_counter()
+    results = asyncio.run(run_all())
+
+    assert time.perf_counter() - start < 5
+    assert [result["script"] for result in results] == list(range(500))
+
+
+def test_run_async_errors():
+    with pytest.raises(MuffinScriptRuntimeError) as error:
+        asyncio.run(run_async("for (i in [1]) {\n    sleep(0)\n    p(missing)\n}\n"))
+    assert error.value.message == "Undefined variable"
+    assert error.value.line_number == 3
+
+    with pytest.raises(MuffinScriptRuntimeError) as error:
+        asyncio.run(run_async("x = 1\nfor (i in x) { sleep(0) }\n"))
+    assert error.value.message == "Unsupported statement"
+    assert error.value.line_number == 2
+
+
+def test_sleepy_statements():
+    program = parse_program(tokenize_source("p(1)\nif (true) {\n    for (i in [1]) { sleep(0) }\n    p(2)\n}\n"))
+    sleepy = _sleepy_statements(program)
+
+    loop = program[1].body[0]
+    assert sleepy == {id(program[1]), id(loop), id(loop.body[0])}
+
+
+def test_run_async_limits():
+    source = "for (i in range(100)) {\n    sleep(0)\n}\n"
+    with pytest.raises(MuffinScriptLimitError) as error:
+        asyncio.run(run_async(source, limits=Limits(max_steps=50)))
+    assert error.value.message == "Step limit exceeded: 50"
+
+    start = time.monotonic()
+    with pytest.raises(MuffinScriptLimitError) as error:
+        asyncio.run(run_async("p(1)\nsleep(1000)\n", limits=Limits(timeout=0.05)))
+    assert time.monotonic() - start < 10
+    assert error.value.message == "Time limit exceeded: 0.05s"
+    assert error.value.line_number == 2
+
+    with patch("muffinscript.asynchronous.DEFAULT_LIMITS", Limits(max_steps=5)):
+        with pytest.raises(MuffinScriptLimitError):
+            asyncio.run(run_async("for (i in range(10)) { x = i }\n"))
+
+
+def test_run_async_limits_per_script():
+    """Scripts on the same loop each have a budget of their own."""
+
+    async def run_all():
+        return await asyncio.gather(
+            *(run_async("for (i in range(10)) {\n    sleep(0)\n}\n", limits=Limits(max_steps=40)) for _ in range(5))
+        )
+
+    assert [result["i"] for result in asyncio.run(run_all())] == [9] * 5
@@ -0,0 +1,96 @@
+import sys
+
+import pytest
+
+from muffinscript.batch import (
+    ScriptResult,
+    format_summary,
+    run_script,
+    run_scripts,
+)
+from muffinscript.muffin import main
+
+
+@pytest.fixture
+def scripts(tmp_path, monkeypatch):
+    monkeypatch.setattr("muffinscript.muffin.MUFFIN_CACHE", False)
+    sources = {
+        "first.ms": 'p("one")\np("two")\n',
+        "undefined.ms": 'p("before")\np(missing)\n',
+        "crash.ms": "x = 1 / 0\n",
+        "last.ms": "p(3)\n",
+    }
+    paths = []
+    for name, source in sources.items():
+        path = tmp_path / name
+        path.write_text(source)
+        paths.append(str(path))
+    return paths
+
+
+def test_run_script(scripts):
+    result = run_script(scripts[0])
+    assert (result.status, result.output) == (0, "one\ntwo\n")
+    assert result.seconds >= 0
+
+    result = run_script(scripts[1])
+    assert (result.status, result.output) == (
+        1,
+        "before\n\033[31mRUNTIME ERROR\033[0m - Undefined variable | line: 2\n",
+    )
+
+    result = run_script(scripts[2])
+    assert result.status == 1
+    assert result.output.endswith("ZeroDivisionError: division by zero\n")
+
+
+def test_run_scripts_keeps_order(scripts):
+    results = run_scripts(scripts, 2)
+
+    assert [result.path for result in results] == scripts
+    assert [result.status for result in results] == [0, 1, 1, 0]
+    assert results[-1].output == "3\n"
+
+
+def test_run_scripts_with_pfor(tmp_path, monkeypatch):
+    monkeypatch.setattr("muffinscript.muffin.MUFFIN_CACHE", False)
+    path = tmp_path / "parallel.ms"
+    path.write_text("pfor (j in range(4)) { p(j) }\n")
+
+    (result,) = run_scripts([str(path)], 1)
+
+    assert (result.status, result.output) == (0, "0\n1\n2\n3\n")
+
+
+def test_format_summary():
+    results = [ScriptResult("a.ms", 0, "", 0.5), ScriptResult("b.ms", 1, "", 0.25)]
+    assert format_summary(results, 0.6) == (
+        "status     seconds  script\n"
+        "ok           0.500  a.ms\n"
+        "failed       0.250  b.ms\n"
+        "2 scripts, 1 failed, 0.750s of script time in 0.600s"
+    )
+
+
+def test_main_jobs(scripts, monkeypatch, capsys):
+    monkeypatch.setattr(sys, "argv", ["muffin", "--jobs", "2", scripts[0], scripts[3]])
+    with pytest.raises(SystemExit) as exit_info:
+        main()
+
+    captured = capsys.readouterr()
+    assert exit_info.value.code == 0
+    assert captured.out == "one\ntwo\n3\n"
+    assert "2 scripts, 0 failed" in captured.err
+
+    monkeypatch.setattr(sys, "argv", ["muffin", "--jobs", "2", scripts[1]])
+    with pytest.raises(SystemExit) as exit_info:
+        main()
+    assert exit_info.value.code == 1
+
+
+def test_main_jobs_usage(monkeypatch, capsys):
+    for args in (["--jobs"], ["--jobs", "2"], ["--jobs", "none", "a.ms"], ["--jobs", "0", "a.ms"]):
+        monkeypatch.setattr(sys, "argv", ["muffin", *args])
+        with pytest.raises(SystemExit):
+            main()
+        assert capsys.readouterr().out == "Usage: muffin --jobs N filename.ms ...\n"
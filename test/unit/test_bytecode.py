@@ -0,0 +1,97 @@
+import pickle
+
+import pytest
+
+from muffinscript.bytecode import (
+    BINARY_OP,
+    LOAD_CONST,
+    LOAD_VAR,
+    PRINT,
+    STORE_VAR,
+    compile_program,
+    disassemble,
+    execute,
+)
+from muffinscript.frame import Frame
+from muffinscript.lexer import tokenize_source
+from muffinscript.parser import parse_program
+from muffinscript.resolver import resolve
+
+
+def _compile_source(source, frame):
+    program = parse_program(tokenize_source(source))
+    resolve(program, frame)
+    return compile_program(program)
+
+
+def test_compile_program():
+    bytecode = _compile_source("a = 2\np(a + 2)", Frame())
+
+    assert bytecode.code.typecode == "i"
+    assert bytecode.code.tolist() == [LOAD_CONST, 0, STORE_VAR, 0, LOAD_VAR, 0, LOAD_CONST, 0, BINARY_OP, 0, PRINT, 0]
+    assert bytecode.lines.tolist() == [1, 1, 2, 2, 2, 2]
+    # Equal constants share a slot in the pool, but values that only compare equal do not
+    assert bytecode.constants == [2]
+    assert _compile_source("p(cat(1, 1.0, true, [1], 1))", Frame()).constants == [1, 1.0, "true"]
+
+
+def test_compile_program_unresolved():
+    with pytest.raises(ValueError) as error:
+        compile_program(parse_program(tokenize_source("a = 2")))
+
+    assert str(error.value) == "Variable 'a' wasn't resolved to a slot, resolve the program before compiling it"
+
+
+def test_execute(capsys):
+    frame = Frame({"a": 2})
+    bytecode = _compile_source("b = a * 3\np(b - a)", frame)
+
+    execute(bytecode, frame)
+    frame["a"] = 10
+    execute(pickle.loads(pickle.dumps(bytecode)), frame)
+
+    captured = capsys.readouterr()
+    assert captured.out == "4\n20\n"
+    assert frame.to_dict() == {"a": 10, "b": 30}
+
+
+def test_disassemble():
+    source = (
+        "total = 0\n"
+        "for (i in [1, 2]) {\n"
+        "    if (i > 1) {\n"
+        "        total = total + i\n"
+        "    } else {\n"
+        '        p("#{i}!")\n'
+        "    }\n"
+        "}\n"
+    )
+    bytecode = _compile_source(source, Frame())
+
+    assert disassemble(bytecode) == "\n".join(
+        [
+            "   1      0 LOAD_CONST        0 (0)",
+            "          1 STORE_VAR         0 (total)",
+            "   2      2 LOAD_CONST        1 (1)",
+            "          3 LOAD_CONST        2 (2)",
+            "          4 BUILD_LIST        2",
+            "          5 GET_ITER          0",
+            "          6 FOR_ITER         22 (to 22)",
+            "          7 STORE_VAR         1 (i)",
+            "   3      8 LOAD_VAR          1 (i)",
+            "          9 LOAD_CONST        1 (1)",
+            "         10 BINARY_OP         7 (>)",
+            "         11 JUMP_IF_FALSE    17 (to 17)",
+            "   4     12 LOAD_VAR          0 (total)",
+            "         13 LOAD_VAR          1 (i)",
+            "         14 BINARY_OP         0 (+)",
+            "         15 STORE_VAR         0 (total)",
+            "   3     16 JUMP             21 (to 21)",
+            "   6     17 LOAD_VAR          1 (i)",
+            "         18 LOAD_CONST        3 ('!')",
+            "         19 BUILD_STRING      2",
+            "         20 PRINT             0",
+            "   2     21 JUMP              6 (to 6)",
+        ]
+    )
+    assert "COERCE            1 (int)" in disassemble(_compile_source('a = "2"\np(int(a))', Frame()))
@@ -0,0 +1,127 @@
+import os
+import pickle
+
+import pytest
+
+from muffinscript import cache
+from muffinscript.ast.standard_lib import PrintNode
+from muffinscript.ast.types import ConstantNode
+from muffinscript.lexer import tokenize_source
+from muffinscript.lists import MuffinList
+from muffinscript.optimizer import optimize
+from muffinscript.parser import parse_program
+
+
+@pytest.fixture
+def script(tmp_path):
+    path = tmp_path / "script.ms"
+    path.write_text("p(1)\n")
+    return str(path)
+
+
+def test_cache_path(monkeypatch, script, tmp_path):
+    monkeypatch.setattr(cache, "MUFFIN_CACHE_DIR", None)
+    assert cache.cache_path(script) == str(tmp_path / "__muffincache__" / "script.msc")
+
+    monkeypatch.setattr(cache, "MUFFIN_CACHE_DIR", str(tmp_path / "shared"))
+    path = cache.cache_path(script)
+    assert os.path.dirname(path) == str(tmp_path / "shared")
+    assert os.path.basename(path).startswith("script.")
+    assert path.endswith(".msc")
+
+
+def test_source_key_changes(monkeypatch, script):
+    key = cache.source_key(script)
+    assert cache.source_key(script) == key
+
+    with open(script, "a") as code:
+        code.write("p(2)\n")
+    changed_key = cache.source_key(script)
+    assert changed_key != key
+
+    monkeypatch.setattr(cache, "__version__", "999.0.0")
+    assert cache.source_key(script) != changed_key
+
+
+def test_save_and_load_program(monkeypatch, script, tmp_path):
+    monkeypatch.setattr(cache, "MUFFIN_CACHE_DIR", None)
+    key = cache.source_key(script)
+    assert cache.load_program(script, key) is None
+
+    cache.save_program(script, key, [PrintNode("foo", 1)])
+    program = cache.load_program(script, key)
+
+    assert isinstance(program[0], PrintNode)
+    assert program[0].value == "foo"
+    assert cache.load_program(script, "stale") is None
+    # Nothing but the finished cache file is left behind
+    assert os.listdir(tmp_path / "__muffincache__") == ["script.msc"]
+
+
+def test_load_program_corrupt_file(monkeypatch, script):
+    monkeypatch.setattr(cache, "MUFFIN_CACHE_DIR", None)
+    os.makedirs(os.path.dirname(cache.cache_path(script)))
+    with open(cache.cache_path(script), "wb") as cached:
+        cached.write(b"not a cached program")
+
+    assert cache.load_program(script, cache.source_key(script)) is None
+
+
+def test_save_program_unwritable(monkeypatch, script, tmp_path):
+    blocker = tmp_path / "blocker"
+    blocker.write_text("")
+    monkeypatch.setattr(cache, "MUFFIN_CACHE_DIR", str(blocker / "cache"))
+
+    cache.save_program(script, "key", [])  # Does not raise
+
+    assert cache.load_program(script, "key") is None
+
+
+def test_save_and_load_parsed_program(monkeypatch, script):
+    monkeypatch.setattr(cache, "MUFFIN_CACHE_DIR", None)
+    source = 'xs = [1, 2]\nif (x > 1) { p("a #{x}") } else { p(1 / 0) }\nfor (i in range(3)) { p(sum(xs)) }'
+    program, _ = optimize(parse_program(tokenize_source(source)))
+    program.append(PrintNode(ConstantNode(MuffinList([2, 3]), 4), 4))
+    program.append(PrintNode(ConstantNode(range(1, 5, 2), 5), 5))
+    key = cache.source_key(script)
+
+    cache.save_program(script, key, program)
+    loaded = cache.load_program(script, key)
+
+    assert [type(node) for node in loaded] == [type(node) for node in program]
+    assert isinstance(loaded[3].value.value, MuffinList)
+    assert loaded[3].value.value == [2, 3]
+    assert loaded[4].value.value == range(1, 5, 2)
+    assert vars(loaded[1].body[0].value)["parts"][0] == "a "
+    # Steps cached while optimizing are worked out again when the program runs
+    assert not hasattr(loaded[1].else_body[0].value, "postfix")
+
+
+def test_load_program_never_unpickles(monkeypatch, script):
+    """A pickle planted in the cache, even behind a valid header, is never loaded (it would run code)."""
+    monkeypatch.setattr(cache, "MUFFIN_CACHE_DIR", None)
+    key = cache.source_key(script)
+    payload = pickle.dumps((key, [PrintNode("foo", 1)]))
+    os.makedirs(os.path.dirname(cache.cache_path(script)))
+    with open(cache.cache_path(script), "wb") as cached:
+        digest = cache.hashlib.sha256(payload).hexdigest()
+        cached.write(b" ".join([cache.CACHE_MAGIC, str(cache.CACHE_FORMAT).encode(), key.encode(), digest.encode()]))
+        cached.write(b"\n" + payload)
+
+    assert cache.load_program(script, key) is None
+
+
+def test_load_program_checks_header(monkeypatch, script):
+    monkeypatch.setattr(cache, "MUFFIN_CACHE_DIR", None)
+    key = cache.source_key(script)
+    cache.save_program(script, key, [PrintNode("foo", 1)])
+    with open(cache.cache_path(script), "rb") as cached:
+        header, payload = cached.read().split(b"\n", 1)
+
+    with open(cache.cache_path(script), "wb") as cached:
+        cached.write(header + b"\n" + payload.replace(b"foo", b"bar"))
+    assert cache.load_program(script, key) is None
+
+    with open(cache.cache_path(script), "wb") as cached:
+        cached.write(header.replace(b"MUFFINCACHE", b"OTHERCACHE") + b"\n" + payload)
+    assert cache.load_program(script, key) is None
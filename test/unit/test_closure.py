@@ -0,0 +1,30 @@
+from muffinscript.ast.base import ArithmeticNode
+from muffinscript.ast.types import IntNode
+from muffinscript.closure import compile_program
+from muffinscript.frame import Frame
+from muffinscript.lexer import tokenize_source
+from muffinscript.parser import parse_program
+from muffinscript.resolver import resolve
+
+
+def test_compile_program(capsys):
+    frame = Frame({"a": 2})
+    program = parse_program(tokenize_source("b = a * 3\np(b - a)"))
+    resolve(program, frame)
+    compiled = compile_program(program)
+
+    compiled(frame.values)
+    frame["a"] = 10
+    compiled(frame.values)
+
+    captured = capsys.readouterr()
+    assert captured.out == "4\n20\n"
+    assert frame.to_dict() == {"a": 10, "b": 30}
+
+
+def test_compile_program_raw_values_and_subclasses():
+    class LoudIntNode(IntNode):
+        pass
+
+    compiled = compile_program([ArithmeticNode("+", LoudIntNode(2, 1), 3, 1)])
+    assert compiled([]) == 5
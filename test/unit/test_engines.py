@@ -0,0 +1,135 @@
+import pytest
+
+from muffinscript.engines import (
+    ENGINES,
+    run_program,
+)
+from muffinscript.errors import MuffinScriptRuntimeError
+from muffinscript.frame import Frame
+from muffinscript.lexer import tokenize_source
+from muffinscript.optimizer import optimize
+from muffinscript.parser import parse_program
+from muffinscript.resolver import resolve
+
+COMPILED_ENGINES = [engine for engine in ENGINES if engine != "tree"]
+SCRIPTS = [
+    "a = 2\nb = 3\np(a + b)\np(a * 2)\np(10 - b)\np(a * b + 4 - 10 / 5)\np((a + b) * 2 == 10)\n",
+    'foo = "world"\np("hello #{foo}!")\np(cat("a", 1, 2.5, true, null))\np(type(foo))\np(type([1]))\n',
+    'n = "42"\np(int(n) + 1)\np(float(n))\nm = int(n)\np(str(m))\n',
+    "total = 0\nfor (i in [1, 2, 3, 4]) {\n    if (i % 2 == 0) {\n        total = total + i\n    } else {\n"
+    "        p(i)\n    }\n}\np(total)\n",
+    "for (row in [[1, 2], [3]]) {\n    for (item in row) { p(item) }\n}\nfor (x in []) {}\np(x)\n",
+    "if (1 > 2) {} else { p(false) }\nif (1 < 2) { p(true) }\nempty = 0\nfor (i in [1]) {}\np(i)\n",
+    "2 + 2\nsleep(0)\nwait = 0.0\nsleep(wait)\n",
+    "total = 0\nfor (i in range(5)) { total = total + i }\np(total)\nn = 3\nstep = 0 - 2\n"
+    "for (i in range(n * 3, 0, step)) { p(i) }\np(type(range(n)))\nfor (i in range(2, 2)) { p(i) }\np(i)\n"
+    "for (i in range(10, 0, -2)) { p(i) }\n",
+    "xs = [1, 2, 3]\np(xs * 2 + 1)\np(xs + [3, 2, 1])\np(6 / xs)\np(xs >= 2)\np(xs == [1, 2, 3])\np(type(xs * 2))\n"
+    "p(sum(xs))\np(min(xs * 3))\np(max(xs))\np(mean(xs))\np(sum(range(5)))\nfor (x in xs * 10) { p(x) }\n",
+    "xs = [5, -2, 3]\np(xs)\np(cat(1, -1))\nn = 4\np(-n * 2)\np(5 - -2.5)\np(-xs)\n",
+]
+
+
+def _run_source(source, engine, frame=None, optimized=False):
+    frame = frame if frame is not None else Frame()
+    program = parse_program(tokenize_source(source))
+    if optimized:
+        program, folded = optimize(program)
+    resolve(program, frame)
+    run_program(program, frame, engine)
+    return frame
+
+
+@pytest.mark.parametrize("engine", list(ENGINES))
+def test_run_program(capsys, engine):
+    frame = _run_source("foo = 2\nfor (i in [1, 2]) { p(i * foo) }", engine)
+
+    captured = capsys.readouterr()
+    assert captured.out == "2\n4\n"
+    assert frame.to_dict() == {"foo": 2, "i": 2}
+
+
+@pytest.mark.parametrize("source", SCRIPTS)
+@pytest.mark.parametrize("optimized", [False, True])
+@pytest.mark.parametrize("engine", COMPILED_ENGINES)
+def test_engines_match_tree(capsys, engine, source, optimized):
+    """Every engine must print, assign and fail exactly like the reference tree walker."""
+    results = []
+    for current_engine in ("tree", engine):
+        frame = Frame()
+        try:
+            _run_source(source, current_engine, frame, optimized)
+        except MuffinScriptRuntimeError as error:
+            message = str(error)
+        else:
+            message = None
+        results.append((capsys.readouterr().out, message, frame.to_dict()))
+
+    assert results[1] == results[0]
+
+
+@pytest.mark.parametrize(
+    "source, line_number",
+    [
+        ("a = 1\np(a + b)", 2),
+        ("a = 1\np(b + a)", 2),
+        ("a = 1\np(b * 2)", 2),
+        ("a = 1\np(2 * b)", 2),
+        ("a = 1\np(b)", 2),
+        ("if (true) {\n    p(1)\n    p(missing)\n}", 3),
+        ("for (i in [1]) {\n    p(i)\n\n    p(missing)\n}", 4),
+        ("for (i in [1]) {\n    if (missing) {}\n}", 2),
+        ('p("#{missing}")', 1),
+    ],
+)
+@pytest.mark.parametrize("engine", list(ENGINES))
+def test_engines_undefined_variables(capsys, engine, source, line_number):
+    with pytest.raises(MuffinScriptRuntimeError) as error:
+        _run_source(source, engine)
+    assert str(error.value) == f"\033[31mRUNTIME ERROR\033[0m - Undefined variable | line: {line_number}"
+
+
+@pytest.mark.parametrize(
+    "source, message, line_number",
+    [
+        ("p(1)\nfor (i in 2) { p(i) }", "Unsupported statement", 2),
+        ('a = "x"\n\np(int(a))', "Invalid coercion, could not convert to type", 3),
+        ("n = 1.5\nfor (i in range(n)) {}", "Invalid range, only integers allowed and the step can't be zero", 2),
+        ("p(range(1, 5, 0))", "Invalid range, only integers allowed and the step can't be zero", 1),
+        ("xs = []\np(max(xs))", "Invalid reduction, only lists and ranges allowed and they can't be empty", 2),
+        ("p(sum(1))", "Invalid reduction, only lists and ranges allowed and they can't be empty", 1),
+        ("xs = [1, 2]\n\np(xs + [1])", "Element-wise operations need lists of the same length: 2 != 1", 3),
+        (
+            "xs = [1, 2]\nif (true) {\n    ys = [1] * xs\n}",
+            "Element-wise operations need lists of the same length: 1 != 2",
+            3,
+        ),
+        ("xs = [[1, 2], [1]]\np(sum(xs))", "Element-wise operations need lists of the same length: 2 != 1", 2),
+    ],
+)
+@pytest.mark.parametrize("engine", list(ENGINES))
+def test_engines_runtime_errors(capsys, engine, source, message, line_number):
+    with pytest.raises(MuffinScriptRuntimeError) as error:
+        _run_source(source, engine)
+    assert error.value.message == message
+    assert error.value.line_number == line_number
+
+
+@pytest.mark.parametrize("engine", list(ENGINES))
+def test_engines_builtin_names_as_variables(capsys, engine):
+    _run_source("sum = 0\nfor (max in range(4)) {\n    sum = sum + max\n}\np(sum(range(max)))\np(sum)", engine)
+    assert capsys.readouterr().out == "3\n6\n"
+
+
+def test_run_program_default_engine(monkeypatch, capsys):
+    monkeypatch.setattr("muffinscript.engines.MUFFIN_ENGINE", "closure")
+    _run_source("p(1)", None)
+
+    captured = capsys.readouterr()
+    assert captured.out == "1\n"
+
+
+def test_run_program_unsupported_engine():
+    with pytest.raises(MuffinScriptRuntimeError) as error:
+        run_program([], Frame(), "turbo")
+    assert error.value.message == "Unsupported engine: turbo"
@@ -0,0 +1,48 @@
+import pickle
+
+import pytest
+
+from muffinscript.frame import (
+    UNSET,
+    Frame,
+)
+from muffinscript.lists import MuffinList
+
+
+def test_frame_slots():
+    frame = Frame()
+    assert frame.slot("foo") == 0
+    assert frame.slot("bar") == 1
+    assert frame.slot("foo") == 0
+    assert frame.values == [UNSET, UNSET]
+
+
+def test_frame_name_access():
+    frame = Frame({"foo": "hello"})
+    frame.slot("bar")
+
+    assert frame["foo"] == "hello"
+    assert "foo" in frame
+    assert "bar" not in frame
+    assert frame.get("bar") is None
+    with pytest.raises(KeyError):
+        frame["bar"]
+
+    frame["bar"] = None
+    assert "bar" in frame
+    assert frame.values[frame.slot("bar")] is None
+    assert frame.to_dict() == {"foo": "hello", "bar": None}
+    assert repr(frame) == "Frame({'foo': 'hello', 'bar': None})"
+
+
+def test_frame_stores_lists_as_muffin_lists():
+    items = [1, [2, 3]]
+    frame = Frame({"items": items})
+
+    assert type(frame["items"]) is MuffinList and type(frame["items"][1]) is MuffinList
+    assert frame["items"] == items and frame["items"] is not items
+
+
+def test_unset_pickles_by_reference():
+    assert pickle.loads(pickle.dumps(UNSET)) is UNSET
+    assert repr(UNSET) == "UNSET"
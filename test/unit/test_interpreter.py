@@ -1,3 +1,4 @@
+import sys
 from unittest.mock import patch
 
 import pytest
@@ -7,16 +8,22 @@ from muffinscript.ast.base import (
     AssignNode,
     ForLoopNode,
     IfNode,
+    VariableNode,
 )
 from muffinscript.ast.standard_lib import (
     CatNode,
+    FloatCoerceNode,
+    IntCoerceNode,
     PrintNode,
+    RangeNode,
     SleepNode,
+    StringCoerceNode,
     TypeCheckNode,
 )
 from muffinscript.ast.types import (
     BoolNode,
     FloatNode,
+    InterpolationNode,
     IntNode,
     ListNode,
     NullNode,
@@ -25,7 +32,14 @@ from muffinscript.ast.types import (
 from muffinscript.errors import (
     MuffinScriptRuntimeError,
 )
-from muffinscript.interpreter import evaluate
+from muffinscript.frame import Frame
+from muffinscript.interpreter import (
+    evaluate,
+    execute,
+    make_range,
+    postfix,
+)
+from muffinscript.resolver import resolve
 
 
 def test_evaluate_prints(capsys):
@@ -72,13 +86,28 @@ def test_evaluate_string_node():
     expression = evaluate(node, {}, node.line_number)
     assert expression == "hello world"
 
+    # Interpolation is split up by the parser, a plain string node is always literal
     node = StringNode("hello #{foo}", 2)
     expression = evaluate(node, {"foo": "world"}, node.line_number)
-    assert expression == "hello world"
+    assert expression == "hello #{foo}"
+
 
-    node = StringNode("hello #{bar}", 3)
+def test_evaluate_interpolation_node():
+    frame = Frame({"foo": "world"})
+    node = InterpolationNode(["hello ", VariableNode("foo", 1), "!"], 1)
+    resolve([node], frame)
+    expression = evaluate(node, frame, node.line_number)
+    assert expression == "hello world!"
+
+    # The template is kept, so later evaluations see new values
+    frame["foo"] = 2
+    expression = evaluate(node, frame, node.line_number)
+    assert expression == "hello 2!"
+
+    node = InterpolationNode(["hello ", VariableNode("bar", 3)], 3)
+    resolve([node], frame)
     with pytest.raises(MuffinScriptRuntimeError) as error:
-        evaluate(node, {"foo": "world"}, node.line_number)
+        evaluate(node, frame, node.line_number)
     assert str(error.value) == "\033[31mRUNTIME ERROR\033[0m - Undefined variable | line: 3"
 
 
@@ -120,10 +149,10 @@ def test_evaluate_list_node():
     assert expression == ["hello", "world"]
 
 
-def test_evaluate_for_loop_node():
+def test_evaluate_for_loop_node(capsys):
     node = ForLoopNode("item", [IntNode(1, 1), IntNode(2, 1), IntNode(3, 1)], [PrintNode("item", 1)], 1)
-    expression = evaluate(node, {}, node.line_number)
-    assert all(isinstance(item, PrintNode) for item in expression)
+    assert evaluate(node, {}, node.line_number) is None
+    assert len(capsys.readouterr().out.splitlines()) == 3
 
     node = ForLoopNode("item", "foo", [PrintNode("item", 1)], 2)
     expression = evaluate(
@@ -131,7 +160,8 @@ def test_evaluate_for_loop_node():
         {"foo": [IntNode(1, node.line_number), IntNode(2, node.line_number), IntNode(3, node.line_number)]},
         node.line_number,
     )
-    assert all(isinstance(item, PrintNode) for item in expression)
+    assert expression is None
+    assert len(capsys.readouterr().out.splitlines()) == 3
 
     node = ForLoopNode("item", 1, [PrintNode("item", 1)], 3)
     with pytest.raises(MuffinScriptRuntimeError) as error:
@@ -186,10 +216,17 @@ def test_evaluate_arithmetic_node():
 
 
 def test_evaluate_cat_node():
-    node = CatNode([StringNode("hello ", 1), StringNode("foo", 1)], 1)
-    expression = evaluate(node, {"foo": "world"}, node.line_number)
+    node = CatNode([StringNode("hello ", 1), VariableNode("foo", 1)], 1)
+    frame = Frame({"foo": "world"})
+    resolve([node], frame)
+    expression = evaluate(node, frame, node.line_number)
     assert expression == "hello world"
 
+    # String literals are never looked up as variables
+    node = CatNode([StringNode("hello ", 1), StringNode("foo", 1)], 1)
+    expression = evaluate(node, frame, node.line_number)
+    assert expression == "hello foo"
+
 
 def test_evaluate_sleep_node():
     node = SleepNode(2, 1)
@@ -224,14 +261,14 @@ def test_evaluate_type_check_node():
     assert expression == "list"
 
 
-def test_evaluate_if_node():
+def test_evaluate_if_node(capsys):
     node = IfNode(ArithmeticNode("==", 2, 2, 1), [PrintNode(True, 1)], 1)
-    expression = evaluate(node, {}, node.line_number)
-    assert expression[0].value is True
+    assert evaluate(node, {}, node.line_number) is None
+    assert capsys.readouterr().out == "True\n"
 
     node = IfNode(ArithmeticNode("==", 2, 3, 1), [PrintNode(True, 1)], 1, [PrintNode(False, 1)])
-    expression = evaluate(node, {}, node.line_number)
-    assert expression[0].value is False
+    assert evaluate(node, {}, node.line_number) is None
+    assert capsys.readouterr().out == "False\n"
 
 
 def test_evaluate_undefined_variable():
@@ -239,3 +276,145 @@ def test_evaluate_undefined_variable():
     with pytest.raises(MuffinScriptRuntimeError) as error:
         evaluate(node, {}, 1)
     assert str(error.value) == "\033[31mRUNTIME ERROR\033[0m - Undefined variable | line: 1"
+
+
+def test_evaluate_variable_node():
+    frame = Frame()
+    program = [AssignNode("foo", IntNode(2, 1), 1), VariableNode("foo", 2)]
+    resolve(program, frame)
+
+    assert evaluate(program[0], frame, 1) == 2
+    assert frame.values == [2]
+    assert evaluate(program[1], frame, 2) == 2
+
+    node = VariableNode("bar", 3)
+    resolve([node], frame)
+    with pytest.raises(MuffinScriptRuntimeError) as error:
+        evaluate(node, frame, node.line_number)
+    assert str(error.value) == "\033[31mRUNTIME ERROR\033[0m - Undefined variable | line: 3"
+
+
+def test_evaluate_unresolved_variable_node():
+    """Variables the resolver never bound to a slot are looked up by name, in a dict or a frame."""
+    assert evaluate(VariableNode("x", 1), {"x": 5}, 1) == 5
+    assert evaluate(VariableNode("x", 1), Frame({"x": 5}), 1) == 5
+
+    for variables in ({}, Frame()):
+        with pytest.raises(MuffinScriptRuntimeError) as error:
+            evaluate(VariableNode("x", 2), variables, 2)
+        assert error.value.message == "Undefined variable"
+        assert error.value.line_number == 2
+
+
+def test_evaluate_coerce_nodes():
+    frame = Frame({"number": 2, "text": "2.5", "items": [1]})
+    nodes = [
+        StringCoerceNode(VariableNode("number", 1), 1),
+        IntCoerceNode(VariableNode("number", 1), 1),
+        FloatCoerceNode(VariableNode("text", 1), 1),
+    ]
+    resolve(nodes, frame)
+    assert [evaluate(node, frame, 1) for node in nodes] == ["2", 2, 2.5]
+
+    for node in (IntCoerceNode(VariableNode("text", 2), 2), FloatCoerceNode(VariableNode("items", 2), 2)):
+        resolve([node], frame)
+        with pytest.raises(MuffinScriptRuntimeError) as error:
+            evaluate(node, frame, node.line_number)
+        assert error.value.message == "Invalid coercion, could not convert to type"
+
+
+def test_evaluate_dispatches_subclassed_nodes():
+    class LoudIntNode(IntNode):
+        pass
+
+    node = ArithmeticNode("+", LoudIntNode(2, 1), IntNode(3, 1), 1)
+    assert evaluate(node, {}, node.line_number) == 5
+
+
+def test_evaluate_deep_expressions():
+    depth = sys.getrecursionlimit() * 2
+    frame = Frame()
+    total = VariableNode("x", 1)
+    nested = VariableNode("x", 2)
+    for _ in range(depth):
+        total = ArithmeticNode("+", total, IntNode(1, 1), 1)
+        nested = ListNode([nested], 2)
+    program = [AssignNode("x", IntNode(0, 1), 1), AssignNode("total", total, 1), AssignNode("nested", nested, 2)]
+    resolve(program, frame)
+    for node in program:
+        evaluate(node, frame, node.line_number)
+
+    assert frame["total"] == depth
+    innermost = frame["nested"]
+    for _ in range(depth):
+        innermost = innermost[0]
+    assert innermost == 0
+
+
+def test_postfix_flattens_children_first():
+    difference = ArithmeticNode("-", IntNode(7, 1), IntNode(2, 1), 1)
+    node = ArithmeticNode("*", difference, CatNode([1, StringNode("a", 1)], 1), 1)
+    steps = postfix(node)
+
+    assert [operand for _, operand in steps[:2]] == [7, 2]
+    assert len(steps) == 7
+    assert evaluate(node, {}, 1) == "1a1a1a1a1a"
+
+
+def test_evaluate_expression_reports_undefined_variables_on_the_statement_line():
+    frame = Frame()
+    node = ArithmeticNode("+", IntNode(1, 1), ListNode([VariableNode("missing", 1)], 1), 1)
+    resolve([node], frame)
+    with pytest.raises(MuffinScriptRuntimeError) as error:
+        evaluate(node, frame, 4)
+    assert error.value.line_number == 4
+
+
+def test_execute_runs_statements_without_results(capsys):
+    frame = Frame()
+    program = [
+        AssignNode("total", IntNode(0, 1), 1),
+        ForLoopNode(
+            "item",
+            ListNode([IntNode(1, 2), IntNode(2, 2), IntNode(3, 2)], 2),
+            [AssignNode("total", ArithmeticNode("+", VariableNode("total", 3), VariableNode("item", 3), 3), 3)],
+            2,
+        ),
+        PrintNode(VariableNode("total", 4), 4),
+        ArithmeticNode("+", IntNode(1, 5), IntNode(1, 5), 5),
+    ]
+    resolve(program, frame)
+
+    assert [execute(node, frame, node.line_number) for node in program] == [None, None, None, None]
+    assert capsys.readouterr().out == "6\n"
+
+
+def test_make_range():
+    assert make_range([3], 1) == range(3)
+    assert make_range([1, 10, 3], 1) == range(1, 10, 3)
+
+    for args in ([1.5], [True], ["1", 2], [1, 5, 0]):
+        with pytest.raises(MuffinScriptRuntimeError) as error:
+            make_range(args, 7)
+        assert error.value.message == "Invalid range, only integers allowed and the step can't be zero"
+        assert error.value.line_number == 7
+
+
+def test_evaluate_for_loop_over_range(capsys):
+    frame = Frame()
+    node = ForLoopNode("i", RangeNode([IntNode(1, 1), IntNode(4, 1)], 1), [PrintNode(VariableNode("i", 1), 1)], 1)
+    resolve([node], frame)
+    execute(node, frame, node.line_number)
+
+    assert capsys.readouterr().out == "1\n2\n3\n"
+    assert frame["i"] == 3
+
+
+def test_evaluate_range_negative_step(capsys):
+    frame = Frame()
+    iterable = RangeNode([IntNode(10, 1), IntNode(0, 1), IntNode(-2, 1)], 1)
+    node = ForLoopNode("i", iterable, [PrintNode(VariableNode("i", 1), 1)], 1)
+    resolve([node], frame)
+    execute(node, frame, node.line_number)
+
+    assert capsys.readouterr().out == "10\n8\n6\n4\n2\n"
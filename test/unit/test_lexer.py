@@ -1,7 +1,29 @@
+import io
+
 import pytest
 
 from muffinscript.errors import MuffinScriptSyntaxError
-from muffinscript.lexer import tokenize
+from muffinscript.lexer import (
+    iter_tokens,
+    tokenize,
+    tokenize_file,
+    tokenize_source,
+)
+from muffinscript.tokens import (
+    ASSIGN,
+    BOOL,
+    COMMA,
+    INT,
+    LBRACE,
+    LBRACKET,
+    LPAREN,
+    NAME,
+    OPERATOR,
+    RBRACE,
+    RBRACKET,
+    RPAREN,
+    STRING,
+)
 
 
 def test_tokenizer_newline():
@@ -151,3 +173,85 @@ def test_tokenizer_unsupported_statements():
     with pytest.raises(MuffinScriptSyntaxError) as error:
         tokenize("?", 1)
     assert str(error.value) == "\033[31mSYNTAX ERROR\033[0m - Unsupported statement | line: 1"
+
+
+def test_tokenize_source_positions():
+    tokens = tokenize_source('foo = "hello"\n  p(foo) // comment\n\nbar = 2 + 2')
+    assert [(token.kind, token.value, token.line, token.column) for token in tokens] == [
+        (NAME, "foo", 1, 1),
+        (ASSIGN, "=", 1, 5),
+        (STRING, "hello", 1, 7),
+        (NAME, "p", 2, 3),
+        (LPAREN, "(", 2, 4),
+        (NAME, "foo", 2, 5),
+        (RPAREN, ")", 2, 8),
+        (NAME, "bar", 4, 1),
+        (ASSIGN, "=", 4, 5),
+        (INT, 2, 4, 7),
+        (OPERATOR, "+", 4, 9),
+        (INT, 2, 4, 11),
+    ]
+
+
+def test_tokenize_source_commas():
+    tokens = tokenize_source("[5, -2]")
+    assert [token.kind for token in tokens] == [LBRACKET, INT, COMMA, OPERATOR, INT, RBRACKET]
+    assert tokenize("[5, -2]", 1) == ["[", 5, "-", 2, "]"]
+
+
+def test_tokenize_source_blocks():
+    tokens = tokenize_source("if (true) {\r\n\tp(1)\r\n}\r\n", 10)
+    assert [token.kind for token in tokens] == [NAME, LPAREN, BOOL, RPAREN, LBRACE, NAME, LPAREN, INT, RPAREN, RBRACE]
+    assert [token.line for token in tokens] == [10, 10, 10, 10, 10, 11, 11, 11, 11, 12]
+
+
+def test_tokenize_source_errors():
+    with pytest.raises(MuffinScriptSyntaxError) as error:
+        tokenize_source('foo = 1\np("hello)\np(foo)')
+    assert str(error.value) == "\033[31mSYNTAX ERROR\033[0m - Unterminated string | line: 2"
+
+    with pytest.raises(MuffinScriptSyntaxError) as error:
+        tokenize_source("foo = 1\n\nbar ? 2")
+    assert str(error.value) == "\033[31mSYNTAX ERROR\033[0m - Unsupported statement | line: 3"
+
+
+def test_tokenize_source_interns_names():
+    tokens = tokenize_source("foo = 1\np(foo)")
+    assert tokens[0].value is tokens[5].value
+
+
+def _positions(tokens):
+    return [(token.kind, token.value, token.line, token.column) for token in tokens]
+
+
+def test_iter_tokens_matches_tokenize_source():
+    source = 'foo = "hello"\r\n\nif (foo == "hello") {\n    p(foo) // comment\n}\nbar = 2.5'
+    assert _positions(iter_tokens(io.StringIO(source))) == _positions(tokenize_source(source))
+
+
+def test_iter_tokens_is_lazy():
+    class Lines(io.StringIO):
+        read_lines = 0
+
+        def readline(self, *args):
+            self.read_lines += 1
+            return super().readline(*args)
+
+    stream = Lines("foo = 1\n" * 1000)
+    tokens = iter_tokens(stream)
+    assert next(tokens).value == "foo"
+    assert stream.read_lines == 1
+
+    with pytest.raises(MuffinScriptSyntaxError) as error:
+        list(iter_tokens(io.StringIO("foo = 1\nbar = ?\n")))
+    assert str(error.value) == "\033[31mSYNTAX ERROR\033[0m - Unsupported statement | line: 2"
+
+
+def test_tokenize_file(tmp_path):
+    path = tmp_path / "test.ms"
+    path.write_text('foo = "muffin 🧁"\np(foo)\n', encoding="utf-8")
+    assert _positions(tokenize_file(str(path))) == _positions(tokenize_source('foo = "muffin 🧁"\np(foo)\n'))
+
+    empty_path = tmp_path / "empty.ms"
+    empty_path.write_text("")
+    assert list(tokenize_file(str(empty_path))) == []
@@ -0,0 +1,185 @@
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from muffinscript.engines import (
+    ENGINES,
+    run_program,
+)
+from muffinscript.errors import (
+    MuffinScriptLimitError,
+    MuffinScriptRuntimeError,
+)
+from muffinscript.frame import Frame
+from muffinscript.lexer import tokenize_source
+from muffinscript.limits import (
+    BUDGET,
+    Limits,
+    enforcing,
+)
+from muffinscript.lists import MuffinList
+from muffinscript.parser import parse_program
+from muffinscript.program import (
+    Engine,
+    compile,
+)
+from muffinscript.resolver import resolve
+
+
+@pytest.mark.parametrize("engine", list(ENGINES))
+def test_max_steps(engine):
+    program = compile("total = 0\nfor (i in range(1000000)) {\n    total = total + i\n}\n", engine)
+
+    with pytest.raises(MuffinScriptLimitError) as error:
+        program.run(limits=Limits(max_steps=100))
+
+    assert isinstance(error.value, MuffinScriptRuntimeError)
+    assert error.value.message == "Step limit exceeded: 100"
+    assert error.value.line_number == 3
+    assert BUDGET.get() is None
+
+
+def test_max_steps_counts_nodes():
+    program = compile("x = 1 + 2 * y\n", "tree")
+
+    # One step for the statement, one for each of the five expression nodes
+    assert program.run({"y": 1}, Limits(max_steps=6)) == {"y": 1, "x": 3}
+    with pytest.raises(MuffinScriptLimitError):
+        program.run({"y": 1}, Limits(max_steps=5))
+
+
+def test_max_steps_empty_loop():
+    with pytest.raises(MuffinScriptLimitError) as error:
+        compile("x = 1\nfor (i in range(1000000000)) {}\n").run(limits=Limits(max_steps=10))
+
+    assert error.value.line_number == 2
+
+
+def test_timeout():
+    program = compile("for (i in range(1000000000)) {\n    x = i\n}\n")
+
+    with patch("muffinscript.limits.time.monotonic", side_effect=[0.0] * 4 + [5.0]):
+        with pytest.raises(MuffinScriptLimitError) as error:
+            program.run(limits=Limits(timeout=1))
+
+    assert error.value.message == "Time limit exceeded: 1s"
+    assert error.value.line_number == 2
+
+
+def test_max_string():
+    program = compile('s = "ab"\nfor (i in range(10)) {\n    s = cat(s, s)\n}\n')
+
+    with pytest.raises(MuffinScriptLimitError) as error:
+        program.run(limits=Limits(max_string=100))
+
+    assert error.value.message == "String length limit exceeded: 100"
+    assert error.value.line_number == 3
+    with pytest.raises(MuffinScriptLimitError):
+        compile('s = "ab" * 1000000000000\n').run(limits=Limits(max_string=100))
+    assert compile('s = "ab" * 50\n').run(limits=Limits(max_string=100)) == {"s": "ab" * 50}
+
+
+def test_max_string_inside_list():
+    """Every string or list an expression builds is checked, not just the value it ends with."""
+    program = compile('s = "ab"\nfor (i in range(10)) {\n    xs = [cat(s, s), 1]\n    s = cat(s, s)\n}\n')
+
+    with pytest.raises(MuffinScriptLimitError) as error:
+        program.run(limits=Limits(max_string=100))
+
+    assert error.value.line_number == 3
+    with pytest.raises(MuffinScriptLimitError):
+        compile("x = [str(xs), 1]\n").run({"xs": ["a" * 40] * 3}, Limits(max_string=100))
+
+
+def test_max_string_optimized(capsys):
+    """Constant repetition isn't folded ahead of time, where no limit could see it."""
+    program = Engine("tree", optimize=True).compile('s = "ab" * 100\np(s)\n')
+
+    with pytest.raises(MuffinScriptLimitError) as error:
+        program.run(limits=Limits(max_string=10))
+
+    assert error.value.message == "String length limit exceeded: 10"
+    assert capsys.readouterr().out == ""
+
+
+def test_limits_count_items():
+    """Reductions and list arithmetic count a step for every item they work through."""
+    with pytest.raises(MuffinScriptLimitError) as error:
+        compile("p(1)\nx = sum(range(50000000))\n").run(limits=Limits(max_steps=10))
+    assert error.value.message == "Step limit exceeded: 10"
+    assert error.value.line_number == 2
+
+    with pytest.raises(MuffinScriptLimitError):
+        compile("ys = xs * 2\n").run({"xs": MuffinList(range(100))}, Limits(max_steps=50))
+    assert compile("x = sum(range(10))\n").run(limits=Limits(max_steps=20)) == {"x": 45}
+
+
+def test_max_list():
+    with pytest.raises(MuffinScriptLimitError) as error:
+        compile("xs = [1, 2, 3]\np(1)\nys = [xs, xs, xs, xs]\n").run(limits=Limits(max_list=3))
+
+    assert error.value.message == "List length limit exceeded: 3"
+    assert error.value.line_number == 3
+    assert compile("xs = [1, 2, 3] * 1000\n").run(limits=Limits(max_list=3)) == {"xs": [1000, 2000, 3000]}
+
+
+def test_timeout_sleep():
+    """A sleep never runs past the deadline."""
+    program = compile("p(1)\nsleep(1000)\np(2)\n")
+
+    start = time.monotonic()
+    with pytest.raises(MuffinScriptLimitError) as error:
+        program.run(limits=Limits(timeout=0.05))
+
+    assert time.monotonic() - start < 10
+    assert error.value.message == "Time limit exceeded: 0.05s"
+    assert error.value.line_number == 2
+
+
+def test_limits_per_run():
+    """Every run has a budget of its own, a run inside another (or in another thread) keeps its own limits."""
+    program = compile("x = 1\ny = 2\nz = 3\n")
+
+    with enforcing(Limits(max_steps=1000)):
+        outer = BUDGET.get()
+        with pytest.raises(MuffinScriptLimitError):
+            program.run(limits=Limits(max_steps=2))
+        assert program.run() == {"x": 1, "y": 2, "z": 3}
+        assert BUDGET.get() is outer and outer.steps == 0
+
+    with enforcing(Limits(max_steps=1)):
+        results = []
+        thread = threading.Thread(target=lambda: results.append(program.run()))
+        thread.start()
+        thread.join()
+    assert results == [{"x": 1, "y": 2, "z": 3}]
+    assert BUDGET.get() is None
+
+
+def test_run_columns_limits():
+    program = compile("total = price * 2\n")
+    limits = Limits(max_steps=4, max_list=1)
+
+    assert program.run_columns({"price": [1, 2, 3]}, limits) == {"total": [2, 4, 6]}
+    with pytest.raises(MuffinScriptLimitError):
+        program.run_columns({"price": [1, 2]}, Limits(max_steps=3))
+
+
+def test_run_program_limits():
+    program = parse_program(tokenize_source("for (i in range(100)) {\n    x = i\n}\n"))
+    frame = Frame()
+    resolve(program, frame)
+
+    with pytest.raises(MuffinScriptLimitError):
+        run_program(program, frame, "bytecode", Limits(max_steps=10))
+    run_program(program, frame, "bytecode")
+
+    assert frame["x"] == 99
+
+
+def test_limits():
+    assert not Limits()
+    assert Limits(timeout=1.5)
+    assert repr(Limits(max_steps=1)) == "Limits(max_steps=1, timeout=None, max_list=None, max_string=None)"
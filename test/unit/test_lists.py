@@ -0,0 +1,45 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from muffinscript.errors import MuffinScriptRuntimeError
+from muffinscript.lists import MuffinList
+
+
+def test_muffin_list_elementwise_arithmetic():
+    items = MuffinList([1, 2, 3])
+
+    assert items * 2 == [2, 4, 6]
+    assert 10 - items == [9, 8, 7]
+    assert items + items == [2, 4, 6]
+    assert items / 2 == [0.5, 1.0, 1.5]
+    assert items % 2 == [1, 0, 1]
+    assert isinstance(items + 1, MuffinList)
+
+
+def test_muffin_list_elementwise_comparisons():
+    items = MuffinList([1, 2, 3])
+
+    assert (items > 1) == [False, True, True]
+    assert (2 >= items) == [True, True, False]
+    assert (items < [3, 2, 1]) == [True, False, False]
+    # Equality still compares whole lists
+    assert items == [1, 2, 3]
+    assert items != 1
+
+
+def test_muffin_list_length_mismatch():
+    with pytest.raises(MuffinScriptRuntimeError) as error:
+        MuffinList([1, 2]) + [1, 2, 3]
+
+    assert error.value.message == "Element-wise operations need lists of the same length: 2 != 3"
+
+
+def test_numpy_is_never_imported():
+    """Arrays only exist once the host imported NumPy, MuffinScript never imports it itself."""
+    check = "import sys, muffinscript.program, muffinscript.muffin; assert 'numpy' not in sys.modules"
+    subprocess.run(
+        [sys.executable, "-c", check], check=True, env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+    )
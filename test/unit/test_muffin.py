@@ -5,8 +5,16 @@ from unittest import mock
 
 import pytest
 
-from muffinscript.errors import MuffinScriptSyntaxError
-from muffinscript.muffin import main
+from muffinscript.errors import (
+    MuffinScriptRuntimeError,
+    MuffinScriptSyntaxError,
+)
+from muffinscript.frame import Frame
+from muffinscript.muffin import (
+    _run_source,
+    main,
+)
+from muffinscript.output import OUTPUT
 
 
 def test_main_print(monkeypatch, capsys):
@@ -63,7 +71,10 @@ def test_main_tokenizer_error(monkeypatch, capsys):
     mock_file = io.StringIO("!!!\n")
     monkeypatch.setattr(builtins, "open", lambda *a, **kw: mock_file)
 
-    with mock.patch("muffinscript.lexer.tokenize", side_effect=MuffinScriptSyntaxError("", 1)):
+    with mock.patch(
+        "muffinscript.muffin.iter_tokens",
+        side_effect=MuffinScriptSyntaxError("Unsupported statement", 1),
+    ):
         with pytest.raises(SystemExit):
             main()
         captured = capsys.readouterr()
@@ -76,8 +87,138 @@ def test_main_parser_error(monkeypatch, capsys):
     mock_file = io.StringIO("p(foo\n")
     monkeypatch.setattr(builtins, "open", lambda *a, **kw: mock_file)
 
-    with mock.patch("muffinscript.parser.parse_tokens", side_effect=MuffinScriptSyntaxError("", 1)):
+    with mock.patch(
+        "muffinscript.parser.parse_tokens",
+        side_effect=MuffinScriptSyntaxError("Unsupported statement", 1),
+    ):
         with pytest.raises(SystemExit):
             main()
         captured = capsys.readouterr()
         assert "\x1b[31mSYNTAX ERROR\x1b[0m - Unsupported statement | line: 1\n" in captured.out
+
+
+def test_run_source_arithmetic_chaining(capsys):
+    """Test chained arithmetic follows operator precedence."""
+    _run_source("a = 2\nb = 3\np(a * b + 4 - 10 / 5)\np((a + b) * 2 == 10)\n", Frame())
+
+    captured = capsys.readouterr()
+    assert captured.out == "8.0\nTrue\n"
+
+
+def test_run_source_nested_blocks(capsys):
+    """Test nested blocks run and errors inside them report their own line."""
+    _run_source("for (i in [1, 2, 3]) {\n    if (i > 1) {\n        p(i)\n    }\n}\n", Frame())
+
+    captured = capsys.readouterr()
+    assert captured.out == "2\n3\n"
+
+    with pytest.raises(MuffinScriptRuntimeError) as error:
+        _run_source("if (true) {\n    p(1)\n    p(bar)\n}\n", Frame())
+    assert str(error.value) == "\033[31mRUNTIME ERROR\033[0m - Undefined variable | line: 3"
+
+
+@pytest.mark.parametrize("optimize", [True, False])
+def test_run_source_optimizer_flag(monkeypatch, capsys, optimize):
+    """Test programs give the same output with the optimizer on or off, and the fold count is reported in debug."""
+    monkeypatch.setattr("muffinscript.muffin.MUFFIN_OPTIMIZE", optimize)
+    monkeypatch.setattr("muffinscript.muffin.MUFFIN_DEBUG", "true")
+    _run_source('p(60 * 60)\nif (1 == 1) {\n    p(cat("a ", "b"))\n}\n', Frame())
+
+    captured = capsys.readouterr()
+    assert captured.out == "3600\na b\n"
+    assert captured.err == ("Optimizer folded 4 nodes\n" if optimize else "")
+
+
+def test_main_uses_cache(monkeypatch, capsys, tmp_path):
+    """Test the second run of an unchanged script loads the cached program instead of parsing."""
+    script = tmp_path / "test.ms"
+    script.write_text("p(2 + 2)\n")
+    monkeypatch.setattr(sys, "argv", ["muffin", str(script)])
+    monkeypatch.setattr("muffinscript.muffin.MUFFIN_CACHE", True)
+    monkeypatch.setattr("muffinscript.cache.MUFFIN_CACHE_DIR", None)
+    main()
+    assert (tmp_path / "__muffincache__" / "test.msc").is_file()
+
+    def fail_parse(tokens):
+        raise AssertionError("script was parsed again")
+
+    monkeypatch.setattr("muffinscript.muffin.parse_program", fail_parse)
+    main()
+    captured = capsys.readouterr()
+    assert captured.out == "4\n4\n"
+
+    script.write_text("p(3)\n")
+    with pytest.raises(AssertionError):
+        main()
+
+
+def test_run_source_variables_and_literals(capsys):
+    """Test a string literal is never confused with a variable of the same name."""
+    _run_source('foo = 2\np("foo")\np(foo)\np(cat(str(foo), "!"))\n', Frame())
+
+    captured = capsys.readouterr()
+    assert captured.out == "foo\n2\n2!\n"
+
+
+def test_run_source_interpolation_in_loop(capsys):
+    """Test interpolated strings render the current values on every iteration."""
+    _run_source('for (i in [1, 2, 3]) {\n    p("item #{i}")\n}\n', Frame())
+
+    captured = capsys.readouterr()
+    assert captured.out == "item 1\nitem 2\nitem 3\n"
+
+
+def test_main_disassemble(monkeypatch, capsys, tmp_path):
+    script = tmp_path / "test.ms"
+    script.write_text("p(2 + 2)\n")
+    monkeypatch.setattr(sys, "argv", ["muffin", "--dis", str(script)])
+    monkeypatch.setattr("muffinscript.muffin.MUFFIN_CACHE", False)
+    monkeypatch.setattr("muffinscript.muffin.MUFFIN_OPTIMIZE", False)
+    with pytest.raises(SystemExit):
+        main()
+
+    captured = capsys.readouterr()
+    assert captured.out == (
+        "   1      0 LOAD_CONST        0 (2)\n"
+        "          1 LOAD_CONST        0 (2)\n"
+        "          2 BINARY_OP         0 (+)\n"
+        "          3 PRINT             0\n"
+    )
+
+
+def test_main_disassemble_errors(monkeypatch, capsys, tmp_path):
+    monkeypatch.setattr(sys, "argv", ["muffin", "--dis"])
+    with pytest.raises(SystemExit):
+        main()
+    assert capsys.readouterr().out == "Usage: muffin --dis filename.ms\n"
+
+    script = tmp_path / "test.ms"
+    script.write_text("p(2 +)\n")
+    monkeypatch.setattr(sys, "argv", ["muffin", "--dis", str(script)])
+    monkeypatch.setattr("muffinscript.muffin.MUFFIN_CACHE", False)
+    with pytest.raises(SystemExit):
+        main()
+    assert "Unsupported statement | line: 1" in capsys.readouterr().out
+
+
+def test_main_unbuffered(monkeypatch, capsys):
+    monkeypatch.setattr(sys, "argv", ["muffin", "--unbuffered", "test.ms"])
+    monkeypatch.setattr(builtins, "open", lambda *a, **kw: io.StringIO("p(1)\np(2)\n"))
+    monkeypatch.setattr("muffinscript.muffin.MUFFIN_CACHE", False)
+    monkeypatch.setattr("muffinscript.muffin.OUTPUT.unbuffered", False)
+
+    main()
+
+    assert capsys.readouterr().out == "1\n2\n"
+    assert sys.argv == ["muffin", "test.ms"]
+    assert OUTPUT.unbuffered
+
+
+def test_main_flushes_output_before_errors(monkeypatch, capsys):
+    monkeypatch.setattr(sys, "argv", ["muffin", "test.ms"])
+    monkeypatch.setattr(builtins, "open", lambda *a, **kw: io.StringIO("p(1)\np(missing)\n"))
+    monkeypatch.setattr("muffinscript.muffin.MUFFIN_CACHE", False)
+    with pytest.raises(SystemExit):
+        main()
+
+    assert capsys.readouterr().out == "1\n\033[31mRUNTIME ERROR\033[0m - Undefined variable | line: 2\n"
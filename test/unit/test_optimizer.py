@@ -0,0 +1,141 @@
+import pytest
+
+from muffinscript.ast.base import (
+    ArithmeticNode,
+    ForLoopNode,
+    IfNode,
+)
+from muffinscript.ast.standard_lib import (
+    CatNode,
+    PrintNode,
+)
+from muffinscript.ast.types import (
+    ConstantNode,
+    ListNode,
+    StringNode,
+)
+from muffinscript.lexer import tokenize_source
+from muffinscript.optimizer import optimize
+from muffinscript.parser import parse_program
+
+
+def _optimize_source(source):
+    return optimize(parse_program(tokenize_source(source)))
+
+
+def test_optimize_folds_arithmetic():
+    program, folded = _optimize_source("p(60 * 60)")
+
+    assert isinstance(program[0].value, ConstantNode)
+    assert program[0].value.value == 3600
+    assert folded == 1
+
+
+def test_optimize_folds_nested_arithmetic():
+    program, folded = _optimize_source("foo = (1 + 2) * 3 == 9")
+
+    assert isinstance(program[0].expression, ConstantNode)
+    assert program[0].expression.value is True
+    assert folded == 3
+
+
+def test_optimize_folds_partial_arithmetic():
+    program, folded = _optimize_source("foo = bar + 2 * 3")
+
+    node = program[0].expression
+    assert isinstance(node, ArithmeticNode)
+    assert node.left.value == "bar"
+    assert node.right.value == 6
+    assert folded == 1
+
+
+def test_optimize_folds_cat_and_type():
+    program, folded = _optimize_source('p(cat("hello ", "world ", 2))\np(type(1.5))')
+
+    assert program[0].value.value == "hello world 2"
+    assert program[1].value.value == "float"
+    assert folded == 2
+
+
+def test_optimize_keeps_runtime_strings():
+    """Strings that interpolate a variable must still be resolved at runtime."""
+    program, folded = _optimize_source('p(cat("foo", "a #{bar}"))')
+
+    assert isinstance(program[0].value, CatNode)
+    assert isinstance(program[0].value.args[0], StringNode)
+    assert folded == 0
+
+
+def test_optimize_leaves_errors_for_runtime():
+    program, folded = _optimize_source("if (foo) { p(1 / 0) }")
+
+    assert isinstance(program[0].body[0].value, ArithmeticNode)
+    assert folded == 0
+
+
+def test_optimize_folds_list_items():
+    program, folded = _optimize_source("for (item in [1 + 1, 2 * 2]) { p(item) }")
+
+    assert isinstance(program[0], ForLoopNode)
+    assert isinstance(program[0].iterable, ListNode)
+    assert [item.value for item in program[0].iterable.items] == [2, 4]
+    assert folded == 2
+
+
+@pytest.mark.parametrize(
+    "source, expected",
+    [
+        ('if (1 == 1) {\n p("yes")\n} else {\n p("no")\n}', "yes"),
+        ('if (1 == 2) {\n p("yes")\n} else {\n p("no")\n}', "no"),
+        ('if (true) { p("yes") }', "yes"),
+    ],
+)
+def test_optimize_removes_dead_branches(source, expected):
+    program, folded = _optimize_source(source)
+
+    assert len(program) == 1
+    assert isinstance(program[0], PrintNode)
+    assert program[0].value.value == expected
+
+
+def test_optimize_removes_empty_dead_branches():
+    program, folded = _optimize_source('if (1 > 2) { p("never") }\np(3)')
+
+    assert len(program) == 1
+    assert program[0].value.value == 3
+    assert folded == 2
+
+
+def test_optimize_nested_blocks():
+    source = """for (item in items) {
+    if (item == 2) {
+        p(2 + 2)
+    }
+    if (2 < 1) { p("never") }
+}"""
+    program, folded = _optimize_source(source)
+
+    loop = program[0]
+    assert len(loop.body) == 1
+    assert isinstance(loop.body[0], IfNode)
+    assert loop.body[0].body[0].value.value == 4
+    assert folded == 3
+
+
+def test_optimize_long_expressions():
+    """Folding doesn't recurse, so an expression can be far longer than the recursion limit."""
+    program, folded = _optimize_source("x = " + " + ".join(["1"] * 3000) + "\ny = " + " + ".join(["x"] * 3000))
+
+    assert program[0].expression.value == 3000
+    assert isinstance(program[1].expression, ArithmeticNode)
+    assert folded == 2999
+
+
+def test_optimize_leaves_repetition_for_runtime():
+    """A repeated string could be far larger than the source, only a run can check it against its limits."""
+    program, folded = _optimize_source('s = "ab" * 100\nt = 2 * 3\nu = true * 2')
+
+    assert isinstance(program[0].expression, ArithmeticNode)
+    assert program[1].expression.value == 6
+    assert isinstance(program[2].expression, ArithmeticNode)
+    assert folded == 1
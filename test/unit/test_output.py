@@ -0,0 +1,92 @@
+from unittest.mock import patch
+
+import pytest
+
+from muffinscript.output import (
+    OUTPUT,
+    Output,
+    sleep,
+)
+
+
+def test_output_writes_straight_through_outside_a_run(capsys):
+    output = Output()
+    output.write("hello")
+    output.write([1, 2])
+
+    assert capsys.readouterr().out == "hello\n[1, 2]\n"
+
+
+def test_output_buffers_during_a_run(capsys):
+    output = Output()
+    with output.buffering():
+        output.write("hello")
+        output.write(True)
+        assert capsys.readouterr().out == ""
+
+    assert capsys.readouterr().out == "hello\nTrue\n"
+
+
+def test_output_flushes_when_full(capsys):
+    output = Output(limit=10)
+    with output.buffering():
+        output.write("1234")
+        assert capsys.readouterr().out == ""
+        output.write("56789")
+        assert capsys.readouterr().out == "1234\n56789\n"
+        output.write("more")
+
+    assert capsys.readouterr().out == "more\n"
+
+
+def test_output_flushes_on_error(capsys):
+    output = Output()
+    with pytest.raises(ZeroDivisionError):
+        with output.buffering():
+            output.write("before")
+            1 / 0
+
+    assert capsys.readouterr().out == "before\n"
+    assert not output.active
+
+
+def test_output_unbuffered(capsys):
+    output = Output()
+    output.unbuffered = True
+    with output.buffering():
+        output.write("now")
+        assert capsys.readouterr().out == "now\n"
+
+
+def test_output_nested_runs_flush_once(capsys):
+    output = Output()
+    with output.buffering():
+        with output.buffering():
+            output.write("inner")
+        assert capsys.readouterr().out == ""
+
+    assert capsys.readouterr().out == "inner\n"
+
+
+def test_output_capturing(capsys):
+    output = Output()
+    output.unbuffered = True
+    with output.buffering():
+        output.write("before")
+        with output.capturing() as lines:
+            output.write("inside")
+            output.write_text("text\n")
+        output.write("after")
+
+    assert lines == ["inside\n", "text\n"]
+    assert capsys.readouterr().out == "before\nafter\n"
+    assert output.captured is None
+
+
+def test_sleep_flushes_first(capsys):
+    with OUTPUT.buffering():
+        OUTPUT.write("waiting")
+        with patch("time.sleep") as mock_sleep:
+            sleep(2)
+        mock_sleep.assert_called_once_with(2)
+        assert capsys.readouterr().out == "waiting\n"
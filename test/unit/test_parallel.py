@@ -0,0 +1,145 @@
+import pickle
+from unittest.mock import patch
+
+import pytest
+
+from muffinscript import parallel
+from muffinscript.ast.base import ParallelForLoopNode
+from muffinscript.engines import ENGINES
+from muffinscript.errors import (
+    MuffinScriptLimitError,
+    MuffinScriptRuntimeError,
+    MuffinScriptSyntaxError,
+)
+from muffinscript.frame import Frame
+from muffinscript.lexer import tokenize_source
+from muffinscript.limits import Limits
+from muffinscript.output import Output
+from muffinscript.parallel import _run_chunk
+from muffinscript.parser import parse_program
+from muffinscript.program import compile
+from muffinscript.resolver import resolve
+
+SOURCE = (
+    'scale = 3\np("before")\npfor (n in range(40)) {\n    total = 0\n    for (i in range(n)) {\n'
+    '        total = total + i * scale\n    }\n    p("#{n}: #{total}")\n}\np("after")\n'
+)
+
+
+@pytest.mark.parametrize("engine", list(ENGINES))
+def test_pfor(engine, capsys):
+    assert compile(SOURCE, engine).run() == {"scale": 3}
+
+    expected = [f"{n}: {sum(range(n)) * 3}" for n in range(40)]
+    assert capsys.readouterr().out.splitlines() == ["before", *expected, "after"]
+
+
+def test_pfor_parses():
+    (node,) = parse_program(tokenize_source("pfor (item in [1, 2]) { p(item) }\n"))
+
+    assert isinstance(node, ParallelForLoopNode)
+    assert node.item_name == "item"
+
+
+@pytest.mark.parametrize(
+    ("source", "line_number"),
+    [
+        ("total = 0\npfor (i in [1, 2]) { total = total + i }\n", 2),
+        ("pfor (i in [1, 2]) { x = i }\np(x)\n", 1),
+        ("pfor (i in [1, 2]) {}\np(i)\n", 1),
+        ("xs = [1]\npfor (i in xs) { for (xs in [2]) {} }\n", 2),
+        ("for (i in [1]) {}\npfor (i in [1, 2]) {}\np(i)\n", 2),
+        ("pfor (i in [1, 2]) { for (j in [i]) {} }\nfor (k in [1]) { p(j) }\n", 1),
+    ],
+)
+def test_pfor_rejects_outer_assignments(source, line_number):
+    with pytest.raises(MuffinScriptSyntaxError) as error:
+        compile(source)
+
+    assert error.value.line_number == line_number
+
+
+def test_pfor_loop_variables_can_be_reused(capsys):
+    """Loop variables only exist inside their loops, other loops may use the same names."""
+    source = (
+        "for (i in [1]) { p(i) }\npfor (i in [2]) { for (j in [i]) { p(j) } }\npfor (i in [3]) { p(i) }\n"
+        "for (j in [4]) { p(j) }\n"
+    )
+    compile(source).run({"i": 0})
+
+    assert capsys.readouterr().out == "1\n2\n3\n4\n"
+
+
+def test_pfor_rejects_frame_variables():
+    program = parse_program(tokenize_source("pfor (i in [1, 2]) { x = i }\n"))
+
+    resolve(program, Frame())
+    with pytest.raises(MuffinScriptSyntaxError):
+        resolve(program, Frame({"x": 1}))
+
+
+@pytest.mark.parametrize("engine", list(ENGINES))
+def test_pfor_error(engine, capsys):
+    program = compile('p("start")\npfor (i in range(20)) {\n    p(i)\n    if (i == 7) { p(missing) }\n}\n', engine)
+
+    with pytest.raises(MuffinScriptRuntimeError) as error:
+        program.run()
+
+    assert error.value.message == "Undefined variable"
+    assert error.value.line_number == 4
+    assert capsys.readouterr().out.splitlines() == ["start", *(str(i) for i in range(8))]
+
+
+def test_pfor_with_limits_runs_in_process(capsys):
+    program = compile("pfor (i in range(3)) { p(i) }\n")
+
+    with patch("muffinscript.parallel._pool") as pool:
+        program.run(limits=Limits(max_steps=100))
+        with pytest.raises(MuffinScriptLimitError):
+            compile("pfor (i in range(1000)) { x = i }\n").run(limits=Limits(max_steps=100))
+
+    pool.assert_not_called()
+    assert capsys.readouterr().out == "0\n1\n2\n"
+
+
+def test_run_chunk():
+    (node,) = program = parse_program(tokenize_source("pfor (i in xs) { p(i * 2)\n y = 1 / i }\n"))
+    frame = Frame({"xs": [1, 0]})
+    resolve(program, frame)
+
+    lines, error = _run_chunk(node.body, node.item_slot, list(frame.values), [3, 1, 0, 5])
+
+    assert lines == ["6\n", "2\n", "0\n"]
+    assert isinstance(error, ZeroDivisionError)
+    assert _run_chunk(node.body, node.item_slot, list(frame.values), []) == ([], None)
+
+
+def test_pfor_output_goes_through_output(capsys):
+    program = compile("p(1)\npfor (i in range(3)) { p(i) }\np(2)\n")
+
+    with patch.object(Output, "write_text", autospec=True, side_effect=Output.write_text) as write_text:
+        program.run()
+
+    assert [call.args[1] for call in write_text.call_args_list] == ["0\n", "1\n", "2\n"]
+    assert capsys.readouterr().out == "1\n0\n1\n2\n2\n"
+
+
+def test_shutdown():
+    compile("pfor (i in range(3)) { x = i }\n").run()
+    pool = parallel._POOL
+
+    parallel.shutdown()
+    parallel.shutdown()
+
+    assert parallel._POOL is None
+    with pytest.raises(RuntimeError):
+        pool.submit(print)
+    compile("pfor (i in range(3)) { x = i }\n").run()
+    assert parallel._POOL is not None
+
+
+def test_errors_pickle():
+    error = pickle.loads(pickle.dumps(MuffinScriptLimitError("Step limit exceeded: 1", 3)))
+
+    assert isinstance(error, MuffinScriptLimitError)
+    assert (error.message, error.line_number) == ("Step limit exceeded: 1", 3)
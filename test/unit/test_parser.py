@@ -1,23 +1,44 @@
 import pytest
 
-from muffinscript.ast.standard_lib import PrintNode
-from muffinscript.ast.types import IntNode
+from muffinscript.ast.base import (
+    ForLoopNode,
+    IfNode,
+    VariableNode,
+)
+from muffinscript.ast.standard_lib import (
+    IntCoerceNode,
+    PrintNode,
+    RangeNode,
+    ReductionNode,
+)
+from muffinscript.ast.types import (
+    InterpolationNode,
+    IntNode,
+    StringNode,
+)
 from muffinscript.errors import (
     MuffinScriptRuntimeError,
     MuffinScriptSyntaxError,
 )
-from muffinscript.parser import parse_tokens
+from muffinscript.lexer import tokenize_source
+from muffinscript.parser import (
+    _match_brackets,
+    parse_program,
+    parse_tokens,
+    split_statements,
+)
 
 
 def test_parse_print_tokens():
     node = parse_tokens(["p", "(", "foo", ")"], 1)
-    assert node.value == "foo"
+    assert isinstance(node.value, VariableNode)
+    assert node.value.value == "foo"
     assert node.line_number == 1
 
     node = parse_tokens(["p", "(", 2, "+", 3, ")"], 2)
     assert node.value.operator == "+"
-    assert node.value.left == 2
-    assert node.value.right == 3
+    assert node.value.left.value == 2
+    assert node.value.right.value == 3
     assert node.line_number == 2
 
     node = parse_tokens(["p", "(", True, ")"], 3)
@@ -64,78 +85,78 @@ def test_parse_variable_tokens():
     node = parse_tokens(["foo", "=", 2, "+", 2], 4)
     assert node.var_name == "foo"
     assert node.expression.operator == "+"
-    assert node.expression.left == 2
-    assert node.expression.right == 2
+    assert node.expression.left.value == 2
+    assert node.expression.right.value == 2
     assert node.line_number == 4
 
     node = parse_tokens(["foo", "=", 2, "-", 2], 5)
     assert node.var_name == "foo"
     assert node.expression.operator == "-"
-    assert node.expression.left == 2
-    assert node.expression.right == 2
+    assert node.expression.left.value == 2
+    assert node.expression.right.value == 2
     assert node.line_number == 5
 
     node = parse_tokens(["foo", "=", 2, "*", 2], 6)
     assert node.var_name == "foo"
     assert node.expression.operator == "*"
-    assert node.expression.left == 2
-    assert node.expression.right == 2
+    assert node.expression.left.value == 2
+    assert node.expression.right.value == 2
     assert node.line_number == 6
 
     node = parse_tokens(["foo", "=", 2, "/", 2], 7)
     assert node.var_name == "foo"
     assert node.expression.operator == "/"
-    assert node.expression.left == 2
-    assert node.expression.right == 2
+    assert node.expression.left.value == 2
+    assert node.expression.right.value == 2
     assert node.line_number == 7
 
     node = parse_tokens(["foo", "=", 2, "%", 2], 8)
     assert node.var_name == "foo"
     assert node.expression.operator == "%"
-    assert node.expression.left == 2
-    assert node.expression.right == 2
+    assert node.expression.left.value == 2
+    assert node.expression.right.value == 2
     assert node.line_number == 8
 
     node = parse_tokens(["foo", "=", 2, "==", 2], 9)
     assert node.var_name == "foo"
     assert node.expression.operator == "=="
-    assert node.expression.left == 2
-    assert node.expression.right == 2
+    assert node.expression.left.value == 2
+    assert node.expression.right.value == 2
     assert node.line_number == 9
 
     node = parse_tokens(["foo", "=", 2, "!=", 2], 10)
     assert node.var_name == "foo"
     assert node.expression.operator == "!="
-    assert node.expression.left == 2
-    assert node.expression.right == 2
+    assert node.expression.left.value == 2
+    assert node.expression.right.value == 2
     assert node.line_number == 10
 
     node = parse_tokens(["foo", "=", 2, ">", 2], 11)
     assert node.var_name == "foo"
     assert node.expression.operator == ">"
-    assert node.expression.left == 2
-    assert node.expression.right == 2
+    assert node.expression.left.value == 2
+    assert node.expression.right.value == 2
     assert node.line_number == 11
 
     node = parse_tokens(["foo", "=", 2, ">=", 2], 12)
     assert node.var_name == "foo"
     assert node.expression.operator == ">="
-    assert node.expression.left == 2
-    assert node.expression.right == 2
+    assert node.expression.left.value == 2
+    assert node.expression.right.value == 2
     assert node.line_number == 12
 
     node = parse_tokens(["foo", "=", 2, "<", 2], 13)
     assert node.var_name == "foo"
     assert node.expression.operator == "<"
-    assert node.expression.left == 2
-    assert node.expression.right == 2
+    assert node.expression.left.value == 2
+    assert node.expression.right.value == 2
     assert node.line_number == 13
 
     node = parse_tokens(["foo", "=", 2, "<=", 2], 14)
     assert node.var_name == "foo"
     assert node.expression.operator == "<="
-    assert node.expression.left == 2
-    assert node.expression.right == 2
+    assert node.expression.left.value == 2
+    assert node.expression.right.value == 2
     assert node.line_number == 14
 
     node = parse_tokens(["foo", "=", "cat", "(", "hello ", "bar", ")"], 15)
@@ -160,8 +181,13 @@ def test_parse_variable_tokens():
     assert node.expression.value == 2
     assert node.line_number == 19
 
+    # Variables are coerced when the program runs
+    node = parse_tokens(["foo", "=", "int", "(", "hello", ")"], 20)
+    assert isinstance(node.expression, IntCoerceNode)
+    assert node.expression.value.value == "hello"
+
     with pytest.raises(MuffinScriptRuntimeError) as error:
-        parse_tokens(["foo", "=", "int", "(", "hello", ")"], 20)
+        parse_tokens(["foo", "=", "int", "(", '"hello"', ")"], 20)
     assert str(error.value) == "\033[31mRUNTIME ERROR\033[0m - Invalid coercion, could not convert to type | line: 20"
 
     node = parse_tokens(["foo", "=", "float", "(", 2, ")"], 21)
@@ -169,7 +195,7 @@ def test_parse_variable_tokens():
     assert node.line_number == 21
 
     with pytest.raises(MuffinScriptRuntimeError) as error:
-        parse_tokens(["foo", "=", "float", "(", "hello", ")"], 22)
+        parse_tokens(["foo", "=", "float", "(", '"hello"', ")"], 22)
     assert str(error.value) == "\033[31mRUNTIME ERROR\033[0m - Invalid coercion, could not convert to type | line: 22"
 
     node = parse_tokens(["foo", "=", "type", "(", 2, ")"], 23)
@@ -177,7 +203,7 @@ def test_parse_variable_tokens():
     assert node.line_number == 23
 
     node = parse_tokens(["foo", "=", "type", "(", "foo", ")"], 24)
-    assert node.expression.value == "foo"
+    assert node.expression.value.value == "foo"
     assert node.line_number == 24
 
 
@@ -195,9 +221,9 @@ def test_parse_if_tokens():
     # If with no else
     node = parse_tokens(["if", "(", "foo", "==", "bar", ")", "{", "p", "(", "true", ")", "}"], 1)
     assert node.condition.operator == "=="
-    assert node.condition.left == "foo"
-    assert node.condition.right == "bar"
-    assert node.body[0].value == "true"
+    assert node.condition.left.value == "foo"
+    assert node.condition.right.value == "bar"
+    assert node.body[0].value.value == "true"
     assert node.line_number == 1
 
     # If with else
@@ -206,10 +232,10 @@ def test_parse_if_tokens():
         2,
     )
     assert node.condition.operator == "=="
-    assert node.condition.left == "foo"
-    assert node.condition.right == "bar"
-    assert node.body[0].value == "true"
-    assert node.else_body[0].value == "false"
+    assert node.condition.left.value == "foo"
+    assert node.condition.right.value == "bar"
+    assert node.body[0].value.value == "true"
+    assert node.else_body[0].value.value == "false"
     assert node.line_number == 2
 
     with pytest.raises(MuffinScriptSyntaxError) as error:
@@ -228,7 +254,7 @@ def test_parse_if_tokens():
 def test_parse_for_loop_tokens():
     node = parse_tokens(["for", "(", "item", "in", "myList", ")", "{", "p", "(", "item", ")", "}"], 1)
     assert node.item_name == "item"
-    assert node.iterable == "myList"
+    assert node.iterable.value == "myList"
     assert isinstance(node.body[0], PrintNode)
     assert node.line_number == 1
 
@@ -261,68 +287,68 @@ def test_parse_expressions():
 
     node = parse_tokens([2, "+", 2], 6)
     assert node.operator == "+"
-    assert node.left == 2
-    assert node.right == 2
+    assert node.left.value == 2
+    assert node.right.value == 2
     assert node.line_number == 6
 
     node = parse_tokens([2, "-", 2], 7)
     assert node.operator == "-"
-    assert node.left == 2
-    assert node.right == 2
+    assert node.left.value == 2
+    assert node.right.value == 2
     assert node.line_number == 7
 
     node = parse_tokens([2, "*", 2], 8)
     assert node.operator == "*"
-    assert node.left == 2
-    assert node.right == 2
+    assert node.left.value == 2
+    assert node.right.value == 2
     assert node.line_number == 8
 
     node = parse_tokens([2, "/", 2], 9)
     assert node.operator == "/"
-    assert node.left == 2
-    assert node.right == 2
+    assert node.left.value == 2
+    assert node.right.value == 2
     assert node.line_number == 9
 
     node = parse_tokens([2, "%", 2], 10)
     assert node.operator == "%"
-    assert node.left == 2
-    assert node.right == 2
+    assert node.left.value == 2
+    assert node.right.value == 2
     assert node.line_number == 10
 
     node = parse_tokens([2, "==", 2], 11)
     assert node.operator == "=="
-    assert node.left == 2
-    assert node.right == 2
+    assert node.left.value == 2
+    assert node.right.value == 2
     assert node.line_number == 11
 
     node = parse_tokens([2, "!=", 2], 12)
     assert node.operator == "!="
-    assert node.left == 2
-    assert node.right == 2
+    assert node.left.value == 2
+    assert node.right.value == 2
     assert node.line_number == 12
 
     node = parse_tokens([2, ">", 2], 13)
     assert node.operator == ">"
-    assert node.left == 2
-    assert node.right == 2
+    assert node.left.value == 2
+    assert node.right.value == 2
     assert node.line_number == 13
 
     node = parse_tokens([2, ">=", 2], 14)
     assert node.operator == ">="
-    assert node.left == 2
-    assert node.right == 2
+    assert node.left.value == 2
+    assert node.right.value == 2
     assert node.line_number == 14
 
     node = parse_tokens([2, "<", 2], 15)
     assert node.operator == "<"
-    assert node.left == 2
-    assert node.right == 2
+    assert node.left.value == 2
+    assert node.right.value == 2
     assert node.line_number == 15
 
     node = parse_tokens([2, "<=", 2], 16)
     assert node.operator == "<="
-    assert node.left == 2
-    assert node.right == 2
+    assert node.left.value == 2
+    assert node.right.value == 2
     assert node.line_number == 16
 
     node = parse_tokens(['"hello world"'], 17)
@@ -348,3 +374,166 @@ def test_parse_expressions():
     node = parse_tokens([None], 21)
     assert node.value == "null"
     assert node.line_number == 21
+
+
+def test_split_statements():
+    tokens = tokenize_source("foo = 1\nif (foo == 1) {\n    p(foo)\n} else {\n    p(2)\n}\np(foo)\n")
+    statements = [[token.value for token in statement] for statement in split_statements(tokens)]
+    assert statements == [
+        ["foo", "=", 1],
+        ["if", "(", "foo", "==", 1, ")", "{", "p", "(", "foo", ")", "}", "else", "{", "p", "(", 2, ")", "}"],
+        ["p", "(", "foo", ")"],
+    ]
+
+
+def test_parse_program():
+    program = parse_program(tokenize_source('foo = "hello"\n\nfor (item in foo) {\n    p(item)\n}\n'))
+    assert [node.line_number for node in program] == [1, 3]
+    assert program[0].var_name == "foo"
+    assert program[1].item_name == "item"
+
+    with pytest.raises(MuffinScriptRuntimeError) as error:
+        parse_program(tokenize_source("foo = 1\nfoo"))
+    assert str(error.value) == "\033[31mRUNTIME ERROR\033[0m - Undefined variable | line: 2"
+
+
+def test_parse_string_literals_by_kind():
+    # A string literal that happens to spell a keyword is still just a string
+    node = parse_tokens(tokenize_source('p("str")'), 1)
+    assert isinstance(node.value, StringNode)
+    assert node.value.value == "str"
+
+    node = parse_tokens(tokenize_source('"type" == "type"'), 2)
+    assert node.operator == "=="
+    assert node.left.value == "type"
+    assert node.right.value == "type"
+
+
+def test_parse_arithmetic_chaining():
+    # ((a * b) + c) - (d / e)
+    node = parse_tokens(tokenize_source("a * b + c - d / e"), 1)
+    assert node.operator == "-"
+    assert node.left.operator == "+"
+    assert node.left.left.operator == "*"
+    operands = (node.left.left.left, node.left.left.right, node.left.right)
+    assert [operand.value for operand in operands] == ["a", "b", "c"]
+    assert node.right.operator == "/"
+    assert (node.right.left.value, node.right.right.value) == ("d", "e")
+
+    # Parentheses group and comparisons bind loosest
+    node = parse_tokens(tokenize_source("(1 + 2) * 3 >= 9 - 1"), 2)
+    assert node.operator == ">="
+    assert node.left.operator == "*"
+    assert node.left.left.operator == "+"
+    assert node.right.operator == "-"
+
+    node = parse_tokens(tokenize_source('foo = cat("total: ", str(2)) == type(int("3") % 2)'), 3)
+    assert node.expression.operator == "=="
+    assert node.expression.left.args[1].value == "2"
+    assert node.expression.right.value.operator == "%"
+
+    node = parse_tokens(tokenize_source("[1 + 1, 2 * 2, foo]"), 4)
+    assert [item.operator for item in node.items[:2]] == ["+", "*"]
+    assert node.items[2].value == "foo"
+
+    node = parse_tokens(tokenize_source("for (i in range(1, n * 2)) {}"), 5)
+    assert isinstance(node.iterable, RangeNode)
+    assert node.iterable.args[0].value == 1
+    assert node.iterable.args[1].operator == "*"
+
+    node = parse_tokens(tokenize_source("range(10, 0, -2)"), 5)
+    assert [arg.value for arg in node.args] == [10, 0, -2]
+
+    node = parse_tokens(tokenize_source("mean(foo * 2)"), 5)
+    assert isinstance(node, ReductionNode)
+    assert node.function == "mean"
+    assert node.value.operator == "*"
+
+    # Builtin functions are only called when followed by `(`, their names are free for variables
+    node = parse_tokens(tokenize_source("sum = sum(range + 1)"), 6)
+    assert node.var_name == "sum"
+    assert isinstance(node.expression, ReductionNode)
+    assert node.expression.value.left.value == "range"
+
+    for source in (
+        "sum()",
+        "1 +",
+        "(1 + 2",
+        "1 + 2)",
+        "cat()",
+        "[1, 2",
+        "int(1 2)",
+        "2 2",
+        "range()",
+        "range(1, 2, 3, 4)",
+    ):
+        with pytest.raises(MuffinScriptSyntaxError) as error:
+            parse_tokens(tokenize_source(source, 5), 5)
+        assert str(error.value) == "\033[31mSYNTAX ERROR\033[0m - Unsupported statement | line: 5"
+
+
+def test_match_brackets():
+    tokens = tokenize_source("if (a == (1)) { p([1]) }")
+    assert _match_brackets(tokens) == [-1, 7, -1, -1, 6, -1, 4, 1, 15, -1, 14, 13, -1, 11, 10, 8]
+
+    for source in ("p(1", "p(1))", "p([1)]", "if (true) { p(1) "):
+        with pytest.raises(MuffinScriptSyntaxError) as error:
+            _match_brackets(tokenize_source(source, 3))
+        assert str(error.value) == "\033[31mSYNTAX ERROR\033[0m - Unsupported statement | line: 3"
+
+
+def test_parse_nested_blocks():
+    source = """for (row in [[1, 2], [3]]) {
+    for (item in row) {
+        if (item > 1) {
+            if (item == 3) { p("three") } else { p(item) }
+            total = item * 2
+        } else {
+            p("small")
+        }
+    }
+}"""
+    node = parse_tokens(tokenize_source(source), 1)
+    assert isinstance(node, ForLoopNode)
+    assert len(node.iterable.items) == 2
+    inner_loop = node.body[0]
+    assert isinstance(inner_loop, ForLoopNode)
+    assert inner_loop.iterable.value == "row"
+    condition = inner_loop.body[0]
+    assert isinstance(condition, IfNode)
+    assert [statement.line_number for statement in condition.body] == [4, 5]
+    assert isinstance(condition.body[0].body[0], PrintNode)
+    assert condition.body[0].else_body[0].line_number == 4
+    assert condition.body[1].var_name == "total"
+    assert condition.else_body[0].line_number == 7
+
+
+def test_parse_arguments_end_at_commas():
+    (items,) = parse_program(tokenize_source("[5, -2, 3]\n"))
+    assert [item.value for item in items.items] == [5, -2, 3]
+
+    (node,) = parse_program(tokenize_source("cat(1, -1, -2.5, -x)\n"))
+    assert [arg.value for arg in node.args[:3]] == [1, -1, -2.5]
+    assert (node.args[3].operator, node.args[3].left.value, node.args[3].right.value) == ("-", 0, "x")
+
+    (node,) = parse_program(tokenize_source("cat(1 - 1, 2)\n"))
+    assert node.args[0].operator == "-"
+    assert node.args[1].value == 2
+
+    for source in ("[1, , 2]\n", "[, 1]\n", "sum(xs, ys)\n", "x = 1, 2\n", "x = -\n"):
+        with pytest.raises(MuffinScriptSyntaxError):
+            parse_program(tokenize_source(source))
+
+
+def test_parse_interpolation():
+    node = parse_tokens(tokenize_source('p("#{greeting}, #{name}!")'), 1)
+    assert isinstance(node.value, InterpolationNode)
+    parts = node.value.parts
+    assert [type(part) for part in parts] == [VariableNode, str, VariableNode, str]
+    assert [part if isinstance(part, str) else part.value for part in parts] == ["greeting", ", ", "name", "!"]
+
+    node = parse_tokens(tokenize_source('foo = str("a #{b}")'), 2)
+    assert isinstance(node.expression, InterpolationNode)
+
+    node = parse_tokens(tokenize_source('p("no #{ interpolation")'), 3)
+    assert isinstance(node.value, StringNode)
@@ -0,0 +1,142 @@
+from unittest.mock import patch
+
+import pytest
+
+from muffinscript.engines import ENGINES
+from muffinscript.errors import (
+    MuffinScriptRuntimeError,
+    MuffinScriptSyntaxError,
+)
+from muffinscript.program import (
+    Engine,
+    Program,
+    compile,
+)
+
+SOURCE = 'discount = 0\nif (total > 100) { discount = total / 10 }\np("#{name}: #{discount}")\nseen = true\n'
+
+
+@pytest.mark.parametrize("engine", list(ENGINES))
+def test_program_run(engine, capsys):
+    program = compile(SOURCE, engine)
+    variables = {"name": "big", "total": 250}
+
+    assert program.run(variables) == {"discount": 25.0, "total": 250, "name": "big", "seen": "true"}
+    assert program.run({"name": "small", "total": 50}) == {
+        "discount": 0,
+        "total": 50,
+        "name": "small",
+        "seen": "true",
+    }
+    assert capsys.readouterr().out == "big: 25.0\nsmall: 0\n"
+    assert variables == {"name": "big", "total": 250}
+
+
+@pytest.mark.parametrize("engine", list(ENGINES))
+def test_program_run_isolated(engine):
+    program = compile("if (total > 0) { flag = total }\np(flag)\n", engine)
+
+    program.run({"total": 1})
+    with pytest.raises(MuffinScriptRuntimeError) as error:
+        program.run({"total": 0})
+
+    assert error.value.line_number == 2
+
+
+@pytest.mark.parametrize("engine", list(ENGINES))
+def test_program_run_list_variables(engine):
+    """Lists passed in behave exactly like list literals."""
+    program = compile("y = xs * 2\nz = [1, 2] * 2\nw = rows + 1\n", engine)
+    variables = {"xs": [1, 2], "rows": [[1], [2, 3]]}
+
+    result = program.run(variables)
+
+    assert (result["y"], result["z"], result["w"]) == ([2, 4], [2, 4], [[2], [3, 4]])
+    assert variables == {"xs": [1, 2], "rows": [[1], [2, 3]]}
+    assert program.run_columns({"xs": [[1], [2, 3]], "rows": [[], [1]]})["y"] == [[2], [4, 6]]
+    assert compile("y = xs * 2\n", engine).run_columns({"xs": [[1], [2, 3]]}) == {"y": [[2], [4, 6]]}
+
+
+def test_program_run_does_not_reparse():
+    program = compile("x = 1 + 2\n")
+
+    with patch("muffinscript.program.parse_program") as parse, patch("muffinscript.program.tokenize_source") as lex:
+        assert program.run() == {"x": 3}
+        assert program.run({"unused": 1}) == {"x": 3, "unused": 1}
+
+    parse.assert_not_called()
+    lex.assert_not_called()
+
+
+def test_program_immutable():
+    program = compile("x = y\n")
+
+    with pytest.raises(AttributeError):
+        program.engine = "tree"
+    with pytest.raises(AttributeError):
+        program._runner = print
+    with pytest.raises(AttributeError):
+        del program.vectorized
+    with pytest.raises(TypeError):
+        program.symbols["z"] = 2  # type: ignore
+    assert program.names == ("y", "x")
+    assert isinstance(program, Program)
+
+
+def test_engine():
+    engine = Engine("closure", optimize=False)
+
+    assert engine.run("x = 2 * 3\n", {"y": 1}) == {"y": 1, "x": 6}
+    assert engine.compile("x = 1\n").engine == "closure"
+    assert repr(engine) == "Engine(name='closure', optimize=False)"
+
+
+def test_engine_errors():
+    with pytest.raises(MuffinScriptRuntimeError):
+        Engine("nope").compile("x = 1\n")
+    with pytest.raises(MuffinScriptSyntaxError):
+        compile("x = \n")
+
+
+@pytest.mark.parametrize("engine", list(ENGINES))
+def test_program_run_columns(engine):
+    program = compile("rate = 0.5\ntax = price * rate\ntotal = price + tax - discount\nbig = total >= 10\n", engine)
+    columns = {"price": [10, 4], "discount": [0, 1]}
+
+    assert program.vectorized
+    assert program.run_columns(columns) == {
+        "rate": [0.5, 0.5],
+        "tax": [5.0, 2.0],
+        "total": [15.0, 5.0],
+        "big": [True, False],
+    }
+    assert columns == {"price": [10, 4], "discount": [0, 1]}
+
+
+@pytest.mark.parametrize("engine", list(ENGINES))
+def test_program_run_columns_rows(engine, capsys):
+    program = compile(
+        'label = "small"\nif (price > 5) { label = "big" }\np(cat(price, label))\nfor (i in range(price)) {}\n', engine
+    )
+
+    assert not program.vectorized
+    assert program.run_columns({"price": [10, 0]}) == {"label": ["big", "small"], "i": [9, None]}
+    assert capsys.readouterr().out == "10big\n0small\n"
+
+
+def test_program_run_columns_arrays():
+    numpy = pytest.importorskip("numpy")
+    program = compile("total = price * 2 + 1\nbig = total > 5\n")
+
+    results = program.run_columns({"price": numpy.array([1, 3])})
+
+    assert results["total"].tolist() == [3, 7]
+    assert results["big"].tolist() == [False, True]
+
+
+def test_program_run_columns_errors():
+    with pytest.raises(ValueError):
+        compile("x = a + b\n").run_columns({"a": [1], "b": [1, 2]})
+    with pytest.raises(ZeroDivisionError):
+        compile("x = a / b\n").run_columns({"a": [1, 2], "b": [1, 0]})
+    assert compile("x = 1\n").run_columns({}) == {"x": []}
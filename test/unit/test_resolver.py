@@ -0,0 +1,32 @@
+from muffinscript.frame import Frame
+from muffinscript.lexer import tokenize_source
+from muffinscript.parser import parse_program
+from muffinscript.resolver import resolve
+
+
+def test_resolve_binds_slots():
+    program = parse_program(
+        tokenize_source("foo = 1\nfor (item in [foo, 2]) {\n    if (item == foo) { p(str(item)) }\n}\nsleep(foo)")
+    )
+    frame = Frame()
+    resolve(program, frame)
+
+    assert frame.symbols == {"foo": 0, "item": 1}
+    assert program[0].slot == 0
+    loop = program[1]
+    assert loop.iterable.items[0].slot == 0
+    assert loop.item_slot == 1
+    condition = loop.body[0].condition
+    assert (condition.left.slot, condition.right.slot) == (1, 0)
+    assert loop.body[0].body[0].value.value.slot == 1
+    assert program[2].duration.slot == 0
+
+
+def test_resolve_reuses_frame_slots():
+    """Slots handed out to earlier programs (eg: previous REPL lines) are kept."""
+    frame = Frame({"bar": 2})
+    program = parse_program(tokenize_source("p(cat(type(foo), bar))"))
+    resolve(program, frame)
+
+    assert frame.symbols == {"bar": 0, "foo": 1}
+    assert program[0].value.args[1].slot == 0
@@ -0,0 +1,44 @@
+from muffinscript.tokens import (
+    ASSIGN,
+    BOOL,
+    FLOAT,
+    INT,
+    LPAREN,
+    NAME,
+    NULL,
+    OPERATOR,
+    STRING,
+    Token,
+    token_from_value,
+)
+
+
+def test_token():
+    token = Token(NAME, "foo", 2, 5)
+    assert token.kind == NAME
+    assert token.value == "foo"
+    assert token.line == 2
+    assert token.column == 5
+    assert repr(token) == "Token(0, 'foo', 2:5)"
+    assert not hasattr(token, "__dict__")
+
+
+def test_token_from_value():
+    values = ["foo", '"hello world"', "'hi'", "=", "(", "==", 2, 2.5, True, None]
+    tokens = [token_from_value(value, 1) for value in values]
+    assert [(token.kind, token.value) for token in tokens] == [
+        (NAME, "foo"),
+        (STRING, "hello world"),
+        (STRING, "hi"),
+        (ASSIGN, "="),
+        (LPAREN, "("),
+        (OPERATOR, "=="),
+        (INT, 2),
+        (FLOAT, 2.5),
+        (BOOL, True),
+        (NULL, None),
+    ]
+    assert token_from_value('"', 3).kind == STRING
+    assert token_from_value("2", 3).kind == STRING
+    assert token_from_value("foo", 3).kind == NAME
+    assert token_from_value("foo", 3).line == 3
@@ -0,0 +1,66 @@
+import pytest
+
+from muffinscript.ast.base import ForLoopNode
+from muffinscript.ast.standard_lib import PrintNode
+from muffinscript.ast.types import (
+    ConstantNode,
+    IntNode,
+)
+from muffinscript.errors import MuffinScriptRuntimeError
+from muffinscript.frame import Frame
+from muffinscript.lexer import tokenize_source
+from muffinscript.parser import parse_program
+from muffinscript.resolver import resolve
+from muffinscript.transpiler import transpile
+
+
+def _transpile_source(source, frame):
+    program = parse_program(tokenize_source(source))
+    resolve(program, frame)
+    return transpile(program)
+
+
+def test_transpile_line_table():
+    transpiled = _transpile_source("a = 1\n\nif (a == 1) {\n    p(a)\n} else {\n    p(2)\n}\n", Frame())
+
+    assert transpiled.line_table == {2: 1, 3: 3, 4: 4, 5: 6}
+    assert transpiled.code.co_filename == "<muffinscript>"
+
+
+def test_transpile_runs_repeatedly(capsys):
+    frame = Frame({"a": 2})
+    transpiled = _transpile_source("b = a * 3\np(b - a)", frame)
+
+    transpiled.run(frame)
+    frame["a"] = 10
+    transpiled.run(frame)
+
+    captured = capsys.readouterr()
+    assert captured.out == "4\n20\n"
+    assert frame.to_dict() == {"a": 10, "b": 30}
+
+
+def test_transpile_keeps_variables_on_error():
+    frame = Frame()
+    transpiled = _transpile_source("a = 1\nfor (i in [1, 2]) {\n    b = i\n    p(missing)\n}", frame)
+
+    with pytest.raises(MuffinScriptRuntimeError) as error:
+        transpiled.run(frame)
+    assert error.value.line_number == 4
+    assert frame.to_dict() == {"a": 1, "i": 1, "b": 1}
+
+
+def test_transpile_constants_table(capsys):
+    items = [IntNode(1, 1), IntNode(2, 1)]
+    program = [
+        ForLoopNode("item", items, [PrintNode(ConstantNode(3, 1), 1)], 1),
+        PrintNode(ConstantNode([1, 2], 2), 2),
+    ]
+    frame = Frame()
+    resolve(program, frame)
+    transpiled = transpile(program)
+    transpiled.run(frame)
+
+    assert transpiled.constants == [items, [1, 2]]
+    captured = capsys.readouterr()
+    assert captured.out == "3\n3\n[1, 2]\n"
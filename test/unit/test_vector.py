@@ -0,0 +1,46 @@
+import statistics
+
+import pytest
+
+from muffinscript.errors import MuffinScriptRuntimeError
+from muffinscript.lists import MuffinList
+from muffinscript.vector import reduce_list
+
+
+def test_reduce_list():
+    assert reduce_list("sum", [1, 2, 3], 1) == 6
+    assert reduce_list("sum", [], 1) == 0
+    assert reduce_list("min", [3, 1, 2], 1) == 1
+    assert reduce_list("max", range(10), 1) == 9
+    assert reduce_list("mean", [1, 2], 1) == 1.5
+
+
+def test_reduce_range():
+    """Ranges reduce from their ends, however long they are."""
+    assert reduce_list("sum", range(10**12), 1) == (10**12 - 1) * 10**12 // 2
+    for value in (range(0), range(1, 2), range(10, 0, -3), range(-5, 7, 2)):
+        assert reduce_list("sum", value, 1) == sum(value)
+    for value in (range(1, 2), range(10, 0, -3), range(-5, 7, 2)):
+        assert reduce_list("min", value, 1) == min(value)
+        assert reduce_list("max", value, 1) == max(value)
+        assert reduce_list("mean", value, 1) == statistics.fmean(value)
+
+    for function, value in (("min", []), ("mean", range(0)), ("sum", 5), ("max", "abc")):
+        with pytest.raises(MuffinScriptRuntimeError) as error:
+            reduce_list(function, value, 4)
+        assert error.value.message == "Invalid reduction, only lists and ranges allowed and they can't be empty"
+        assert error.value.line_number == 4
+
+
+def test_numpy_arrays():
+    numpy = pytest.importorskip("numpy")
+    array = numpy.array([1, 2, 3])
+
+    assert (MuffinList([1, 1, 1]) + array).tolist() == [2, 3, 4]
+    assert (array * 2).tolist() == [2, 4, 6]
+    total = reduce_list("sum", array, 1)
+    assert total == 6 and type(total) is int
+    assert reduce_list("mean", array, 1) == 2.0
+
+    with pytest.raises(MuffinScriptRuntimeError):
+        reduce_list("max", numpy.array([]), 1)